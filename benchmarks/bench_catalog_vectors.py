@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: índice vetorial de produtos (construção, memória e latência de busca)
+
+Gera um catálogo sintético, constrói o ProductVectorIndex do zero, aplica
+uma atualização incremental (1% dos produtos alterados) e mede a latência
+das buscas semânticas. Reporta também o tamanho dos vetores e do índice e a
+variação da memória do processo.
+
+Embedders:
+    local    HashingEmbedder (o mesmo de FAQ_EMBEDDER=local), sem rede
+    random   vetores aleatórios na dimensão informada (ada-002 = 1536), para
+             medir índice e memória sem chamar a API
+
+Uso:
+    python -m benchmarks.bench_catalog_vectors
+    python -m benchmarks.bench_catalog_vectors --products 50000 --embedder random --dimension 1536 --types flat hnsw sq8
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+WORDS = [
+    "doce", "amadeirado", "floral", "cítrico", "intenso", "noite", "baunilha", "âmbar",
+    "oud", "rosa", "jasmim", "fresco", "especiado", "couro", "almiscarado", "frutado"
+]
+BRANDS = ["Lattafa", "Armaf", "Afnan", "Chanel", "Dior", "Gucci", "Xiaomi", "Samsung", "Apple"]
+
+
+def make_products(count: int, rng: random.Random):
+    return [
+        {
+            "id": i,
+            "titulo": f"Perfume {rng.choice(BRANDS)} {rng.choice(WORDS).title()} {rng.randint(30, 200)}ml",
+            "marca": rng.choice(BRANDS),
+            "codigo": f"SKU-{i:06d}",
+            "descricao": " ".join(rng.sample(WORDS, 6))
+        }
+        for i in range(count)
+    ]
+
+
+class RandomEmbeddingClient:
+    """Vetores determinísticos por texto, sem rede"""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def _vector(self, text: str) -> np.ndarray:
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        return rng.standard_normal(self.dimension).astype(np.float32)
+
+    async def create_embeddings(self, texts, model=None):
+        return [self._vector(text) for text in texts]
+
+    async def create_embedding(self, text, model=None):
+        return self._vector(text)
+
+
+def index_bytes(index) -> int:
+    return len(faiss.serialize_index(index))
+
+
+async def run(args, index_type: str, products, queries):
+    from src.catalog.product_vector_index import ProductVectorIndex
+    from src.faq.ann_index import ANNIndexFactory
+    from src.faq.local_embedder import HashingEmbedder
+    from src.utils.memory import process_memory
+
+    with tempfile.TemporaryDirectory() as directory:
+        before = process_memory()
+        index = ProductVectorIndex(
+            llm_client=RandomEmbeddingClient(args.dimension),
+            index_factory=ANNIndexFactory(index_type, pq_m=args.pq_m),
+            local_embedder=HashingEmbedder(args.dimension) if args.embedder == "local" else None,
+            path=f"{directory}/catalog_vectors"
+        )
+
+        start = time.perf_counter()
+        await index.update(products)
+        build = time.perf_counter() - start
+        after = process_memory()
+
+        changed = [dict(p, descricao=p["descricao"] + " edição limitada") for p in products[: max(1, len(products) // 100)]]
+        start = time.perf_counter()
+        await index.update(changed + products[len(changed):])
+        incremental = time.perf_counter() - start
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            await index.search(query, k=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+
+        snapshot = index.snapshot
+        vectors_mb = snapshot.embeddings.nbytes / 2**20
+        index_mb = index_bytes(snapshot.index) / 2**20
+        rss_mb = after.get("rss_mb", 0) - before.get("rss_mb", 0)
+        print(f"{index_type:<6} {build:>10.2f} {incremental:>10.2f} {vectors_mb:>10.1f} {index_mb:>10.1f} "
+              f"{rss_mb:>9.0f} {statistics.median(latencies):>8.3f} {latencies[int(len(latencies) * 0.95)]:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--embedder", choices=["local", "random"], default="local")
+    parser.add_argument("--dimension", type=int, default=512)
+    parser.add_argument("--types", nargs="+", default=["flat", "hnsw"])
+    parser.add_argument("--pq-m", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=1,
+                        help="threads do FAISS (1 = latência por núcleo)")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(args.threads)
+    rng = random.Random(42)
+    products = make_products(args.products, rng)
+    queries = [f"perfume {' '.join(rng.sample(WORDS, 3))}" for _ in range(args.queries)]
+
+    print(f"{args.products} produtos, embedder {args.embedder} ({args.dimension} dims), {args.queries} consultas")
+    print(f"{'índice':<6} {'build (s)':>10} {'1% (s)':>10} {'vetores MB':>10} {'índice MB':>10} "
+          f"{'Δ RSS MB':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for index_type in args.types:
+        asyncio.run(run(args, index_type, products, queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N chamadas concorrentes ao endpoint /message
+
+Substitui o cliente da OpenAI por um falso com latência fixa e dispara N
+requisições simultâneas contra o app FastAPI (via ASGI, sem rede).
+
+Modos:
+    async    - cliente falso usa asyncio.sleep (caminho atual, não bloqueante)
+    blocking - cliente falso usa time.sleep (simula o antigo cliente síncrono)
+
+Cada modo roda em um processo novo: caches (intenções, single-flight,
+memória de conversa) preenchidos por um modo não favorecem o outro.
+
+Uso:
+    python -m benchmarks.bench_concurrent_messages --requests 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+
+
+class FakeCompletions:
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    async def create(self, model, messages, **kwargs):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        prompt = messages[-1]["content"]
+        if "Classifique" in prompt:
+            content = '{"intent": "GENERAL", "search_term": null}'
+        else:
+            content = "Olá! Como posso ajudar?"
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+class FakeAsyncOpenAI:
+    def __init__(self, latency: float, blocking: bool):
+        self.chat = SimpleNamespace(completions=FakeCompletions(latency, blocking))
+
+
+async def run(n_requests: int, latency: float, blocking: bool) -> float:
+    from src import main
+
+    main.orchestrator.llm_client.client = FakeAsyncOpenAI(latency, blocking)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/message", json={
+                "user_id": f"user{i}",
+                "message": f"olá {i}",
+                "channel": "benchmark"
+            })
+            for i in range(n_requests)
+        ])
+        elapsed = time.perf_counter() - start
+
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+
+def run_mode(n_requests: int, latency: float, blocking: bool) -> float:
+    return asyncio.run(run(n_requests, latency, blocking))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="latência simulada por chamada à OpenAI (s)")
+    args = parser.parse_args()
+
+    # Cada /message "olá" faz 2 chamadas: classificação + resposta geral
+    serial = args.requests * 2 * args.latency
+    print(f"{args.requests} requisições, {args.latency:.3f}s por chamada LLM")
+    print(f"tempo se executadas em série: {serial:.2f}s")
+
+    for mode, blocking in (("blocking", True), ("async", False)):
+        # Processo novo por modo: o app começa com todos os caches vazios
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            elapsed = pool.submit(run_mode, args.requests, args.latency, blocking).result()
+        print(f"{mode:>8}: {elapsed:.2f}s  (sobreposição {serial / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
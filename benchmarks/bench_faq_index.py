@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: índices aproximados da FAQ (HNSW, IVF-Flat, IVF-PQ) vs índice exato
+
+Gera vetores sintéticos agrupados (parecidos com embeddings reais), usa o
+IndexFlatIP como referência e reporta recall@k, QPS e tempo de construção
+para cada tipo de índice em cada tamanho de base.
+
+Uso:
+    python -m benchmarks.bench_faq_index
+    python -m benchmarks.bench_faq_index --sizes 10000 100000 1000000 --dimension 384
+    python -m benchmarks.bench_faq_index --types hnsw --ef-search 32 64 128
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_vectors(count: int, dimension: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((count, dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def recall_at_k(found: np.ndarray, expected: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(e)) for f, e in zip(found, expected))
+    return hits / expected.size
+
+
+def measure(index, queries: np.ndarray, k: int):
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    elapsed = time.perf_counter() - start
+    return found, len(queries) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dimension", type=int, default=256,
+                        help="dimensão dos vetores (ada-002 usa 1536)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=["hnsw", "ivf_flat", "ivf_pq"])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[64])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[16])
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--pq-m", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=1,
+                        help="threads do FAISS (1 = QPS por núcleo)")
+    args = parser.parse_args()
+
+    from src.faq.ann_index import ANNIndexFactory
+
+    faiss.omp_set_num_threads(args.threads)
+    rng = np.random.default_rng(42)
+
+    print(f"{'vetores':>9} {'índice':<9} {'parâmetro':<13} {'build (s)':>10} {'recall@' + str(args.k):>10} {'QPS':>10}")
+
+    for size in args.sizes:
+        vectors = make_vectors(size, args.dimension, max(16, size // 1000), rng)
+        queries = make_vectors(args.queries, args.dimension, max(16, size // 1000), rng)
+        ids = np.arange(size, dtype=np.int64)
+
+        exact = ANNIndexFactory("flat").build(vectors, ids)
+        expected, flat_qps = measure(exact, queries, args.k)
+        print(f"{size:>9} {'flat':<9} {'-':<13} {'-':>10} {1.0:>10.3f} {flat_qps:>10.0f}")
+        del exact
+
+        for index_type in args.types:
+            if index_type == "hnsw":
+                settings = [("efSearch", value) for value in args.ef_search]
+            else:
+                settings = [("nprobe", value) for value in args.nprobe]
+
+            factory = ANNIndexFactory(
+                index_type,
+                hnsw_m=args.hnsw_m,
+                pq_m=args.pq_m,
+                hnsw_ef_search=args.ef_search[0],
+                ivf_nprobe=args.nprobe[0]
+            )
+            start = time.perf_counter()
+            index = factory.build(vectors, ids)
+            build_time = time.perf_counter() - start
+
+            # Parâmetros de busca são ajustáveis sem reconstruir o índice
+            for name, value in settings:
+                factory.hnsw_ef_search = value if name == "efSearch" else factory.hnsw_ef_search
+                factory.ivf_nprobe = value if name == "nprobe" else factory.ivf_nprobe
+                factory.configure(index)
+
+                found, qps = measure(index, queries, args.k)
+                print(
+                    f"{size:>9} {index_type:<9} {f'{name}={value}':<13} "
+                    f"{build_time:>10.1f} {recall_at_k(found, expected):>10.3f} {qps:>10.0f}"
+                )
+            del index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memória residente por worker com o índice da FAQ em RAM vs mmap
+
+Gera uma base sintética de FAQs em um diretório temporário, deixa o
+FAQVectorStore construir e salvar o índice e então sobe N processos (como
+workers do uvicorn) que carregam a mesma base ao mesmo tempo. Para cada modo
+reporta, por worker, o RSS antes e depois de carregar o store, a parte
+anônima (exclusiva) e o PSS (páginas compartilhadas divididas entre workers).
+
+Uso:
+    python -m benchmarks.bench_faq_memory
+    python -m benchmarks.bench_faq_memory --entries 200000 --workers 4 --index-type hnsw
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def write_corpus(directory: Path, entries: int, dimension: int):
+    """Grava vetores e metadados no formato do FAQVectorStore (sem índice)"""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((entries, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    (directory / "dados").mkdir()
+    np.save(directory / "dados" / "faq_embeddings.npy", vectors)
+    metadata = {
+        "version": 1,
+        "model": "text-embedding-ada-002",
+        "dimension": dimension,
+        "dtype": "float32",
+        "normalized": True,
+        "count": entries,
+        "faqs": [
+            {"id": str(i), "pergunta": f"Pergunta {i}", "resposta": f"Resposta {i}", "hash": str(i)}
+            for i in range(entries)
+        ]
+    }
+    (directory / "dados" / "faq_metadata.json").write_text(json.dumps(metadata))
+
+
+def load_store(directory: str, env: dict, barrier, results):
+    os.environ.update(env)
+    os.chdir(directory)
+
+    from src.utils.memory import process_memory
+    from src.faq.faq_vector_store import FAQVectorStore
+
+    before = process_memory()
+    store = FAQVectorStore(llm_client=object())
+    # Toca todas as páginas dos vetores, como buscas reais fariam ao longo do tempo
+    float(np.asarray(store.embeddings).sum())
+    store.index.search(np.asarray(store.embeddings[:32], dtype=np.float32), 5)
+
+    # Mede com todos os workers vivos, para o PSS refletir o compartilhamento
+    barrier.wait()
+    after = process_memory()
+    barrier.wait()
+    results.put((before, after))
+
+
+def run_mode(directory: str, workers: int, env: dict):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=load_store, args=(directory, env, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    measurements = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--index-type", default="flat")
+    args = parser.parse_args()
+
+    base_env = {
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "benchmark"),
+        "FAQ_INDEX_TYPE": args.index_type,
+        "PYTHONPATH": str(ROOT)
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(Path(directory), args.entries, args.dimension)
+        size_mb = args.entries * args.dimension * 4 / 2**20
+        print(f"{args.entries} vetores x {args.dimension} dims ({size_mb:.0f} MB), "
+              f"índice {args.index_type}, {args.workers} workers")
+
+        # Primeira carga constrói e salva o índice; as medições usam o arquivo pronto
+        run_mode(directory, 1, {**base_env, "FAQ_INDEX_MMAP": "false"})
+
+        print(f"{'modo':<6} {'RSS antes':>10} {'RSS depois':>11} {'Δ RSS':>8} {'anônima':>9} {'PSS':>8}  (MB, média por worker)")
+        for mode in ("false", "true"):
+            measurements = run_mode(directory, args.workers, {**base_env, "FAQ_INDEX_MMAP": mode})
+            before = statistics.mean(b.get("rss_mb", 0) for b, _ in measurements)
+            after = statistics.mean(a.get("rss_mb", 0) for _, a in measurements)
+            anon = statistics.mean(a.get("rss_anon_mb", 0) - b.get("rss_anon_mb", 0) for b, a in measurements)
+            pss = statistics.mean(a.get("pss_mb", 0) - b.get("pss_mb", 0) for b, a in measurements)
+            label = "mmap" if mode == "true" else "RAM"
+            print(f"{label:<6} {before:>10.0f} {after:>11.0f} {after - before:>8.0f} {anon:>9.0f} {pss:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
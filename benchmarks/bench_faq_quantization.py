@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: precisão das decisões da FAQ com vetores quantizados
+
+Reproduz a decisão do search_faq (melhor FAQ com similaridade >= threshold,
+ou nenhuma resposta) sobre vetores sintéticos e compara cada modo com a
+referência atual: vetores float32 e índice exato. As consultas são geradas
+com similaridade próxima do limiar (0.55 a 0.85), onde erros de quantização
+mudam a resposta.
+
+Modos:
+    float16          vetores salvos em float16, busca exata
+    <índice>         score aproximado do índice (sq8, pq, ivf_pq), sem re-score
+    <índice>+rerank  top-N do índice re-pontuado com os vetores salvos
+
+Uso:
+    python -m benchmarks.bench_faq_quantization
+    python -m benchmarks.bench_faq_quantization --entries 50000 --dimension 1536 --rerank 10 20 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_queries(vectors: np.ndarray, count: int, rng):
+    """Consultas a partir de FAQs da base, com cosseno alvo em torno do limiar"""
+    rows = rng.integers(0, len(vectors), count)
+    targets = rng.uniform(0.55, 0.85, count).astype(np.float32)
+
+    noise = rng.standard_normal((count, vectors.shape[1])).astype(np.float32)
+    base = vectors[rows]
+    # Remove a componente paralela, para controlar o cosseno com a FAQ de origem
+    noise -= np.sum(noise * base, axis=1, keepdims=True) * base
+    faiss.normalize_L2(noise)
+    queries = targets[:, None] * base + np.sqrt(1 - targets ** 2)[:, None] * noise
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def decide(ids: np.ndarray, scores: np.ndarray, threshold: float) -> np.ndarray:
+    """Id da FAQ respondida por consulta (-1 = sem resposta)"""
+    return np.where(scores[:, 0] >= threshold, ids[:, 0], -1)
+
+
+def rerank(ids: np.ndarray, queries: np.ndarray, stored: np.ndarray):
+    """Re-pontua os candidatos com os vetores salvos, como o search_faq"""
+    candidates = stored[np.maximum(ids, 0)].astype(np.float32)
+    scores = np.einsum("qkd,qd->qk", candidates, queries)
+    scores[ids < 0] = -1.0
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def report(name: str, decisions: np.ndarray, expected: np.ndarray, bytes_per_vector: float, elapsed: float):
+    agreement = np.mean(decisions == expected)
+    answered = expected >= 0
+    false_negative = np.mean(decisions[answered] == -1) if answered.any() else 0.0
+    false_positive = np.mean(decisions[~answered] != -1) if (~answered).any() else 0.0
+    wrong = np.mean((decisions != expected) & (decisions >= 0) & (expected >= 0))
+    qps = len(decisions) / elapsed
+    print(f"{name:<20} {bytes_per_vector:>10.0f} {agreement:>10.4f} {false_positive:>8.4f} "
+          f"{false_negative:>8.4f} {wrong:>8.4f} {qps:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=768,
+                        help="dimensão dos vetores (ada-002 usa 1536)")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--types", nargs="+", default=["sq8", "pq", "ivf_pq"])
+    parser.add_argument("--rerank", type=int, nargs="+", default=[20])
+    parser.add_argument("--pq-m", type=int, default=48)
+    parser.add_argument("--pq-nbits", type=int, default=8)
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    from src.faq.ann_index import ANNIndexFactory
+
+    faiss.omp_set_num_threads(1)
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((args.entries, args.dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    queries = make_queries(vectors, args.queries, rng)
+    ids = np.arange(args.entries, dtype=np.int64)
+
+    print(f"{args.entries} vetores x {args.dimension} dims, {args.queries} consultas, threshold {args.threshold}")
+    print(f"{'modo':<20} {'bytes/vetor':>10} {'acordo':>10} {'falso +':>8} {'falso -':>8} {'outra':>8} {'QPS':>9}")
+
+    exact = ANNIndexFactory("flat").build(vectors, ids)
+    start = time.perf_counter()
+    scores, found = exact.search(queries, 1)
+    expected = decide(found, scores, args.threshold)
+    report("float32", expected, expected, args.dimension * 4, time.perf_counter() - start)
+
+    # float16: busca exata sobre os vetores salvos com meia precisão
+    half = vectors.astype(np.float16)
+    start = time.perf_counter()
+    scores = queries @ half.astype(np.float32).T
+    best = np.argmax(scores, axis=1)[:, None]
+    report("float16", decide(best, np.take_along_axis(scores, best, axis=1), args.threshold),
+           expected, args.dimension * 2, time.perf_counter() - start)
+    del exact, scores
+
+    for index_type in args.types:
+        factory = ANNIndexFactory(index_type, ivf_nprobe=args.nprobe, pq_m=args.pq_m, pq_nbits=args.pq_nbits)
+        index = factory.build(vectors, ids)
+        bytes_per_vector = len(faiss.serialize_index(index)) / args.entries
+
+        start = time.perf_counter()
+        scores, found = index.search(queries, 1)
+        report(index_type, decide(found, scores, args.threshold), expected,
+               bytes_per_vector, time.perf_counter() - start)
+
+        for candidates in sorted(args.rerank):
+            for stored, suffix in ((vectors, ""), (half, "/f16")):
+                start = time.perf_counter()
+                _, found = index.search(queries, candidates)
+                found, scores = rerank(found, queries, stored)
+                report(f"{index_type}+rerank{candidates}{suffix}", decide(found, scores, args.threshold),
+                       expected, bytes_per_vector + stored.itemsize * args.dimension,
+                       time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: apresentação de produtos por template vs LLM
+
+Mede a latência do renderizador determinístico e estima o custo (tokens)
+do caminho com LLM. Com --live, faz chamadas reais ao OPENAI_MODEL para
+medir também a latência do LLM.
+
+Uso:
+    python -m benchmarks.bench_product_presentation
+    python -m benchmarks.bench_product_presentation --live --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SAMPLE_PRODUCTS = [
+    {"titulo": f"Perfume Lattafa Modelo {i} EDP 100ml", "moeda": {"simbolo": "R$"}, "valor_venda": f"{149 + i * 10}.90"}
+    for i in range(8)
+]
+
+
+def count_tokens(text: str, model: str) -> int:
+    try:
+        import tiktoken
+        return len(tiktoken.encoding_for_model(model).encode(text))
+    except Exception:
+        # Aproximação: ~4 caracteres por token
+        return max(1, len(text) // 4)
+
+
+def bench_template(iterations: int) -> float:
+    from src.catalog.product_formatter import render_product_list
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render_product_list(SAMPLE_PRODUCTS, "lattafa")
+    return (time.perf_counter() - start) / iterations
+
+
+async def bench_llm(runs: int, model: str):
+    from src.llm.llm_client import LLMClient
+    from src.orchestrator.orchestrator import DialogOrchestrator
+
+    messages = DialogOrchestrator._product_messages(SAMPLE_PRODUCTS)
+    llm_client = LLMClient()
+    latencies = []
+    outputs = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        outputs.append(await llm_client.chat_completion(
+            model=model, messages=messages, temperature=0.7
+        ))
+        latencies.append(time.perf_counter() - start)
+    return latencies, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=10000)
+    parser.add_argument("--live", action="store_true", help="chama a API da OpenAI")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output-tokens", type=int, default=250,
+                        help="tokens de saída estimados sem --live")
+    parser.add_argument("--input-price", type=float, default=0.01,
+                        help="US$ por 1k tokens de entrada")
+    parser.add_argument("--output-price", type=float, default=0.03,
+                        help="US$ por 1k tokens de saída")
+    args = parser.parse_args()
+
+    from src.config import OPENAI_MODEL
+    from src.orchestrator.orchestrator import DialogOrchestrator
+
+    template_latency = bench_template(args.iterations)
+    print(f"template: {template_latency * 1e6:.1f} µs/resposta, custo US$ 0")
+
+    prompt = DialogOrchestrator._product_messages(SAMPLE_PRODUCTS)[0]["content"]
+    input_tokens = count_tokens(prompt, OPENAI_MODEL)
+    output_tokens = args.output_tokens
+
+    if args.live:
+        if not os.getenv("OPENAI_API_KEY"):
+            sys.exit("OPENAI_API_KEY não configurada")
+        latencies, outputs = asyncio.run(bench_llm(args.runs, OPENAI_MODEL))
+        output_tokens = int(statistics.mean(count_tokens(o, OPENAI_MODEL) for o in outputs))
+        print(f"llm ({OPENAI_MODEL}): p50 {statistics.median(latencies):.2f}s, "
+              f"máx {max(latencies):.2f}s em {args.runs} chamadas")
+    else:
+        print(f"llm ({OPENAI_MODEL}): latência não medida (use --live)")
+
+    cost = input_tokens / 1000 * args.input_price + output_tokens / 1000 * args.output_price
+    print(f"llm: ~{input_tokens} tokens de entrada + ~{output_tokens} de saída "
+          f"= US$ {cost:.4f}/resposta (US$ {cost * 1000:.2f} por mil buscas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from webhook.discord import DiscordWebhook
 from src.orchestrator.orchestrator import DialogOrchestrator
 from src.cart.cart import ShoppingCart
 from src.catalog.catalog_api import CatalogAPI
+from src.utils.http_client import http_client
 from src.config import DISCORD_TOKEN
 
 async def main():
@@ -16,8 +17,9 @@ async def main():
     
     # Inicializa serviços
     catalog_api = CatalogAPI()
-    orchestrator = DialogOrchestrator()
+    orchestrator = DialogOrchestrator(catalog_api=catalog_api)
     shopping_cart = ShoppingCart(catalog_api)
+    await orchestrator.refresh_brands()
     
     # Cria bot do Discord
     bot = DiscordWebhook(
@@ -38,6 +40,8 @@ async def main():
         await bot.start(DISCORD_TOKEN)
     except Exception as e:
         print(f"❌ Erro ao iniciar bot: {e}")
+    finally:
+        await http_client.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,142 @@
+from typing import Any, Dict, Optional, Sequence
+import asyncio
+import os
+import sqlite3
+import threading
+import numpy as np
+from .ttl_cache import TTLCache
+from src.utils.text import normalize_text
+
+# Gravações entre duas podas do SQLite (contar as linhas a cada gravação custaria caro)
+PRUNE_INTERVAL = 100
+
+class EmbeddingCache:
+    """
+    Cache de embeddings de consultas, chaveado pelo texto normalizado.
+
+    Camada 1: LRU em memória. Camada 2 (opcional): SQLite em disco, que
+    sobrevive a reinícios e é compartilhado entre processos. Leituras e
+    gravações no SQLite rodam em thread, fora do event loop. Com
+    `disk_max_rows`, as linhas mais antigas são removidas periodicamente.
+    """
+    def __init__(
+        self,
+        max_size: int = 10000,
+        disk_path: Optional[str] = None,
+        disk_max_rows: int = 0
+    ):
+        self.memory = TTLCache(max_size=max_size, ttl=float("inf"))
+        self.disk_path = disk_path
+        self.disk_max_rows = disk_max_rows
+        self._db = None
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # Com WAL, NORMAL não sincroniza o disco a cada commit: uma queda de
+            # energia pode perder as últimas gravações, mas não corrompe o banco.
+            # Para um cache (os vetores são recriáveis) a troca compensa.
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, dimension INTEGER, vector BLOB)"
+            )
+            self._db.commit()
+        # A conexão é compartilhada pelas threads do to_thread
+        self._db_lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_writes = 0
+        self.disk_pruned = 0
+        if self._db is not None:
+            # Aplica o limite já na abertura (ex.: limite reduzido na configuração)
+            with self._db_lock:
+                self._prune()
+                self._db.commit()
+    
+    @staticmethod
+    def _key(text: str, model: str) -> str:
+        return f"{model}:{normalize_text(text)}"
+    
+    def _read(self, key: str) -> Optional[bytes]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row is not None else None
+    
+    def _write(self, key: str, vector: np.ndarray) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, dimension, vector) VALUES (?, ?, ?)",
+                (key, vector.shape[0], vector.tobytes())
+            )
+            self.disk_writes += 1
+            if self.disk_writes % PRUNE_INTERVAL == 0:
+                self._prune()
+            self._db.commit()
+    
+    def _prune(self) -> None:
+        """Remove as linhas excedentes, mais antigas primeiro (chamar com o lock)"""
+        if not self.disk_max_rows:
+            return
+        count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.disk_max_rows
+        if excess <= 0:
+            return
+        # INSERT OR REPLACE gera um rowid novo: o menor rowid é a gravação mais antiga
+        self._db.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)",
+            (excess,)
+        )
+        self.disk_pruned += excess
+    
+    async def get(self, text: str, model: str) -> Optional[np.ndarray]:
+        """
+        Retorna o embedding em cache (float32) ou None
+        """
+        key = self._key(text, model)
+        vector = self.memory.get(key)
+        if vector is not None:
+            return vector
+        
+        if self._db is not None:
+            data = await asyncio.to_thread(self._read, key)
+            if data is not None:
+                vector = np.frombuffer(data, dtype=np.float32)
+                self.memory.set(key, vector)
+                self.disk_hits += 1
+                return vector
+        
+        self.misses += 1
+        return None
+    
+    async def set(self, text: str, model: str, embedding: Sequence[float]) -> np.ndarray:
+        """
+        Armazena um embedding nas duas camadas
+        """
+        key = self._key(text, model)
+        vector = np.asarray(embedding, dtype=np.float32)
+        self.memory.set(key, vector)
+        
+        if self._db is not None:
+            await asyncio.to_thread(self._write, key, vector)
+        
+        return vector
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna acertos por camada e taxa de acerto total
+        """
+        memory_hits = self.memory.hits
+        lookups = memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_size": len(self.memory),
+            "memory_hits": memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk_enabled": self._db is not None,
+            "disk_pruned": self.disk_pruned
+        }
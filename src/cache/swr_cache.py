@@ -0,0 +1,152 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from collections import OrderedDict
+import asyncio
+import contextvars
+import time
+from src.llm.single_flight import SingleFlight
+
+class StaleWhileRevalidateCache:
+    """
+    Cache assíncrono LRU com TTL por chamada e stale-while-revalidate.
+    
+    Entradas válidas são servidas direto da memória. Depois de expiradas,
+    continuam sendo servidas por até `stale_ttl` segundos enquanto uma
+    atualização roda em segundo plano. Resultados vazios (ex.: 404) são
+    guardados com TTL próprio (cache negativo) e não são servidos vencidos.
+    """
+    def __init__(self, max_size: int = 5000, stale_ttl: float = 600):
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        # chave -> (valor, válido até, servível vencido até)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._single_flight = SingleFlight()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+    
+    async def get(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        negative_ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Retorna o valor da chave, buscando com `fetch()` em caso de ausência
+        
+        Chamadas simultâneas para a mesma chave ausente compartilham uma única
+        busca. Erros de `fetch()` não são armazenados e chegam ao chamador.
+        """
+        entry = self._data.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self._data.move_to_end(key)
+                self.hits += 1
+                if not value:
+                    self.negative_hits += 1
+                return value
+            if now < stale_until:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                self._refresh(key, fetch, ttl, negative_ttl)
+                return value
+            del self._data[key]
+        
+        self.misses += 1
+        return await self._single_flight.do(key, lambda: self._load(key, fetch, ttl, negative_ttl))
+    
+    def set(self, key: Hashable, value: Any, ttl: float, negative_ttl: Optional[float] = None) -> None:
+        """
+        Armazena um valor; valores vazios usam `negative_ttl` e não ficam servíveis vencidos
+        """
+        negative = not value
+        if negative and negative_ttl is not None:
+            ttl = negative_ttl
+        fresh_until = time.monotonic() + ttl
+        stale_until = fresh_until if negative else fresh_until + self.stale_ttl
+        
+        self._data[key] = (value, fresh_until, stale_until)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    async def _load(self, key, fetch, ttl, negative_ttl) -> Any:
+        value = await fetch()
+        self.set(key, value, ttl, negative_ttl)
+        return value
+    
+    def _refresh(self, key, fetch, ttl, negative_ttl) -> None:
+        """Atualiza a entrada em segundo plano (uma atualização por chave)"""
+        if key in self._refreshing:
+            return
+        
+        self.refreshes += 1
+        # Contexto vazio: a atualização não herda o prazo da requisição que a disparou
+        task = asyncio.get_running_loop().create_task(
+            self._load(key, fetch, ttl, negative_ttl), context=contextvars.Context()
+        )
+        self._refreshing[key] = task
+        task.add_done_callback(lambda t: self._refresh_done(key, t))
+    
+    def _refresh_done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._refreshing.pop(key, None)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            # Mantém o valor vencido até o fim da janela de stale
+            self.refresh_errors += 1
+            print(f"Erro ao atualizar cache para {key!r}: {error}")
+    
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove uma entrada, se existir
+        """
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """
+        Remove todas as entradas
+        """
+        self._data.clear()
+    
+    async def close(self) -> None:
+        """
+        Cancela as atualizações em segundo plano
+        """
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de uso do cache
+        """
+        served = self.hits + self.stale_hits
+        lookups = served + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": len(self._refreshing),
+            "evictions": self.evictions,
+            "coalesced": self._single_flight.get_metrics()["coalesced"],
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0
+        }
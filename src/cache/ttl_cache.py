@@ -0,0 +1,75 @@
+from typing import Any, Dict, Hashable, Optional
+from collections import OrderedDict
+import time
+
+class TTLCache:
+    """
+    Cache em memória com tamanho máximo (LRU) e tempo de expiração por entrada
+    """
+    def __init__(self, max_size: int = 1000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retorna o valor armazenado ou `default` se ausente/expirado
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            self.misses += 1
+            return default
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Armazena um valor, removendo a entrada menos usada se o cache estiver cheio
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove uma entrada, se existir
+        """
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """
+        Remove todas as entradas
+        """
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de uso do cache
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -1,55 +1,259 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+import asyncio
 import aiohttp
-from src.config import CATALOG_API_URL, CATALOG_API_KEY
+from src.config import (
+    CATALOG_API_URL,
+    CATALOG_API_KEY,
+    STAGE_TIMEOUT_CATALOG,
+    CATALOG_CACHE_ENABLED,
+    CATALOG_CACHE_SIZE,
+    CATALOG_CACHE_PRODUCT_TTL,
+    CATALOG_CACHE_SEARCH_TTL,
+    CATALOG_CACHE_START_TTL,
+    CATALOG_CACHE_NEGATIVE_TTL,
+    CATALOG_CACHE_STALE_TTL,
+    CATALOG_MIRROR_ENABLED,
+    CATALOG_MIRROR_PATH,
+    CATALOG_MIRROR_PAGE_SIZE,
+    CATALOG_MIRROR_SEARCH_LIMIT,
+    CATALOG_SEMANTIC_SEARCH,
+    CATALOG_VECTOR_INDEX_TYPE,
+    CATALOG_EMBEDDER,
+    CATALOG_VECTOR_PATH,
+    CATALOG_SEMANTIC_THRESHOLD,
+    CATALOG_SEMANTIC_LIMIT,
+    CATALOG_BULK_CONCURRENCY,
+    FAQ_LOCAL_EMBEDDING_DIM,
+    FAQ_HNSW_M,
+    FAQ_HNSW_EF_CONSTRUCTION,
+    FAQ_HNSW_EF_SEARCH,
+    FAQ_IVF_NLIST,
+    FAQ_IVF_NPROBE,
+    FAQ_PQ_M,
+    FAQ_PQ_NBITS
+)
+from src.cache.swr_cache import StaleWhileRevalidateCache
+from src.catalog.catalog_mirror import CatalogMirror
+from src.catalog.product_vector_index import ProductVectorIndex
+from src.faq.ann_index import ANNIndexFactory
+from src.faq.local_embedder import HashingEmbedder
+from src.utils.deadline import stage_budget
+from src.utils.http_client import HTTPClient, http_client as shared_http_client
+
+class CatalogUnavailable(Exception):
+    """Resposta inesperada da API (não é cacheada, ao contrário de um 404)"""
 
 class CatalogAPI:
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[HTTPClient] = None,
+        cache_enabled: bool = CATALOG_CACHE_ENABLED,
+        mirror_enabled: bool = CATALOG_MIRROR_ENABLED,
+        semantic_search: bool = CATALOG_SEMANTIC_SEARCH,
+        llm_client=None
+    ):
+        # Pool de conexões compartilhado (keep-alive entre chamadas)
+        self.http_client = http_client or shared_http_client
         self.base_url = "https://api-genove.agcodecraft.com/api/public"
         self.headers = {
             'Content-Type': 'application/json'
         }
+        # Leituras do catálogo: TTL por endpoint + atualização em segundo plano
+        self.cache = None
+        if cache_enabled:
+            self.cache = StaleWhileRevalidateCache(
+                max_size=CATALOG_CACHE_SIZE,
+                stale_ttl=CATALOG_CACHE_STALE_TTL
+            )
+        # Cópia local opcional: buscas respondidas em processo
+        self.mirror = None
+        if mirror_enabled:
+            self.mirror = CatalogMirror(
+                self._fetch_page,
+                CATALOG_MIRROR_PATH,
+                page_size=CATALOG_MIRROR_PAGE_SIZE
+            )
+        # Índice vetorial dos produtos da cópia local, atualizado a cada sincronização
+        self.vector_index = None
+        if semantic_search and self.mirror is not None:
+            local = CATALOG_EMBEDDER == "local"
+            self.vector_index = ProductVectorIndex(
+                llm_client=llm_client,
+                index_factory=ANNIndexFactory(
+                    CATALOG_VECTOR_INDEX_TYPE,
+                    hnsw_m=FAQ_HNSW_M,
+                    hnsw_ef_construction=FAQ_HNSW_EF_CONSTRUCTION,
+                    hnsw_ef_search=FAQ_HNSW_EF_SEARCH,
+                    ivf_nlist=FAQ_IVF_NLIST,
+                    ivf_nprobe=FAQ_IVF_NPROBE,
+                    pq_m=FAQ_PQ_M,
+                    pq_nbits=FAQ_PQ_NBITS
+                ),
+                local_embedder=HashingEmbedder(FAQ_LOCAL_EMBEDDING_DIM) if local else None,
+                path=CATALOG_VECTOR_PATH
+            )
+            self.mirror.listeners.append(self.vector_index.update)
+        elif semantic_search:
+            print("CATALOG_SEMANTIC_SEARCH requer CATALOG_MIRROR_ENABLED; busca semântica desativada")
+    
+    def _timeout(self) -> aiohttp.ClientTimeout:
+        """Timeout das chamadas, limitado pelo prazo da requisição atual"""
+        return aiohttp.ClientTimeout(total=stage_budget(STAGE_TIMEOUT_CATALOG))
+    
+    async def _cached(self, key: tuple, fetch, ttl: float, empty: Any) -> Any:
+        """
+        Lê via cache (se ativo); erros da API retornam `empty` sem serem cacheados
+        """
+        try:
+            if self.cache is None:
+                return await fetch()
+            return await self.cache.get(key, fetch, ttl, CATALOG_CACHE_NEGATIVE_TTL)
+        except CatalogUnavailable as e:
+            print(f"Erro na API do catálogo: {e}")
+            return empty
     
     async def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
         """
         Busca informações de um produto específico
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/products/{product_id}",
-                headers=self.headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
+        return await self._cached(
+            ("product", str(product_id)),
+            lambda: self._fetch_product(product_id),
+            CATALOG_CACHE_PRODUCT_TTL,
+            None
+        )
+    
+    async def get_products(
+        self,
+        product_ids: Iterable[str],
+        concurrency: int = CATALOG_BULK_CONCURRENCY
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Busca vários produtos de uma vez, na ordem dos ids recebidos
+        
+        Ids repetidos são buscados uma vez e produtos em cache não chamam a API.
+        Os demais são buscados em paralelo (no máximo `concurrency` ao mesmo
+        tempo); a API não tem endpoint de busca em lote. Produtos inexistentes
+        ou que falharem retornam None na sua posição.
+        """
+        requested = [str(product_id) for product_id in product_ids]
+        unique = list(dict.fromkeys(requested))
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(product_id: str) -> Optional[Dict[str, Any]]:
+            # O semáforo só limita chamadas à API, não as leituras do cache
+            async with semaphore:
+                return await self._fetch_product(product_id)
+        
+        results = await asyncio.gather(
+            *[
+                self._cached(("product", product_id), lambda p=product_id: fetch(p), CATALOG_CACHE_PRODUCT_TTL, None)
+                for product_id in unique
+            ],
+            return_exceptions=True
+        )
+        
+        by_id = {}
+        for product_id, result in zip(unique, results):
+            if isinstance(result, Exception):
+                print(f"Erro ao buscar produto {product_id}: {result}")
+                result = None
+            by_id[product_id] = result
+        return [by_id[product_id] for product_id in requested]
+    
+    async def _fetch_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        async with self.http_client.get(
+            f"{self.base_url}/products/{product_id}",
+            headers=self.headers,
+            timeout=self._timeout()
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            if response.status == 404:
                 return None
+            raise CatalogUnavailable(f"GET /products/{product_id}: HTTP {response.status}")
     
     async def search_products(self, query: str) -> List[Dict[str, Any]]:
         """
-        Busca produtos por termo de pesquisa na API Genove
+        Busca produtos por termo de pesquisa na API Genove (ou na cópia local)
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/products",
-                params={'text': query},
-                headers=self.headers
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get('data', [])
-                return []
+        if self.mirror is not None and self.mirror.ready:
+            return self.mirror.search(query, CATALOG_MIRROR_SEARCH_LIMIT)
+        return await self._cached(
+            ("search", " ".join(query.lower().split())),
+            lambda: self._fetch_search(query),
+            CATALOG_CACHE_SEARCH_TTL,
+            []
+        )
+    
+    async def _fetch_search(self, query: str) -> List[Dict[str, Any]]:
+        async with self.http_client.get(
+            f"{self.base_url}/products",
+            params={'text': query},
+            headers=self.headers,
+            timeout=self._timeout()
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result.get('data', [])
+            raise CatalogUnavailable(f"GET /products?text={query}: HTTP {response.status}")
+    
+    async def semantic_search_products(
+        self,
+        query: str,
+        k: int = CATALOG_SEMANTIC_LIMIT,
+        threshold: float = CATALOG_SEMANTIC_THRESHOLD
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca produtos por similaridade semântica (ex.: "perfume doce amadeirado
+        para noite"); lista vazia se a busca semântica estiver desativada
+        """
+        if self.vector_index is None:
+            return []
+        
+        hits = await self.vector_index.search(query, k, threshold)
+        products = self.mirror.index.products
+        return [products[pid] for pid, _ in hits if pid in products]
+    
+    async def _fetch_page(self, page: int, per_page: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Uma página da listagem completa de produtos (usada pela cópia local)
+        
+        Returns:
+            (produtos, há mais páginas)
+        """
+        async with self.http_client.get(
+            f"{self.base_url}/products",
+            params={'page': page, 'per_page': per_page},
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise CatalogUnavailable(f"GET /products?page={page}: HTTP {response.status}")
+            result = await response.json()
+        
+        products = result.get('data', [])
+        if 'last_page' in result:
+            return products, page < int(result['last_page'])
+        if 'next_page_url' in result:
+            return products, bool(result['next_page_url'])
+        return products, len(products) >= per_page
     
     async def get_brands_and_categories(self) -> Dict[str, Any]:
         """
         Busca marcas e categorias disponíveis
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/start",
-                params={'lang': 'pt', 'tem_estoque': '1'},
-                headers=self.headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                return {}
+        return await self._cached(("start",), self._fetch_start, CATALOG_CACHE_START_TTL, {})
+    
+    async def _fetch_start(self) -> Dict[str, Any]:
+        async with self.http_client.get(
+            f"{self.base_url}/start",
+            params={'lang': 'pt', 'tem_estoque': '1'},
+            headers=self.headers,
+            timeout=self._timeout()
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            raise CatalogUnavailable(f"GET /start: HTTP {response.status}")
     
     async def get_brands(self) -> List[Dict[str, Any]]:
         """
@@ -64,3 +268,28 @@ class CatalogAPI:
         """
         data = await self.get_brands_and_categories()
         return data.get('categories', [])
+    
+    def invalidate_product(self, product_id: str) -> None:
+        """
+        Descarta o produto do cache (ex.: após alteração de preço ou estoque)
+        """
+        if self.cache is not None:
+            self.cache.delete(("product", str(product_id)))
+    
+    def get_mirror_metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna métricas da cópia local do catálogo (None se desativada)
+        """
+        return self.mirror.get_metrics() if self.mirror is not None else None
+    
+    def get_semantic_metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna métricas do índice vetorial de produtos (None se desativado)
+        """
+        return self.vector_index.get_metrics() if self.vector_index is not None else None
+    
+    def get_cache_metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna métricas do cache do catálogo (None se desativado)
+        """
+        return self.cache.get_metrics() if self.cache is not None else None
@@ -0,0 +1,171 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import gzip
+import json
+import os
+import time
+from src.catalog.product_index import ProductSearchIndex, product_id
+
+# Acima deste número de alterações a sincronização reconstrói o índice fora do loop
+REBUILD_THRESHOLD = 1000
+
+class CatalogMirror:
+    """
+    Cópia local do catálogo com busca em processo.
+
+    A listagem completa da API é salva em disco (JSON compactado com gzip) e
+    carregada na inicialização, então a busca funciona mesmo com a API fora
+    do ar. Cada sincronização baixa a listagem e aplica apenas as diferenças
+    (produtos novos, alterados e removidos) ao índice invertido.
+    """
+
+    def __init__(
+        self,
+        fetch_page: Callable[[int, int], Awaitable[Tuple[List[Dict[str, Any]], bool]]],
+        path: str,
+        page_size: int = 100,
+        max_pages: int = 1000
+    ):
+        """
+        Args:
+            fetch_page: Corrotina (página, tamanho) -> (produtos, há mais páginas)
+            path: Arquivo da cópia local
+        """
+        self.fetch_page = fetch_page
+        self.path = path
+        self.page_size = page_size
+        self.max_pages = max_pages
+        # Corrotinas chamadas com a listagem após cada sincronização (ex.: índice vetorial)
+        self.listeners: List[Callable[[List[Dict[str, Any]]], Awaitable[Any]]] = []
+        self.index = ProductSearchIndex()
+        self.synced_at: Optional[float] = None
+        self._sync_lock = asyncio.Lock()
+        self.syncs = 0
+        self.sync_errors = 0
+        self.searches = 0
+        self.search_time = 0.0
+        self._load()
+
+    @property
+    def ready(self) -> bool:
+        """Há produtos carregados para responder buscas"""
+        return len(self.index) > 0
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Erro ao carregar cópia local do catálogo: {e}")
+            return
+
+        self.index.replace_all(data.get("products", []))
+        self.synced_at = data.get("synced_at")
+        print(f"Cópia local do catálogo carregada com {len(self.index)} produtos")
+
+    def _save(self, products: List[Dict[str, Any]], synced_at: float) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Escrita atômica: leitores nunca veem um arquivo pela metade
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"version": 1, "synced_at": synced_at, "products": products}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    async def _fetch_all(self) -> List[Dict[str, Any]]:
+        products: List[Dict[str, Any]] = []
+        for page in range(1, self.max_pages + 1):
+            items, more = await self.fetch_page(page, self.page_size)
+            products.extend(items)
+            if not more or not items:
+                return products
+        print(f"Catálogo truncado em {self.max_pages} páginas")
+        return products
+
+    def _diff(self, products: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Produtos novos/alterados e ids removidos em relação ao índice atual"""
+        current = self.index.products
+        changed = [p for p in products if current.get(product_id(p)) != p]
+        seen = {product_id(p) for p in products}
+        removed = [doc_id for doc_id in current if doc_id not in seen]
+        return changed, removed
+
+    @staticmethod
+    def _build(products: List[Dict[str, Any]]) -> ProductSearchIndex:
+        index = ProductSearchIndex()
+        index.replace_all(products)
+        return index
+
+    async def sync(self) -> bool:
+        """
+        Baixa a listagem do catálogo e atualiza o índice e o arquivo local
+
+        Returns:
+            True se a sincronização terminou (mesmo sem alterações)
+        """
+        async with self._sync_lock:
+            try:
+                products = await self._fetch_all()
+            except Exception as e:
+                self.sync_errors += 1
+                print(f"Erro ao sincronizar catálogo: {e}")
+                return False
+
+            changed, removed = await asyncio.to_thread(self._diff, products)
+            if len(changed) + len(removed) > REBUILD_THRESHOLD:
+                # Troca atômica: buscas em andamento continuam no índice anterior
+                self.index = await asyncio.to_thread(self._build, products)
+            else:
+                for product in changed:
+                    self.index.add(product)
+                for doc_id in removed:
+                    self.index.remove(doc_id)
+
+            self.synced_at = time.time()
+            self.syncs += 1
+            if changed or removed or not os.path.exists(self.path):
+                await asyncio.to_thread(self._save, products, self.synced_at)
+            print(f"Catálogo sincronizado: {len(changed)} alterados, {len(removed)} removidos, "
+                  f"{len(self.index)} produtos")
+
+        for listener in self.listeners:
+            try:
+                await listener(products)
+            except Exception as e:
+                print(f"Erro ao processar sincronização do catálogo: {e}")
+        return True
+
+    async def run(self, interval: float) -> None:
+        """
+        Sincroniza agora e depois a cada `interval` segundos
+        """
+        while True:
+            await self.sync()
+            await asyncio.sleep(interval)
+
+    def search(self, query: str, k: int = 50) -> List[Dict[str, Any]]:
+        """
+        Busca produtos na cópia local
+        """
+        start = time.perf_counter()
+        results = self.index.search(query, k)
+        self.search_time += time.perf_counter() - start
+        self.searches += 1
+        return results
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna o estado da cópia local do catálogo
+        """
+        return {
+            "products": len(self.index),
+            "terms": self.index.term_count,
+            "synced_seconds_ago": round(time.time() - self.synced_at, 1) if self.synced_at else None,
+            "syncs": self.syncs,
+            "sync_errors": self.sync_errors,
+            "searches": self.searches,
+            "avg_search_ms": round(1000 * self.search_time / self.searches, 4) if self.searches else 0.0
+        }
@@ -0,0 +1,53 @@
+from typing import Dict, Any, List, Union
+from decimal import Decimal, InvalidOperation
+
+# Separadores (milhar, decimal) por locale
+LOCALE_SEPARATORS = {
+    "pt_BR": (".", ","),
+    "en_US": (",", "."),
+}
+
+def format_price(
+    value: Union[str, int, float, Decimal, None],
+    symbol: str = "R$",
+    locale: str = "pt_BR"
+) -> str:
+    """
+    Formata um valor monetário no padrão do locale ("R$ 1.234,50")
+    """
+    try:
+        amount = Decimal(str(value)).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return f"{symbol} {value}"
+    
+    thousands, decimal_sep = LOCALE_SEPARATORS.get(locale, LOCALE_SEPARATORS["pt_BR"])
+    integer_part, fraction = f"{abs(amount):,.2f}".split(".")
+    integer_part = integer_part.replace(",", thousands)
+    sign = "-" if amount < 0 else ""
+    
+    return f"{sign}{symbol} {integer_part}{decimal_sep}{fraction}"
+
+def render_product_list(
+    products: List[Dict[str, Any]],
+    search_term: str,
+    limit: int = 5,
+    locale: str = "pt_BR"
+) -> str:
+    """
+    Monta a apresentação dos produtos encontrados sem uso de LLM
+    """
+    lines = [f"Encontrei estes produtos para '{search_term}':", ""]
+    
+    for position, product in enumerate(products[:limit], start=1):
+        symbol = (product.get('moeda') or {}).get('simbolo', 'R$')
+        price = format_price(product.get('valor_venda', '0'), symbol, locale)
+        lines.append(f"{position}. {product.get('titulo', 'N/A')} - {price}")
+    
+    remaining = len(products) - limit
+    if remaining > 0:
+        lines.append(f"... e mais {remaining} produto(s).")
+    
+    lines.append("")
+    lines.append("Gostou de algum? É só me dizer qual que eu ajudo com a compra!")
+    
+    return "\n".join(lines)
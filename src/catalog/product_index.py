@@ -0,0 +1,260 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from collections import defaultdict
+import bisect
+import numpy as np
+from src.utils.text import normalize_text
+
+# Peso de cada campo do produto na pontuação
+FIELD_WEIGHTS = {"codigo": 3.0, "marca": 2.0, "titulo": 1.0}
+
+# Peso do tipo de casamento de cada termo da consulta
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+TYPO_WEIGHT = 0.6
+
+# Tamanho mínimo do termo para buscar por prefixo e para tolerar erro de digitação
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+# Limite de termos expandidos por prefixo (prefixos curtos casariam o vocabulário inteiro)
+MAX_PREFIX_TERMS = 200
+
+def product_id(product: Dict[str, Any]) -> str:
+    """Identificador estável do produto (id da API, ou código)"""
+    return str(product.get("id", product.get("codigo", "")))
+
+def product_fields(product: Dict[str, Any]) -> Dict[str, str]:
+    """Textos indexados do produto; `marca` pode vir como texto ou objeto"""
+    brand = product.get("marca") or ""
+    if isinstance(brand, dict):
+        brand = brand.get("nome", "")
+    return {
+        "titulo": str(product.get("titulo") or ""),
+        "marca": str(brand),
+        "codigo": str(product.get("codigo") or "")
+    }
+
+def _deletes(term: str) -> Set[str]:
+    """Variações do termo com um caractere removido"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Distância de Damerau-Levenshtein (OSA) <= 1"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        # Transposição de caracteres vizinhos
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+class ProductSearchIndex:
+    """
+    Índice invertido em memória sobre `titulo`, `marca` e `codigo`.
+
+    Termos são normalizados (sem acento, minúsculos). Cada termo da consulta
+    casa de forma exata, por prefixo ou com um erro de digitação (inserção,
+    remoção, troca ou transposição), via índice de deleções (SymSpell).
+    Produtos que casam mais termos da consulta vêm primeiro.
+
+    Cada produto ocupa uma linha; a pontuação da consulta é acumulada em
+    vetores numpy, então termos frequentes ("perfume") não custam um laço
+    Python por produto.
+    """
+
+    def __init__(self):
+        self.products: Dict[str, Dict[str, Any]] = {}
+        # termo -> {linha do produto: peso do campo}
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.doc_terms: Dict[str, Set[str]] = {}
+        self._rows: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        self._free_rows: List[int] = []
+        # Postings em arrays (linhas, pesos), recriados quando o termo muda
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # Vocabulário ordenado (prefixos, ordenado sob demanda) e deleções -> termos (erros de digitação)
+        self._vocabulary: List[str] = []
+        self._vocabulary_sorted = True
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.products
+
+    @property
+    def term_count(self) -> int:
+        return len(self.postings)
+
+    def add(self, product: Dict[str, Any]) -> None:
+        """
+        Indexa (ou reindexa) um produto
+        """
+        doc_id = product_id(product)
+        self.remove(doc_id)
+
+        weights: Dict[str, float] = {}
+        for field, text in product_fields(product).items():
+            for term in normalize_text(text).split():
+                weights[term] = max(weights.get(term, 0.0), FIELD_WEIGHTS[field])
+
+        row = self._free_rows.pop() if self._free_rows else len(self._row_ids)
+        if row == len(self._row_ids):
+            self._row_ids.append(doc_id)
+        else:
+            self._row_ids[row] = doc_id
+        self._rows[doc_id] = row
+
+        self.products[doc_id] = product
+        self.doc_terms[doc_id] = set(weights)
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self._add_term(term)
+            self.postings[term][row] = weight
+            self._arrays.pop(term, None)
+
+    def remove(self, doc_id: str) -> None:
+        """
+        Remove um produto do índice
+        """
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        del self.products[doc_id]
+        row = self._rows.pop(doc_id)
+        self._row_ids[row] = None
+        self._free_rows.append(row)
+        for term in terms:
+            postings = self.postings[term]
+            postings.pop(row, None)
+            self._arrays.pop(term, None)
+            if not postings:
+                del self.postings[term]
+                self._remove_term(term)
+
+    def _add_term(self, term: str) -> None:
+        self._vocabulary.append(term)
+        self._vocabulary_sorted = False
+        if len(term) >= MIN_TYPO_LENGTH:
+            for variant in _deletes(term) | {term}:
+                self._deletes[variant].add(term)
+
+    def _remove_term(self, term: str) -> None:
+        self._sort_vocabulary()
+        position = bisect.bisect_left(self._vocabulary, term)
+        if position < len(self._vocabulary) and self._vocabulary[position] == term:
+            del self._vocabulary[position]
+        if len(term) >= MIN_TYPO_LENGTH:
+            for variant in _deletes(term) | {term}:
+                terms = self._deletes.get(variant)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._deletes[variant]
+
+    def _sort_vocabulary(self) -> None:
+        if not self._vocabulary_sorted:
+            self._vocabulary.sort()
+            self._vocabulary_sorted = True
+
+    def _postings_array(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self.postings[term]
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def _expand(self, token: str) -> Dict[str, float]:
+        """Termos do índice que casam com o termo da consulta, com o peso do casamento"""
+        matches: Dict[str, float] = {}
+        if token in self.postings:
+            matches[token] = EXACT_WEIGHT
+
+        if len(token) >= MIN_PREFIX_LENGTH:
+            self._sort_vocabulary()
+            position = bisect.bisect_left(self._vocabulary, token)
+            end = min(len(self._vocabulary), position + MAX_PREFIX_TERMS)
+            while position < end and self._vocabulary[position].startswith(token):
+                matches.setdefault(self._vocabulary[position], PREFIX_WEIGHT)
+                position += 1
+
+        if not matches and len(token) >= MIN_TYPO_LENGTH:
+            candidates = set()
+            for variant in _deletes(token) | {token}:
+                candidates |= self._deletes.get(variant, set())
+            for term in candidates:
+                if _within_one_edit(token, term):
+                    matches[term] = TYPO_WEIGHT
+        return matches
+
+    def search(self, query: str, k: int = 50) -> List[Dict[str, Any]]:
+        """
+        Busca produtos pela consulta
+
+        Returns:
+            Produtos ordenados por termos casados e pontuação
+        """
+        tokens = list(dict.fromkeys(normalize_text(query).split()))
+        if not tokens or not self.products:
+            return []
+
+        size = len(self._row_ids)
+        scores = np.zeros(size, dtype=np.float32)
+        matched = np.zeros(size, dtype=np.int32)
+        for token in tokens:
+            # Melhor casamento do termo em cada produto
+            best = np.zeros(size, dtype=np.float32)
+            for term, match_weight in self._expand(token).items():
+                rows, weights = self._postings_array(term)
+                best[rows] = np.maximum(best[rows], weights * match_weight)
+            scores += best
+            matched += best > 0
+
+        most = matched.max()
+        if most == 0:
+            return []
+
+        # Só os produtos com o maior número de termos casados
+        candidates = np.flatnonzero(matched == most)
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [self.products[self._row_ids[row]] for row in candidates[order]]
+
+    def replace_all(self, products: Iterable[Dict[str, Any]]) -> Tuple[int, int, int]:
+        """
+        Aplica uma listagem completa: indexa novos/alterados e remove ausentes
+
+        Returns:
+            (adicionados, atualizados, removidos)
+        """
+        added = updated = 0
+        seen = set()
+        for product in products:
+            doc_id = product_id(product)
+            seen.add(doc_id)
+            current = self.products.get(doc_id)
+            if current is None:
+                added += 1
+            elif current == product:
+                continue
+            else:
+                updated += 1
+            self.add(product)
+
+        removed = [doc_id for doc_id in self.products if doc_id not in seen]
+        for doc_id in removed:
+            self.remove(doc_id)
+        return added, updated, len(removed)
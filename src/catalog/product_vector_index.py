@@ -0,0 +1,269 @@
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import os
+import re
+import faiss
+import numpy as np
+from src.catalog.product_index import product_fields, product_id
+from src.faq.ann_index import ANNIndexFactory
+from src.faq.local_embedder import HashingEmbedder
+from src.cache.embedding_cache import EmbeddingCache
+from src.llm.embeddings import embed_texts
+
+_TAGS = re.compile(r"<[^>]+>")
+
+# Campos de descrição usados no texto do produto, em ordem de preferência
+DESCRIPTION_FIELDS = ("descricao", "descricao_curta", "description")
+MAX_TEXT_LENGTH = 2000
+
+def product_text(product: Dict[str, Any]) -> str:
+    """Texto embutido do produto: título, marca e descrição (sem HTML)"""
+    fields = product_fields(product)
+    description = next((product[f] for f in DESCRIPTION_FIELDS if product.get(f)), "")
+    description = " ".join(_TAGS.sub(" ", str(description)).split())
+    return f"{fields['titulo']}. {fields['marca']}. {description}"[:MAX_TEXT_LENGTH]
+
+@dataclass(frozen=True)
+class ProductVectorSnapshot:
+    """Estado imutável do índice; atualizações criam um novo snapshot"""
+    product_ids: List[str]
+    embeddings: np.ndarray
+    vector_ids: np.ndarray
+    hashes: Dict[str, str]
+    index: faiss.Index
+    row_by_vector_id: Dict[int, int]
+
+    @property
+    def next_vector_id(self) -> int:
+        return int(self.vector_ids.max()) + 1 if len(self.vector_ids) else 0
+
+def _snapshot(product_ids, embeddings, vector_ids, hashes, index) -> ProductVectorSnapshot:
+    row_by_vector_id = {int(vector_id): row for row, vector_id in enumerate(vector_ids)}
+    return ProductVectorSnapshot(product_ids, embeddings, vector_ids, hashes, index, row_by_vector_id)
+
+class ProductVectorIndex:
+    """
+    Índice vetorial dos produtos do catálogo para busca semântica.
+
+    Usa o mesmo ANNIndexFactory e os mesmos embedders da FAQ. Só produtos
+    novos ou com texto alterado geram embeddings; vetores e hashes são
+    salvos em disco para não refazer embeddings ao reiniciar. O índice é
+    montado fora do loop de eventos e trocado de forma atômica.
+    """
+
+    def __init__(
+        self,
+        llm_client=None,
+        index_factory: Optional[ANNIndexFactory] = None,
+        local_embedder: Optional[HashingEmbedder] = None,
+        path: str = "dados/catalog_vectors",
+        embedding_model: str = "text-embedding-ada-002",
+        query_cache_size: int = 10000
+    ):
+        """
+        Args:
+            llm_client: Cliente de embeddings (ignorado com `local_embedder`)
+            path: Prefixo dos arquivos (.npy com vetores e .json com ids/hashes)
+        """
+        self.llm_client = llm_client
+        self.local_embedder = local_embedder
+        self.embedding_model = local_embedder.model_name if local_embedder else embedding_model
+        self.index_factory = index_factory or ANNIndexFactory("flat")
+        self.embeddings_file = f"{path}.npy"
+        self.metadata_file = f"{path}.json"
+        self.query_cache = EmbeddingCache(max_size=query_cache_size)
+        self._update_lock = asyncio.Lock()
+        self.updates = 0
+        self.embedded = 0
+        self.snapshot = self._load()
+
+    def __len__(self) -> int:
+        return len(self.snapshot.product_ids)
+
+    def _empty(self) -> ProductVectorSnapshot:
+        # Sem índice até a primeira atualização (a dimensão vem do embedder)
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+        vector_ids = np.zeros(0, dtype=np.int64)
+        return _snapshot([], embeddings, vector_ids, {}, None)
+
+    def _load(self) -> ProductVectorSnapshot:
+        if not (os.path.exists(self.embeddings_file) and os.path.exists(self.metadata_file)):
+            return self._empty()
+        try:
+            with open(self.metadata_file, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            embeddings = np.load(self.embeddings_file)
+        except (OSError, ValueError) as e:
+            print(f"Erro ao carregar vetores do catálogo: {e}")
+            return self._empty()
+
+        if metadata.get("model") != self.embedding_model:
+            print("Modelo de embedding do catálogo mudou; vetores serão recriados")
+            return self._empty()
+
+        vector_ids = np.array(metadata["vector_ids"], dtype=np.int64)
+        index = self.index_factory.build(embeddings, vector_ids)
+        print(f"Índice vetorial do catálogo carregado com {len(vector_ids)} produtos")
+        return _snapshot(metadata["product_ids"], embeddings, vector_ids, metadata["hashes"], index)
+
+    def _save(self, snapshot: ProductVectorSnapshot) -> None:
+        directory = os.path.dirname(self.embeddings_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        metadata = {
+            "model": self.embedding_model,
+            "product_ids": snapshot.product_ids,
+            "vector_ids": snapshot.vector_ids.tolist(),
+            "hashes": snapshot.hashes
+        }
+        # Escrita atômica; os metadados por último, pois referenciam o .npy
+        pid = os.getpid()
+        with open(f"{self.embeddings_file}.{pid}.tmp", "wb") as f:
+            np.save(f, snapshot.embeddings)
+        with open(f"{self.metadata_file}.{pid}.tmp", "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(f"{self.embeddings_file}.{pid}.tmp", self.embeddings_file)
+        os.replace(f"{self.metadata_file}.{pid}.tmp", self.metadata_file)
+
+    def _hash(self, text: str) -> str:
+        return hashlib.sha256(f"{self.embedding_model}\n{text}".encode("utf-8")).hexdigest()
+
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        if self.local_embedder is not None:
+            return await asyncio.to_thread(self.local_embedder.embed, texts)
+        return await embed_texts(self.llm_client, texts, self.embedding_model)
+
+    def _apply(
+        self,
+        current: ProductVectorSnapshot,
+        changed: List[Tuple[str, str]],
+        vectors: np.ndarray,
+        removed: List[str]
+    ) -> ProductVectorSnapshot:
+        """
+        Monta o novo snapshot (roda em thread): remove vetores de produtos
+        alterados/removidos e adiciona os novos vetores
+        """
+        dropped = set(removed) | {pid for pid, _ in changed}
+        keep = [row for row, pid in enumerate(current.product_ids) if pid not in dropped]
+        dimension = vectors.shape[1] if len(vectors) else current.embeddings.shape[1]
+
+        new_ids = np.arange(current.next_vector_id, current.next_vector_id + len(changed), dtype=np.int64)
+        product_ids = [current.product_ids[row] for row in keep] + [pid for pid, _ in changed]
+        embeddings = np.vstack([
+            current.embeddings[keep].reshape(-1, dimension),
+            vectors.reshape(-1, dimension)
+        ]).astype(np.float32)
+        vector_ids = np.concatenate([current.vector_ids[keep], new_ids])
+        hashes = {pid: current.hashes[pid] for pid in product_ids if pid in current.hashes}
+        hashes.update(changed)
+
+        removed_ids = np.setdiff1d(current.vector_ids, vector_ids)
+        index = current.index
+        rebuild = (
+            index is None
+            or (len(removed_ids) and not self.index_factory.supports_removal(index))
+            or self.index_factory.needs_training(index, len(embeddings), dimension)
+        )
+        if rebuild:
+            index = self.index_factory.build(embeddings, vector_ids)
+        else:
+            # Cópia: o índice atual continua atendendo buscas até a troca
+            index = self.index_factory.configure(faiss.deserialize_index(faiss.serialize_index(index)))
+            if len(removed_ids):
+                index.remove_ids(removed_ids)
+            if len(changed):
+                index.add_with_ids(vectors.astype(np.float32), new_ids)
+
+        snapshot = _snapshot(product_ids, embeddings, vector_ids, hashes, index)
+        self._save(snapshot)
+        return snapshot
+
+    async def update(self, products: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Sincroniza o índice com a listagem completa do catálogo
+
+        Returns:
+            Contagem de produtos embutidos, removidos e inalterados
+        """
+        async with self._update_lock:
+            current = self.snapshot
+            texts = {product_id(product): product_text(product) for product in products}
+            changed = [
+                (pid, self._hash(text)) for pid, text in texts.items()
+                if current.hashes.get(pid) != self._hash(text)
+            ]
+            removed = [pid for pid in current.product_ids if pid not in texts]
+            summary = {
+                "embedded": len(changed),
+                "removed": len(removed),
+                "unchanged": len(texts) - len(changed)
+            }
+            if not changed and not removed:
+                return summary
+
+            # Sincronização só com remoções: nada a embutir
+            vectors = np.zeros((0, 0), dtype=np.float32)
+            if changed:
+                vectors = await self._embed([texts[pid] for pid, _ in changed])
+            self.snapshot = await asyncio.to_thread(self._apply, current, changed, vectors, removed)
+            self.updates += 1
+            self.embedded += len(changed)
+            print(f"Índice vetorial do catálogo atualizado: {summary}")
+            return summary
+
+    async def _query_embedding(self, query: str) -> np.ndarray:
+        if self.local_embedder is not None:
+            return self.local_embedder.embed([query])
+
+        embedding = await self.query_cache.get(query, self.embedding_model)
+        if embedding is None:
+            vector = await self.llm_client.create_embedding(query, self.embedding_model)
+            embedding = await self.query_cache.set(query, self.embedding_model, vector)
+        query_embedding = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(query_embedding)
+        return query_embedding
+
+    async def search(self, query: str, k: int = 10, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Produtos semanticamente próximos da consulta
+
+        Returns:
+            Lista de (id do produto, similaridade) com similaridade >= threshold
+        """
+        snapshot = self.snapshot
+        if not snapshot.product_ids:
+            return []
+
+        query_embedding = await self._query_embedding(query)
+        candidates = k * 2 if self.index_factory.quantized else k
+        _, found = snapshot.index.search(query_embedding, candidates)
+
+        results = []
+        for vector_id in found[0]:
+            row = snapshot.row_by_vector_id.get(int(vector_id))
+            if row is None:
+                continue
+            # Score exato com o vetor salvo (o do índice pode ser aproximado)
+            score = float(np.dot(query_embedding[0], snapshot.embeddings[row]))
+            if score >= threshold:
+                results.append((snapshot.product_ids[row], score))
+
+        results.sort(key=lambda item: -item[1])
+        return results[:k]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna o estado do índice vetorial do catálogo
+        """
+        return {
+            "products": len(self),
+            "index_type": self.index_factory.index_type,
+            "embedding_model": self.embedding_model,
+            "updates": self.updates,
+            "embedded": self.embedded,
+            "query_embedding_cache": self.query_cache.get_metrics()
+        }
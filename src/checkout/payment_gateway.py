@@ -1,9 +1,9 @@
 from typing import Dict, Any, Optional
 from decimal import Decimal
-import aiohttp
 from enum import Enum
 from dataclasses import dataclass
 from ..config import PAYMENT_GATEWAY_URL, PAYMENT_GATEWAY_KEY
+from ..utils.http_client import HTTPClient, http_client as shared_http_client
 
 class PaymentStatus(Enum):
     PENDING = "pending"
@@ -31,7 +31,8 @@ class PaymentRequest:
         }
 
 class PaymentGateway:
-    def __init__(self):
+    def __init__(self, http_client: Optional[HTTPClient] = None):
+        self.http_client = http_client or shared_http_client
         self.base_url = PAYMENT_GATEWAY_URL
         self.api_key = PAYMENT_GATEWAY_KEY
         self.headers = {
@@ -43,29 +44,27 @@ class PaymentGateway:
         """
         Cria uma nova transação de pagamento
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/payments",
-                json=payment_request.to_dict(),
-                headers=self.headers
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                raise PaymentError(f"Erro ao criar pagamento: {await response.text()}")
+        async with self.http_client.post(
+            f"{self.base_url}/payments",
+            json=payment_request.to_dict(),
+            headers=self.headers
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            raise PaymentError(f"Erro ao criar pagamento: {await response.text()}")
     
     async def get_payment_status(self, payment_id: str) -> PaymentStatus:
         """
         Verifica o status de um pagamento
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/payments/{payment_id}",
-                headers=self.headers
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return PaymentStatus(data['status'])
-                raise PaymentError(f"Erro ao verificar status do pagamento: {await response.text()}")
+        async with self.http_client.get(
+            f"{self.base_url}/payments/{payment_id}",
+            headers=self.headers
+        ) as response:
+            if response.status == 200:
+                data = await response.json()
+                return PaymentStatus(data['status'])
+            raise PaymentError(f"Erro ao verificar status do pagamento: {await response.text()}")
 
 class PaymentError(Exception):
     pass
@@ -11,6 +11,87 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Configurações da API
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', 16))
+LLM_SINGLE_FLIGHT = os.getenv('LLM_SINGLE_FLIGHT', 'True').lower() == 'true'
+
+# Configurações do cache de intenções
+INTENT_CACHE_SIZE = int(os.getenv('INTENT_CACHE_SIZE', 10000))
+INTENT_CACHE_TTL = int(os.getenv('INTENT_CACHE_TTL', 3600))
+
+# Roteamento de intenções: "llm" (sempre chat completion) ou "embedding"
+# (classificação local por vizinhos, escalando para a IA se a margem for baixa)
+INTENT_ROUTING_MODE = os.getenv('INTENT_ROUTING_MODE', 'llm')
+INTENT_ROUTER_MARGIN = float(os.getenv('INTENT_ROUTER_MARGIN', 0.03))
+INTENT_ROUTER_MIN_SCORE = float(os.getenv('INTENT_ROUTER_MIN_SCORE', 0.8))
+
+# Classificação de intenções em lote (janela em ms ou tamanho máximo do lote)
+INTENT_BATCHING = os.getenv('INTENT_BATCHING', 'False').lower() == 'true'
+INTENT_BATCH_WINDOW_MS = float(os.getenv('INTENT_BATCH_WINDOW_MS', 20))
+INTENT_BATCH_MAX_SIZE = int(os.getenv('INTENT_BATCH_MAX_SIZE', 16))
+
+# Intervalo (s) para recarregar a lista de marcas usada pelo fallback
+BRAND_REFRESH_INTERVAL = int(os.getenv('BRAND_REFRESH_INTERVAL', 600))
+
+# Memória de conversa por usuário e orçamento de tokens do prompt
+CONVERSATION_MAX_USERS = int(os.getenv('CONVERSATION_MAX_USERS', 100000))
+CONVERSATION_MAX_TURNS = int(os.getenv('CONVERSATION_MAX_TURNS', 20))
+CONVERSATION_MAX_TOKENS = int(os.getenv('CONVERSATION_MAX_TOKENS', 2000))
+CONVERSATION_IDLE_TTL = int(os.getenv('CONVERSATION_IDLE_TTL', 1800))
+SUMMARY_MAX_TOKENS = int(os.getenv('SUMMARY_MAX_TOKENS', 200))
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', 1500))
+
+# Cache de embeddings das perguntas da FAQ (caminho vazio desativa o disco)
+FAQ_EMBEDDING_CACHE_SIZE = int(os.getenv('FAQ_EMBEDDING_CACHE_SIZE', 10000))
+FAQ_EMBEDDING_CACHE_PATH = os.getenv('FAQ_EMBEDDING_CACHE_PATH', '')
+# Limite de linhas no SQLite (~6 KB cada com ada-002); as mais antigas saem primeiro. 0 = sem limite
+FAQ_EMBEDDING_CACHE_DISK_MAX_ROWS = int(os.getenv('FAQ_EMBEDDING_CACHE_DISK_MAX_ROWS', 20000))
+
+# Ingestão de FAQs: perguntas por requisição de embedding e lotes simultâneos
+FAQ_EMBEDDING_BATCH_SIZE = int(os.getenv('FAQ_EMBEDDING_BATCH_SIZE', 256))
+FAQ_INGEST_CONCURRENCY = int(os.getenv('FAQ_INGEST_CONCURRENCY', 4))
+
+# Índice da FAQ: "flat" (exato), "sq8" (int8), "pq", "hnsw", "ivf_flat" ou "ivf_pq"
+FAQ_INDEX_TYPE = os.getenv('FAQ_INDEX_TYPE', 'flat')
+FAQ_HNSW_M = int(os.getenv('FAQ_HNSW_M', 32))
+FAQ_HNSW_EF_CONSTRUCTION = int(os.getenv('FAQ_HNSW_EF_CONSTRUCTION', 200))
+FAQ_HNSW_EF_SEARCH = int(os.getenv('FAQ_HNSW_EF_SEARCH', 64))
+FAQ_IVF_NLIST = int(os.getenv('FAQ_IVF_NLIST', 0))  # 0 = automático (~4·√n)
+FAQ_IVF_NPROBE = int(os.getenv('FAQ_IVF_NPROBE', 16))
+FAQ_PQ_M = int(os.getenv('FAQ_PQ_M', 16))
+FAQ_PQ_NBITS = int(os.getenv('FAQ_PQ_NBITS', 8))
+# Vetores da FAQ em disco/memória: "float32" ou "float16" (metade do espaço)
+FAQ_EMBEDDING_DTYPE = os.getenv('FAQ_EMBEDDING_DTYPE', 'float32')
+# Candidatos do índice re-pontuados com os vetores originais (índices sq8/pq/ivf_pq)
+FAQ_RERANK_CANDIDATES = int(os.getenv('FAQ_RERANK_CANDIDATES', 20))
+
+# Busca híbrida da FAQ: "openai" ou "local" (hashing, sem rede) para embeddings
+FAQ_EMBEDDER = os.getenv('FAQ_EMBEDDER', 'openai')
+FAQ_LOCAL_EMBEDDING_DIM = int(os.getenv('FAQ_LOCAL_EMBEDDING_DIM', 512))
+FAQ_LEXICAL_THRESHOLD = float(os.getenv('FAQ_LEXICAL_THRESHOLD', 0.9))  # cobertura BM25 que responde sem embedding
+FAQ_LEXICAL_WEIGHT = float(os.getenv('FAQ_LEXICAL_WEIGHT', 0.3))
+FAQ_HYBRID_CANDIDATES = int(os.getenv('FAQ_HYBRID_CANDIDATES', 5))
+
+# Intervalo (segundos) para verificar mudanças nos arquivos da FAQ; 0 desativa
+FAQ_RELOAD_INTERVAL = int(os.getenv('FAQ_RELOAD_INTERVAL', 30))
+
+# Mapeia vetores e índice da FAQ do disco (somente leitura, compartilhado entre processos;
+# o índice só é mapeado com faiss >= 1.11, antes disso é lido para a memória)
+FAQ_INDEX_MMAP = os.getenv('FAQ_INDEX_MMAP', 'True').lower() == 'true'
+
+# Apresentação de produtos: "template" (determinística) ou "llm" (texto gerado)
+PRODUCT_PRESENTATION_MODE = os.getenv('PRODUCT_PRESENTATION_MODE', 'template')
+PRODUCT_LOCALE = os.getenv('PRODUCT_LOCALE', 'pt_BR')
+
+# Roteamento especulativo: busca FAQ e catálogo em paralelo à detecção de intenção
+SPECULATIVE_ROUTING = os.getenv('SPECULATIVE_ROUTING', 'False').lower() == 'true'
+
+# Prazo total por requisição em /message e orçamento (s) de cada etapa
+REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', 20))
+STAGE_TIMEOUT_INTENT = float(os.getenv('STAGE_TIMEOUT_INTENT', 3))
+STAGE_TIMEOUT_EXTRACTION = float(os.getenv('STAGE_TIMEOUT_EXTRACTION', 3))
+STAGE_TIMEOUT_FAQ = float(os.getenv('STAGE_TIMEOUT_FAQ', 3))
+STAGE_TIMEOUT_CATALOG = float(os.getenv('STAGE_TIMEOUT_CATALOG', 5))
+STAGE_TIMEOUT_COMPLETION = float(os.getenv('STAGE_TIMEOUT_COMPLETION', 15))
 
 # Configurações do banco de dados
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///dados/db.sqlite')
@@ -23,6 +104,38 @@ DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 CATALOG_API_URL = os.getenv('CATALOG_API_URL')
 CATALOG_API_KEY = os.getenv('CATALOG_API_KEY')
 
+# Cache das leituras do catálogo (TTL em segundos por endpoint)
+CATALOG_CACHE_ENABLED = os.getenv('CATALOG_CACHE_ENABLED', 'True').lower() == 'true'
+CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', 5000))
+CATALOG_CACHE_PRODUCT_TTL = float(os.getenv('CATALOG_CACHE_PRODUCT_TTL', 300))
+CATALOG_CACHE_SEARCH_TTL = float(os.getenv('CATALOG_CACHE_SEARCH_TTL', 120))
+# Marcas e categorias (/start)
+CATALOG_CACHE_START_TTL = float(os.getenv('CATALOG_CACHE_START_TTL', 3600))
+# Produtos inexistentes (404) e buscas sem resultado
+CATALOG_CACHE_NEGATIVE_TTL = float(os.getenv('CATALOG_CACHE_NEGATIVE_TTL', 60))
+# Tempo após expirar em que o valor antigo ainda é servido enquanto é atualizado
+CATALOG_CACHE_STALE_TTL = float(os.getenv('CATALOG_CACHE_STALE_TTL', 600))
+# Chamadas simultâneas à API em CatalogAPI.get_products
+CATALOG_BULK_CONCURRENCY = int(os.getenv('CATALOG_BULK_CONCURRENCY', 8))
+
+# Cópia local do catálogo: buscas respondidas em processo, mesmo com a API fora do ar
+CATALOG_MIRROR_ENABLED = os.getenv('CATALOG_MIRROR_ENABLED', 'False').lower() == 'true'
+CATALOG_MIRROR_PATH = os.getenv('CATALOG_MIRROR_PATH', 'dados/catalog_mirror.json.gz')
+# Intervalo (segundos) entre sincronizações com a API
+CATALOG_MIRROR_REFRESH_INTERVAL = int(os.getenv('CATALOG_MIRROR_REFRESH_INTERVAL', 600))
+CATALOG_MIRROR_PAGE_SIZE = int(os.getenv('CATALOG_MIRROR_PAGE_SIZE', 100))
+CATALOG_MIRROR_SEARCH_LIMIT = int(os.getenv('CATALOG_MIRROR_SEARCH_LIMIT', 50))
+
+# Busca semântica de produtos (índice vetorial sobre a cópia local; requer CATALOG_MIRROR_ENABLED)
+CATALOG_SEMANTIC_SEARCH = os.getenv('CATALOG_SEMANTIC_SEARCH', 'False').lower() == 'true'
+# Índice: mesmos tipos de FAQ_INDEX_TYPE; embedder: "openai" ou "local"
+CATALOG_VECTOR_INDEX_TYPE = os.getenv('CATALOG_VECTOR_INDEX_TYPE', 'flat')
+CATALOG_EMBEDDER = os.getenv('CATALOG_EMBEDDER', FAQ_EMBEDDER)
+CATALOG_VECTOR_PATH = os.getenv('CATALOG_VECTOR_PATH', 'dados/catalog_vectors')
+# Similaridade mínima para um produto entrar no resultado
+CATALOG_SEMANTIC_THRESHOLD = float(os.getenv('CATALOG_SEMANTIC_THRESHOLD', 0.78))
+CATALOG_SEMANTIC_LIMIT = int(os.getenv('CATALOG_SEMANTIC_LIMIT', 10))
+
 # Configurações do servidor
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 HOST = os.getenv('HOST', '0.0.0.0')
@@ -31,6 +144,18 @@ PORT = int(os.getenv('PORT', 5000))
 PAYMENT_GATEWAY_URL = os.getenv('PAYMENT_GATEWAY_URL')
 PAYMENT_GATEWAY_KEY = os.getenv('PAYMENT_GATEWAY_KEY')
 
+# Cliente HTTP compartilhado (catálogo, pagamento e WhatsApp)
+# Conexões simultâneas no pool (0 = sem limite), no total e por host
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', 100))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', 20))
+# Segundos que uma conexão ociosa fica aberta para reuso (keep-alive)
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', 30))
+# Segundos de cache das resoluções de DNS (0 desativa)
+HTTP_DNS_CACHE_TTL = int(os.getenv('HTTP_DNS_CACHE_TTL', 300))
+# Timeouts padrão (segundos); o catálogo usa o orçamento da etapa
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 30))
+
 # Configurações do WhatsApp
 WHATSAPP_API_URL = os.getenv('WHATSAPP_API_URL')
 WHATSAPP_API_KEY = os.getenv('WHATSAPP_API_KEY')
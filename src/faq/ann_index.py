@@ -0,0 +1,186 @@
+from typing import Dict, Any, Optional
+import faiss
+import numpy as np
+import math
+
+INDEX_TYPES = ("flat", "sq8", "pq", "hnsw", "ivf_flat", "ivf_pq")
+
+# Índices que guardam códigos aproximados (o score final deve usar os vetores originais)
+QUANTIZED_TYPES = ("sq8", "pq", "ivf_pq")
+
+# Pontos de treino por centróide usados pelo k-means do FAISS
+TRAINING_POINTS_PER_CENTROID = 64
+
+class ANNIndexFactory:
+    """
+    Cria índices FAISS (exato ou aproximado) para busca por similaridade de cosseno.
+
+    Todos os índices aceitam ids explícitos (add_with_ids). "sq8" (int8 por
+    dimensão) e "pq" comprimem os vetores sem particionar a base. Bases
+    pequenas demais para treinar IVF/PQ usam o índice exato.
+    """
+
+    def __init__(
+        self,
+        index_type: str = "flat",
+        hnsw_m: int = 32,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+        ivf_nlist: int = 0,
+        ivf_nprobe: int = 16,
+        pq_m: int = 16,
+        pq_nbits: int = 8
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Tipo de índice inválido: {index_type} (use {', '.join(INDEX_TYPES)})")
+
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Parâmetros de construção; um índice salvo só é reaproveitado se forem iguais
+        """
+        return {
+            "type": self.index_type,
+            "hnsw_m": self.hnsw_m,
+            "hnsw_ef_construction": self.hnsw_ef_construction,
+            "ivf_nlist": self.ivf_nlist,
+            "pq_m": self.pq_m,
+            "pq_nbits": self.pq_nbits
+        }
+
+    def nlist_for(self, count: int) -> int:
+        """Número de listas IVF (automático: ~4·√n)"""
+        nlist = self.ivf_nlist or int(4 * math.sqrt(max(count, 1)))
+        return max(1, min(nlist, count))
+
+    def spec(self, dimension: int, count: int) -> str:
+        """
+        String do index_factory do FAISS para a base informada
+        """
+        if self.index_type == "hnsw":
+            return f"IDMap2,HNSW{self.hnsw_m},Flat"
+
+        if self.index_type == "sq8":
+            return "IDMap2,SQ8"
+
+        if self.index_type == "pq":
+            self._check_pq(dimension)
+            if count >= 2 ** self.pq_nbits:
+                return f"IDMap2,PQ{self.pq_m}x{self.pq_nbits}"
+            return "IDMap2,Flat"
+
+        if self.index_type in ("ivf_flat", "ivf_pq"):
+            nlist = self.nlist_for(count)
+            min_count = nlist
+            if self.index_type == "ivf_pq":
+                self._check_pq(dimension)
+                min_count = max(nlist, 2 ** self.pq_nbits)
+
+            if count >= min_count and count > 1:
+                if self.index_type == "ivf_flat":
+                    return f"IVF{nlist},Flat"
+                return f"IVF{nlist},PQ{self.pq_m}x{self.pq_nbits}"
+
+        return "IDMap2,Flat"
+
+    def _check_pq(self, dimension: int):
+        if dimension % self.pq_m != 0:
+            raise ValueError(f"FAQ_PQ_M={self.pq_m} precisa dividir a dimensão {dimension}")
+
+    @property
+    def quantized(self) -> bool:
+        """Scores do índice são aproximados e precisam de re-score"""
+        return self.index_type in QUANTIZED_TYPES
+
+    def build(self, vectors: np.ndarray, ids: np.ndarray) -> faiss.Index:
+        """
+        Cria, treina (se necessário) e popula o índice
+
+        Args:
+            vectors: Vetores normalizados (float32)
+            ids: Id de cada vetor
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        count, dimension = vectors.shape
+
+        spec = self.spec(dimension, count)
+        if self.index_type != "flat" and spec == "IDMap2,Flat":
+            print(f"Poucos vetores ({count}) para treinar {self.index_type}, usando índice exato")
+        index = faiss.index_factory(dimension, spec, faiss.METRIC_INNER_PRODUCT)
+
+        hnsw = self._hnsw(index)
+        if hnsw is not None:
+            hnsw.hnsw.efConstruction = self.hnsw_ef_construction
+
+        if not index.is_trained:
+            index.train(self._training_sample(vectors, index))
+
+        index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype=np.int64))
+        self.configure(index)
+        return index
+
+    def configure(self, index: faiss.Index) -> faiss.Index:
+        """Aplica os parâmetros de busca (efSearch / nprobe)"""
+        hnsw = self._hnsw(index)
+        if hnsw is not None:
+            hnsw.hnsw.efSearch = self.hnsw_ef_search
+
+        ivf = self._ivf(index)
+        if ivf is not None:
+            ivf.nprobe = min(self.ivf_nprobe, ivf.nlist)
+
+        return index
+
+    def needs_training(self, index: faiss.Index, count: int, dimension: int) -> bool:
+        """
+        Indica se um índice exato usado por falta de dados já pode ser trocado
+        pelo índice aproximado configurado
+        """
+        if self.index_type not in ("pq", "ivf_flat", "ivf_pq"):
+            return False
+        if not isinstance(self._inner(index), faiss.IndexFlat):
+            return False
+        return self.spec(dimension, count) != "IDMap2,Flat"
+
+    @staticmethod
+    def supports_removal(index: faiss.Index) -> bool:
+        """HNSW não remove vetores; nesse caso o índice precisa ser recriado"""
+        return ANNIndexFactory._hnsw(index) is None
+
+    @staticmethod
+    def _inner(index: faiss.Index) -> faiss.Index:
+        if isinstance(index, faiss.IndexIDMap):
+            return faiss.downcast_index(index.index)
+        return index
+
+    @staticmethod
+    def _hnsw(index: faiss.Index) -> Optional[faiss.IndexHNSW]:
+        inner = ANNIndexFactory._inner(index)
+        return inner if isinstance(inner, faiss.IndexHNSW) else None
+
+    @staticmethod
+    def _ivf(index: faiss.Index) -> Optional[faiss.IndexIVF]:
+        try:
+            return faiss.extract_index_ivf(index)
+        except RuntimeError:
+            return None
+
+    @staticmethod
+    def _training_sample(vectors: np.ndarray, index: faiss.Index) -> np.ndarray:
+        """Amostra de treino limitada, para não rodar o k-means sobre milhões de vetores"""
+        ivf = ANNIndexFactory._ivf(index)
+        centroids = max(ivf.nlist if ivf is not None else 1, 256)
+        max_points = centroids * TRAINING_POINTS_PER_CENTROID
+        if len(vectors) <= max_points:
+            return vectors
+
+        rows = np.random.default_rng(0).choice(len(vectors), max_points, replace=False)
+        return vectors[np.sort(rows)]
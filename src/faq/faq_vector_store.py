@@ -1,23 +1,142 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Set, Tuple
+from dataclasses import dataclass, replace
 import faiss
 import numpy as np
 from openai import OpenAI
-from src.config import OPENAI_API_KEY
+from src.config import (
+    OPENAI_API_KEY,
+    STAGE_TIMEOUT_FAQ,
+    FAQ_EMBEDDING_CACHE_SIZE,
+    FAQ_EMBEDDING_CACHE_PATH,
+    FAQ_EMBEDDING_CACHE_DISK_MAX_ROWS,
+    FAQ_EMBEDDING_BATCH_SIZE,
+    FAQ_INDEX_TYPE,
+    FAQ_HNSW_M,
+    FAQ_HNSW_EF_CONSTRUCTION,
+    FAQ_HNSW_EF_SEARCH,
+    FAQ_IVF_NLIST,
+    FAQ_IVF_NPROBE,
+    FAQ_PQ_M,
+    FAQ_PQ_NBITS,
+    FAQ_EMBEDDING_DTYPE,
+    FAQ_RERANK_CANDIDATES,
+    FAQ_EMBEDDER,
+    FAQ_LOCAL_EMBEDDING_DIM,
+    FAQ_LEXICAL_THRESHOLD,
+    FAQ_LEXICAL_WEIGHT,
+    FAQ_HYBRID_CANDIDATES,
+    FAQ_INDEX_MMAP
+)
+from src.faq.ann_index import ANNIndexFactory
+from src.faq.lexical_index import LexicalIndex
+from src.faq.local_embedder import HashingEmbedder
+from src.llm.llm_client import LLMClient
+from src.llm.embeddings import embed_texts
+from src.cache.embedding_cache import EmbeddingCache
+from src.utils.deadline import run_with_budget
+from src.utils.text import normalize_text
+import asyncio
+import csv
+import hashlib
 import json
 import os
 
+# Mapeamento do índice do disco: IO_FLAG_MMAP_IFC só existe a partir do faiss 1.11
+INDEX_MMAP_FLAG = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+
+@dataclass(frozen=True)
+class FAQSnapshot:
+    """
+    Estado imutável da base de FAQ. Buscas leem um snapshot inteiro; alterações
+    e recargas montam um novo e o trocam de uma vez.
+    """
+    faq_data: List[Dict[str, Any]]
+    embeddings: np.ndarray
+    vector_ids: np.ndarray
+    row_by_vector_id: Dict[int, int]
+    index: faiss.Index
+    lexical_index: LexicalIndex
+    
+    @property
+    def next_vector_id(self) -> int:
+        return int(self.vector_ids.max()) + 1 if len(self.vector_ids) else 0
+
 class FAQVectorStore:
-    def __init__(self):
+    def __init__(self, llm_client: Optional[LLMClient] = None):
+        # Cliente síncrono usado apenas na construção do índice (inicialização)
         self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.llm_client = llm_client or LLMClient()
         self.dimension = 1536  # OpenAI embedding dimension
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
-        self.faq_data = []
-        self.embeddings_file = "dados/faq_embeddings.json"
+        # Tipo de índice (exato, HNSW, IVF-Flat, IVF-PQ) e parâmetros de busca
+        self.index_factory = ANNIndexFactory(
+            index_type=FAQ_INDEX_TYPE,
+            hnsw_m=FAQ_HNSW_M,
+            hnsw_ef_construction=FAQ_HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=FAQ_HNSW_EF_SEARCH,
+            ivf_nlist=FAQ_IVF_NLIST,
+            ivf_nprobe=FAQ_IVF_NPROBE,
+            pq_m=FAQ_PQ_M,
+            pq_nbits=FAQ_PQ_NBITS
+        )
+        # float16 reduz pela metade o arquivo e a memória dos vetores originais
+        if FAQ_EMBEDDING_DTYPE not in ("float32", "float16"):
+            raise ValueError(f"FAQ_EMBEDDING_DTYPE inválido: {FAQ_EMBEDDING_DTYPE}")
+        self.embedding_dtype = np.dtype(FAQ_EMBEDDING_DTYPE)
+        # Vetores normalizados em .npy (lidos via mmap) + metadados em JSON
+        self.embeddings_file = "dados/faq_embeddings.npy"
+        self.metadata_file = "dados/faq_metadata.json"
+        # Índice treinado, para não refazer k-means/HNSW a cada inicialização
+        self.index_file = "dados/faq_index.faiss"
+        # Formato antigo (JSON com vetores em texto), migrado automaticamente
+        self.legacy_embeddings_file = "dados/faq_embeddings.json"
+        self.embedding_model = "text-embedding-ada-002"
+        # Vetores e índice mapeados do disco: workers no mesmo host compartilham o page cache
+        self.index_mmap = FAQ_INDEX_MMAP
+        if self.index_mmap and INDEX_MMAP_FLAG is None:
+            print(f"faiss {faiss.__version__} não mapeia índices do disco; "
+                  "o índice da FAQ será lido para a memória (os vetores continuam mapeados)")
+        # Embedder local (sem rede) substitui a API de embeddings quando configurado
+        self.local_embedder = None
+        if FAQ_EMBEDDER == "local":
+            self.local_embedder = HashingEmbedder(FAQ_LOCAL_EMBEDDING_DIM)
+            self.embedding_model = self.local_embedder.model_name
+        self.lexical_hits = 0
+        self.vector_hits = 0
+        self.lexical_fallbacks = 0
+        self.reloads = 0
+        # Serializa alterações e recargas; a busca não usa lock
+        self._write_lock = asyncio.Lock()
+        # Assinatura (mtime, tamanho) dos metadados salvos, usada pelo watcher
+        self._files_signature = None
+        # Cache de embeddings das perguntas recebidas (memória + SQLite opcional)
+        self.query_cache = EmbeddingCache(
+            max_size=FAQ_EMBEDDING_CACHE_SIZE,
+            disk_path=FAQ_EMBEDDING_CACHE_PATH or None,
+            disk_max_rows=FAQ_EMBEDDING_CACHE_DISK_MAX_ROWS
+        )
         
         # Carrega FAQs existentes
-        self._load_faqs()
+        self._swap(self._load_faqs())
+    
+    # Leitura do snapshot atual
+    @property
+    def faq_data(self) -> List[Dict[str, Any]]:
+        return self.snapshot.faq_data
+    
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self.snapshot.embeddings
+    
+    @property
+    def index(self) -> faiss.Index:
+        return self.snapshot.index
+    
+    def _swap(self, snapshot: FAQSnapshot):
+        """Publica um novo snapshot (uma única atribuição)"""
+        self.dimension = int(snapshot.embeddings.shape[1])
+        self.snapshot = snapshot
     
-    def _load_faqs(self):
+    def _load_faqs(self) -> FAQSnapshot:
         """Carrega FAQs padrão"""
         default_faqs = [
             {
@@ -42,76 +161,587 @@ class FAQVectorStore:
             }
         ]
         
-        # Se não existir arquivo de embeddings, cria
-        if not os.path.exists(self.embeddings_file):
-            self._create_embeddings(default_faqs)
+        if os.path.exists(self.embeddings_file) and os.path.exists(self.metadata_file):
+            return self._load_embeddings()
+        elif os.path.exists(self.legacy_embeddings_file):
+            return self._migrate_legacy_embeddings()
         else:
-            self._load_embeddings()
+            # Se não existir arquivo de embeddings, cria
+            return self._create_embeddings(default_faqs)
     
-    def _create_embeddings(self, faqs: List[Dict[str, str]]):
+    def _create_embeddings(self, faqs: List[Dict[str, str]]) -> FAQSnapshot:
         """Cria embeddings para as FAQs"""
-        embeddings = []
+        faq_data = [self._prepare_entry(faq) for faq in faqs]
+        questions = [faq["pergunta"] for faq in faq_data]
         
-        for faq in faqs:
-            # Cria embedding da pergunta
-            response = self.client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=faq["pergunta"]
-            )
-            embedding = response.data[0].embedding
-            embeddings.append(embedding)
-            
-            self.faq_data.append(faq)
+        if self.local_embedder is not None:
+            embeddings = self.local_embedder.embed(questions)
+        else:
+            embeddings = []
+            # Uma requisição por lote de perguntas, não uma por FAQ
+            for start in range(0, len(questions), FAQ_EMBEDDING_BATCH_SIZE):
+                response = self.client.embeddings.create(
+                    model=self.embedding_model,
+                    input=questions[start:start + FAQ_EMBEDDING_BATCH_SIZE]
+                )
+                embeddings.extend(
+                    item.embedding for item in sorted(response.data, key=lambda d: d.index)
+                )
         
         # Adiciona ao índice FAISS
         embeddings_array = np.array(embeddings, dtype=np.float32)
         faiss.normalize_L2(embeddings_array)  # Normaliza para cosine similarity
-        self.index.add(embeddings_array)
+        snapshot = self._build_snapshot(faq_data, embeddings_array)
         
         # Salva embeddings
-        self._save_embeddings(embeddings)
+        return self._persist(snapshot)
+    
+    def _build_snapshot(
+        self,
+        faq_data: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+        vector_ids: Optional[np.ndarray] = None,
+        index: Optional[faiss.Index] = None,
+        lexical_index: Optional[LexicalIndex] = None
+    ) -> FAQSnapshot:
+        """Monta um snapshot a partir de vetores já normalizados, criando o que faltar"""
+        if embeddings.dtype != self.embedding_dtype:
+            embeddings = embeddings.astype(self.embedding_dtype)
+        if vector_ids is None:
+            vector_ids = np.arange(len(embeddings), dtype=np.int64)
+        if index is None:
+            index = self.index_factory.build(embeddings, vector_ids)
+        if lexical_index is None:
+            lexical_index = LexicalIndex()
+            for faq, vector_id in zip(faq_data, vector_ids):
+                self._index_text(lexical_index, int(vector_id), faq)
+        
+        return FAQSnapshot(
+            faq_data=faq_data,
+            embeddings=embeddings,
+            vector_ids=vector_ids,
+            row_by_vector_id={int(vector_id): row for row, vector_id in enumerate(vector_ids)},
+            index=index,
+            lexical_index=lexical_index
+        )
+    
+    @staticmethod
+    def _index_text(lexical_index: LexicalIndex, vector_id: int, faq: Dict[str, Any]):
+        """Indexa pergunta (peso maior) e resposta no índice lexical"""
+        lexical_index.add(vector_id, faq["resposta"], boost_text=faq["pergunta"])
     
-    def _save_embeddings(self, embeddings: List[List[float]]):
-        """Salva embeddings em arquivo"""
-        data = {
-            "faqs": self.faq_data,
-            "embeddings": embeddings
+    def _content_hash(self, pergunta: str) -> str:
+        """Hash do texto embutido; só muda quando o embedding precisa ser refeito"""
+        return hashlib.sha256(f"{self.embedding_model}\n{pergunta}".encode("utf-8")).hexdigest()
+    
+    def _prepare_entry(self, faq: Dict[str, Any]) -> Dict[str, Any]:
+        """Normaliza uma FAQ, garantindo id e hash de conteúdo"""
+        pergunta = faq["pergunta"].strip()
+        entry = {**faq, "pergunta": pergunta, "resposta": faq["resposta"].strip()}
+        # Sem id explícito, deriva da pergunta: reimportar o mesmo arquivo não duplica
+        entry["id"] = str(faq.get("id") or hashlib.sha1(
+            normalize_text(pergunta).encode("utf-8")
+        ).hexdigest()[:16])
+        entry["hash"] = self._content_hash(pergunta)
+        return entry
+    
+    def _save_embeddings(self, snapshot: FAQSnapshot):
+        """Salva vetores (.npy), índice e metadados (JSON) de forma atômica"""
+        metadata = {
+            "version": 1,
+            "model": self.embedding_model,
+            "dimension": int(snapshot.embeddings.shape[1]),
+            "dtype": self.embedding_dtype.name,
+            "normalized": True,
+            "count": len(snapshot.faq_data),
+            "index": self.index_factory.describe(),
+            "vector_ids": snapshot.vector_ids.tolist(),
+            "faqs": snapshot.faq_data
         }
         
-        os.makedirs("dados", exist_ok=True)
-        with open(self.embeddings_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.makedirs(os.path.dirname(self.embeddings_file) or ".", exist_ok=True)
+        
+        # Sufixo com o pid: vários workers podem gravar ao mesmo tempo na inicialização
+        tmp_embeddings = f"{self.embeddings_file}.{os.getpid()}.tmp"
+        with open(tmp_embeddings, 'wb') as f:
+            np.save(f, np.ascontiguousarray(snapshot.embeddings, dtype=self.embedding_dtype))
+        
+        tmp_index = f"{self.index_file}.{os.getpid()}.tmp"
+        faiss.write_index(snapshot.index, tmp_index)
+        
+        tmp_metadata = f"{self.metadata_file}.{os.getpid()}.tmp"
+        with open(tmp_metadata, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        
+        # Metadados por último: quem lê os arquivos nunca vê vetores de outra versão
+        os.replace(tmp_embeddings, self.embeddings_file)
+        os.replace(tmp_index, self.index_file)
+        os.replace(tmp_metadata, self.metadata_file)
+        self._files_signature = self._signature()
+    
+    def _persist(self, snapshot: FAQSnapshot) -> FAQSnapshot:
+        """
+        Salva o snapshot e, com mmap ativo, troca vetores e índice em memória
+        pelas versões mapeadas dos arquivos recém-gravados
+        """
+        self._save_embeddings(snapshot)
+        if not self.index_mmap:
+            return snapshot
+        
+        return replace(
+            snapshot,
+            embeddings=np.load(self.embeddings_file, mmap_mode='r'),
+            index=self._read_index()
+        )
+    
+    def _read_index(self) -> faiss.Index:
+        """Lê o índice salvo; com mmap, os códigos ficam no page cache (somente leitura)"""
+        if self.index_mmap and INDEX_MMAP_FLAG is not None:
+            index = faiss.read_index(self.index_file, INDEX_MMAP_FLAG | faiss.IO_FLAG_READ_ONLY)
+        else:
+            index = faiss.read_index(self.index_file)
+        return self.index_factory.configure(index)
+    
+    def _writable_copy(self, index: faiss.Index) -> faiss.Index:
+        """
+        Cópia alterável do índice. clone_index de um índice mapeado compartilha o
+        mmap e não pode ser alterado; serializar gera uma cópia própria.
+        """
+        return self.index_factory.configure(faiss.deserialize_index(faiss.serialize_index(index)))
     
-    def _load_embeddings(self):
+    def _load_embeddings(self) -> FAQSnapshot:
         """Carrega embeddings do arquivo"""
-        with open(self.embeddings_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        signature = self._signature()
+        with open(self.metadata_file, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        
+        # mmap: o arquivo não é lido por inteiro nem re-normalizado na inicialização
+        embeddings = np.load(self.embeddings_file, mmap_mode='r')
+        if embeddings.shape[0] != len(metadata["faqs"]):
+            raise ValueError(
+                f"{self.embeddings_file} tem {embeddings.shape[0]} vetores, "
+                f"mas {self.metadata_file} descreve {len(metadata['faqs'])} FAQs"
+            )
         
-        self.faq_data = data["faqs"]
-        embeddings = data["embeddings"]
+        if metadata.get("model") != self.embedding_model:
+            # Embedder trocado: os vetores salvos não são comparáveis com as consultas
+            print(f"Embeddings da FAQ gerados com {metadata.get('model')}, recriando com {self.embedding_model}")
+            return self._create_embeddings(metadata["faqs"])
+        
+        # Arquivos gravados antes dos ids/hashes recebem os campos na carga
+        faq_data = [
+            faq if "id" in faq and "hash" in faq else self._prepare_entry(faq)
+            for faq in metadata["faqs"]
+        ]
+        
+        vector_ids = np.array(metadata.get("vector_ids", range(len(embeddings))), dtype=np.int64)
+        
+        # Reaproveita o índice treinado se foi criado com a mesma configuração
+        index = None
+        if metadata.get("index") == self.index_factory.describe() and os.path.exists(self.index_file):
+            index = self._read_index()
+            if index.ntotal != len(embeddings):
+                index = None
         
         # Reconstrói índice FAISS
-        embeddings_array = np.array(embeddings, dtype=np.float32)
+        snapshot = self._build_snapshot(faq_data, embeddings, vector_ids, index)
+        # Índice incompatível ou vetores salvos com outra precisão
+        if index is None or metadata.get("dtype", "float32") != self.embedding_dtype.name:
+            return self._persist(snapshot)
+        
+        self._files_signature = signature
+        return snapshot
+    
+    def _migrate_legacy_embeddings(self) -> FAQSnapshot:
+        """Converte o antigo faq_embeddings.json para o formato binário"""
+        with open(self.legacy_embeddings_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        # O formato antigo só tem vetores do ada-002
+        if self.local_embedder is not None:
+            return self._create_embeddings(data["faqs"])
+        
+        faq_data = [self._prepare_entry(faq) for faq in data["faqs"]]
+        embeddings_array = np.array(data["embeddings"], dtype=np.float32)
         faiss.normalize_L2(embeddings_array)
-        self.index.add(embeddings_array)
+        snapshot = self._build_snapshot(faq_data, embeddings_array)
+        
+        snapshot = self._persist(snapshot)
+        print(f"FAQs migradas de {self.legacy_embeddings_file} para {self.embeddings_file}")
+        return snapshot
+    
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        """Identifica a versão dos arquivos salvos (mtime e tamanho dos metadados)"""
+        try:
+            stat = os.stat(self.metadata_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
     
-    def search_faq(self, question: str, threshold: float = 0.7) -> Optional[str]:
+    async def reload(self) -> bool:
         """
-        Busca FAQ mais similar à pergunta
+        Recarrega a base dos arquivos em segundo plano e troca o snapshot de uma vez.
+        Buscas em andamento terminam com o snapshot antigo.
+        
+        Returns:
+            True se um novo snapshot foi publicado
         """
-        # Cria embedding da pergunta
-        response = self.client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=question
+        async with self._write_lock:
+            try:
+                # Leitura e construção do índice fora do event loop
+                snapshot = await asyncio.to_thread(self._load_faqs)
+            except Exception as e:
+                print(f"Erro ao recarregar FAQs, mantendo a versão atual: {str(e)}")
+                return False
+            
+            self._swap(snapshot)
+            self.reloads += 1
+        
+        print(f"FAQs recarregadas: {len(snapshot.faq_data)} entradas")
+        return True
+    
+    async def watch_files(self, interval: float):
+        """
+        Recarrega a base quando os arquivos salvos mudam (ex.: importação feita
+        por outro processo)
+        """
+        while True:
+            await asyncio.sleep(interval)
+            signature = self._signature()
+            if signature is not None and signature != self._files_signature:
+                await self.reload()
+    
+    async def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Cria embeddings normalizados em lotes, com concorrência limitada
+        
+        Args:
+            texts: Perguntas a serem embutidas
+        """
+        if self.local_embedder is not None:
+            return await asyncio.to_thread(self.local_embedder.embed, texts)
+        
+        return await embed_texts(self.llm_client, texts, self.embedding_model)
+    
+    async def upsert_faqs(self, faqs: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Adiciona ou atualiza FAQs sem reconstruir o índice. Só gera embeddings
+        para perguntas novas ou alteradas; mudar apenas a resposta não chama a API.
+        
+        Args:
+            faqs: Entradas com "pergunta", "resposta" e "id" opcional
+        
+        Returns:
+            Quantidade de FAQs adicionadas, atualizadas e inalteradas
+        """
+        entries = {}
+        for faq in faqs:
+            entry = self._prepare_entry(faq)
+            entries[entry["id"]] = entry
+        
+        async with self._write_lock:
+            current = self.snapshot
+            faq_data = list(current.faq_data)
+            row_by_id = {faq["id"]: row for row, faq in enumerate(faq_data)}
+            summary = {"added": 0, "updated": 0, "unchanged": 0}
+            to_embed = []
+            changed = set()
+            
+            for faq_id, entry in entries.items():
+                row = row_by_id.get(faq_id)
+                if row is None:
+                    to_embed.append(entry)
+                    summary["added"] += 1
+                elif faq_data[row]["hash"] != entry["hash"]:
+                    to_embed.append(entry)
+                    summary["updated"] += 1
+                elif faq_data[row] != entry:
+                    faq_data[row] = entry
+                    summary["updated"] += 1
+                else:
+                    summary["unchanged"] += 1
+                    continue
+                changed.add(faq_id)
+            
+            if not changed:
+                return summary
+            
+            vectors = None
+            if to_embed:
+                vectors = await self._embed_texts([entry["pergunta"] for entry in to_embed])
+            
+            # Cópia do índice, reconstrução e gravação fora do event loop
+            snapshot = await asyncio.to_thread(
+                self._upsert_snapshot, current, faq_data, to_embed, vectors, row_by_id, changed
+            )
+            self._swap(snapshot)
+        
+        return summary
+    
+    def _upsert_snapshot(
+        self,
+        current: FAQSnapshot,
+        faq_data: List[Dict[str, Any]],
+        to_embed: List[Dict[str, Any]],
+        vectors: Optional[np.ndarray],
+        row_by_id: Dict[str, int],
+        changed: Set[str]
+    ) -> FAQSnapshot:
+        """Monta e salva o snapshot com as FAQs alteradas (roda em thread)"""
+        embeddings, vector_ids, index = current.embeddings, current.vector_ids, current.index
+        if to_embed:
+            embeddings, vector_ids, index = self._apply_vectors(
+                current, faq_data, to_embed, vectors, row_by_id
+            )
+        
+        lexical_index = current.lexical_index.copy()
+        for faq, vector_id in zip(faq_data, vector_ids):
+            if faq["id"] in changed:
+                self._index_text(lexical_index, int(vector_id), faq)
+        
+        snapshot = self._build_snapshot(faq_data, embeddings, vector_ids, index, lexical_index)
+        return self._persist(snapshot)
+    
+    def _apply_vectors(
+        self,
+        current: FAQSnapshot,
+        faq_data: List[Dict[str, Any]],
+        entries: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        row_by_id: Dict[str, int]
+    ) -> Tuple[np.ndarray, np.ndarray, faiss.Index]:
+        """
+        Aplica vetores recém-criados sobre cópias da matriz e do índice do snapshot
+        atual (que continua atendendo buscas). Atualiza faq_data no lugar.
+        """
+        # Cópia em memória: a matriz carregada do disco é um mmap somente leitura
+        embeddings = np.array(current.embeddings, dtype=np.float32).reshape(-1, vectors.shape[1])
+        vector_ids = current.vector_ids
+        new_entries = []
+        new_vectors = []
+        updated_rows = []
+        
+        for entry, vector in zip(entries, vectors):
+            row = row_by_id.get(entry["id"])
+            if row is None:
+                new_entries.append(entry)
+                new_vectors.append(vector)
+                continue
+            
+            # Pergunta alterada: troca o vetor mantendo o id no índice
+            embeddings[row] = vector
+            faq_data[row] = entry
+            updated_rows.append(row)
+        
+        if new_entries:
+            new_ids = np.arange(
+                current.next_vector_id,
+                current.next_vector_id + len(new_entries),
+                dtype=np.int64
+            )
+            faq_data.extend(new_entries)
+            embeddings = np.vstack([embeddings, np.array(new_vectors, dtype=np.float32)])
+            vector_ids = np.concatenate([vector_ids, new_ids])
+        
+        # HNSW não remove vetores, e a base pode ter crescido o suficiente para
+        # treinar o índice aproximado configurado: nesses casos, recria
+        rebuild = (
+            (updated_rows and not self.index_factory.supports_removal(current.index))
+            or self.index_factory.needs_training(current.index, len(embeddings), embeddings.shape[1])
         )
-        query_embedding = np.array([response.data[0].embedding], dtype=np.float32)
+        if rebuild:
+            return embeddings, vector_ids, self.index_factory.build(embeddings, vector_ids)
+        
+        index = self._writable_copy(current.index)
+        if updated_rows:
+            updated_ids = vector_ids[updated_rows]
+            index.remove_ids(updated_ids)
+            index.add_with_ids(embeddings[updated_rows], updated_ids)
+        if new_entries:
+            index.add_with_ids(embeddings[-len(new_entries):], vector_ids[-len(new_entries):])
+        
+        return embeddings, vector_ids, index
+    
+    async def add_faq(self, pergunta: str, resposta: str, faq_id: Optional[str] = None) -> str:
+        """
+        Adiciona uma FAQ (ou atualiza, se o id já existir) e retorna seu id
+        """
+        entry = self._prepare_entry({"id": faq_id, "pergunta": pergunta, "resposta": resposta})
+        await self.upsert_faqs([entry])
+        return entry["id"]
+    
+    async def update_faq(
+        self,
+        faq_id: str,
+        pergunta: Optional[str] = None,
+        resposta: Optional[str] = None
+    ):
+        """
+        Atualiza pergunta e/ou resposta de uma FAQ existente
+        """
+        current = next((faq for faq in self.faq_data if faq["id"] == faq_id), None)
+        if current is None:
+            raise KeyError(f"FAQ não encontrada: {faq_id}")
+        
+        await self.upsert_faqs([{
+            **current,
+            "pergunta": pergunta if pergunta is not None else current["pergunta"],
+            "resposta": resposta if resposta is not None else current["resposta"]
+        }])
+    
+    async def delete_faqs(self, faq_ids: Iterable[str]) -> int:
+        """
+        Remove FAQs pelo id e retorna quantas foram removidas
+        """
+        faq_ids = set(faq_ids)
+        
+        async with self._write_lock:
+            current = self.snapshot
+            rows = [row for row, faq in enumerate(current.faq_data) if faq["id"] in faq_ids]
+            if not rows:
+                return 0
+            
+            # Cópia do índice, reconstrução e gravação fora do event loop
+            self._swap(await asyncio.to_thread(self._delete_snapshot, current, rows))
+        
+        return len(rows)
+    
+    def _delete_snapshot(self, current: FAQSnapshot, rows: List[int]) -> FAQSnapshot:
+        """Monta e salva o snapshot sem as linhas removidas (roda em thread)"""
+        removed_ids = current.vector_ids[rows]
+        
+        keep = np.ones(len(current.faq_data), dtype=bool)
+        keep[rows] = False
+        faq_data = [faq for row, faq in enumerate(current.faq_data) if keep[row]]
+        embeddings = np.asarray(current.embeddings)[keep]
+        vector_ids = current.vector_ids[keep]
+        
+        lexical_index = current.lexical_index.copy()
+        for vector_id in removed_ids:
+            lexical_index.remove(int(vector_id))
+        
+        if self.index_factory.supports_removal(current.index):
+            index = self._writable_copy(current.index)
+            index.remove_ids(removed_ids)
+        else:
+            index = self.index_factory.build(embeddings, vector_ids)
+        
+        snapshot = self._build_snapshot(faq_data, embeddings, vector_ids, index, lexical_index)
+        return self._persist(snapshot)
+    
+    async def delete_faq(self, faq_id: str) -> bool:
+        """
+        Remove uma FAQ pelo id
+        """
+        return await self.delete_faqs([faq_id]) == 1
+    
+    async def import_file(self, path: str) -> Dict[str, int]:
+        """
+        Importa FAQs em massa de um arquivo CSV ou JSONL
+        
+        Args:
+            path: Arquivo .csv (colunas pergunta, resposta e id opcional)
+                ou .jsonl (um objeto por linha)
+        """
+        if path.endswith(".jsonl"):
+            with open(path, 'r', encoding='utf-8') as f:
+                faqs = [json.loads(line) for line in f if line.strip()]
+        elif path.endswith(".csv"):
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                faqs = [row for row in csv.DictReader(f) if row.get("pergunta")]
+        else:
+            raise ValueError(f"Formato de arquivo não suportado: {path}")
+        
+        return await self.upsert_faqs(faqs)
+    
+    async def _query_embedding(self, question: str) -> Optional[np.ndarray]:
+        """
+        Embedding normalizado da pergunta, ou None se o provedor não responder
+        """
+        if self.local_embedder is not None:
+            return self.local_embedder.embed([question])
+        
+        # Cria embedding da pergunta (ou reaproveita do cache)
+        embedding = await self.query_cache.get(question, self.embedding_model)
+        if embedding is None:
+            try:
+                embedding = await run_with_budget(
+                    self.llm_client.create_embedding(question, self.embedding_model),
+                    STAGE_TIMEOUT_FAQ
+                )
+            except asyncio.TimeoutError:
+                print("Tempo esgotado ao criar embedding da pergunta")
+                return None
+            except Exception as e:
+                print(f"Erro ao criar embedding da pergunta: {str(e)}")
+                return None
+            embedding = await self.query_cache.set(question, self.embedding_model, embedding)
+        query_embedding = np.array([embedding], dtype=np.float32)
         faiss.normalize_L2(query_embedding)
+        return query_embedding
+    
+    async def search_faq(self, question: str, threshold: float = 0.7) -> Optional[str]:
+        """
+        Busca FAQ mais similar à pergunta (busca híbrida: BM25 + vetores)
+        
+        Uma correspondência lexical forte e única responde sem embedding; se o
+        provedor de embeddings falhar, usa apenas o resultado lexical.
+        """
+        # Toda a busca usa o mesmo snapshot, mesmo que uma recarga termine no meio
+        snapshot = self.snapshot
+        
+        lexical = snapshot.lexical_index.search(question, FAQ_HYBRID_CANDIDATES)
+        strong = [doc_id for doc_id, score in lexical if score >= FAQ_LEXICAL_THRESHOLD]
         
-        # Busca no índice
-        scores, indices = self.index.search(query_embedding, k=1)
+        if len(strong) == 1:
+            self.lexical_hits += 1
+            return snapshot.faq_data[snapshot.row_by_vector_id[strong[0]]]["resposta"]
         
-        if scores[0][0] >= threshold:
-            best_match_idx = indices[0][0]
-            return self.faq_data[best_match_idx]["resposta"]
+        query_embedding = await self._query_embedding(question)
+        if query_embedding is None:
+            # Sem embedding a tempo, segue só com o índice lexical
+            self.lexical_fallbacks += 1
+            if strong:
+                return snapshot.faq_data[snapshot.row_by_vector_id[strong[0]]]["resposta"]
+            return None
         
-        return None
\ No newline at end of file
+        # Busca no índice; com códigos quantizados, mais candidatos para o re-score
+        k = FAQ_RERANK_CANDIDATES if self.index_factory.quantized else FAQ_HYBRID_CANDIDATES
+        scores, indices = snapshot.index.search(query_embedding, k=k)
+        
+        lexical_scores = dict(lexical)
+        candidates = {int(vector_id) for vector_id in indices[0] if vector_id >= 0}
+        candidates.update(lexical_scores)
+        
+        best_match_idx, best_score = None, threshold
+        for vector_id in candidates:
+            row = snapshot.row_by_vector_id[vector_id]
+            # Índices quantizados aproximam o score; o limiar usa o vetor salvo (float32/float16)
+            vector_score = max(0.0, float(np.dot(query_embedding[0], snapshot.embeddings[row])))
+            # O score lexical só aumenta a similaridade, sem passar de 1
+            score = vector_score + FAQ_LEXICAL_WEIGHT * lexical_scores.get(vector_id, 0.0) * (1 - vector_score)
+            if score >= best_score:
+                best_match_idx, best_score = row, score
+        
+        if best_match_idx is not None:
+            self.vector_hits += 1
+            return snapshot.faq_data[best_match_idx]["resposta"]
+        
+        return None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna métricas da base de FAQ
+        """
+        return {
+            "entries": len(self.faq_data),
+            "index_type": self.index_factory.index_type,
+            "embedding_model": self.embedding_model,
+            "lexical_hits": self.lexical_hits,
+            "vector_hits": self.vector_hits,
+            "lexical_fallbacks": self.lexical_fallbacks,
+            "reloads": self.reloads,
+            "index_mmap": self.index_mmap,
+            "embedding_dtype": self.embedding_dtype.name,
+            "query_embedding_cache": self.query_cache.get_metrics()
+        }
@@ -0,0 +1,26 @@
+"""
+Importa FAQs em massa a partir de arquivos CSV ou JSONL
+
+Uso: python -m src.faq.import_faqs faqs.csv [outras.jsonl ...]
+"""
+import asyncio
+import sys
+from src.faq.faq_vector_store import FAQVectorStore
+
+async def main(paths):
+    store = FAQVectorStore()
+
+    for path in paths:
+        summary = await store.import_file(path)
+        print(
+            f"✅ {path}: {summary['added']} adicionadas, "
+            f"{summary['updated']} atualizadas, {summary['unchanged']} inalteradas"
+        )
+
+    print(f"📚 Total de FAQs: {len(store.faq_data)}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python -m src.faq.import_faqs <arquivo.csv|arquivo.jsonl> [...]")
+        sys.exit(1)
+    asyncio.run(main(sys.argv[1:]))
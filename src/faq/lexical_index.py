@@ -0,0 +1,118 @@
+from typing import Dict, List, Tuple
+from collections import Counter, defaultdict
+import math
+from src.utils.text import normalize_text
+
+# Palavras sem valor de busca (já sem acento, como sai de normalize_text)
+STOPWORDS = {
+    "a", "o", "as", "os", "um", "uma", "uns", "umas", "de", "do", "da", "dos", "das",
+    "e", "ou", "em", "no", "na", "nos", "nas", "ao", "aos", "para", "pra", "por",
+    "com", "sem", "que", "qual", "quais", "como", "quando", "onde", "se", "eu", "voce",
+    "voces", "me", "meu", "minha", "meus", "minhas", "seu", "sua", "ser", "tem",
+    "tenho", "posso", "pode", "faco", "fazer", "vcs", "vc", "oi", "ola"
+}
+
+def tokenize(text: str) -> List[str]:
+    """Termos de busca: texto normalizado, sem stopwords"""
+    return [token for token in normalize_text(text).split() if token not in STOPWORDS]
+
+class LexicalIndex:
+    """
+    Índice invertido BM25 em memória.
+
+    A ordenação usa BM25; o score retornado é a cobertura da consulta
+    (soma do IDF dos termos encontrados / soma do IDF de todos os termos),
+    um valor entre 0 e 1 que pode ser comparado com limiares e com a
+    similaridade de cosseno.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.doc_terms: Dict[int, Counter] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def add(self, doc_id: int, text: str, boost_text: str = ""):
+        """
+        Indexa (ou reindexa) um documento
+
+        Args:
+            doc_id: Id do documento
+            text: Texto indexado
+            boost_text: Texto com peso dobrado (ex.: a pergunta da FAQ)
+        """
+        self.remove(doc_id)
+
+        terms = Counter(tokenize(text))
+        for token in tokenize(boost_text):
+            terms[token] += 2
+
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = sum(terms.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term, frequency in terms.items():
+            self.postings[term][doc_id] = frequency
+
+    def remove(self, doc_id: int):
+        """Remove um documento do índice"""
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+
+    def copy(self) -> "LexicalIndex":
+        """Cópia independente (os Counters de cada documento não são alterados, só trocados)"""
+        clone = LexicalIndex(self.k1, self.b)
+        clone.postings = defaultdict(dict, {term: dict(docs) for term, docs in self.postings.items()})
+        clone.doc_terms = dict(self.doc_terms)
+        clone.doc_lengths = dict(self.doc_lengths)
+        clone.total_length = self.total_length
+        return clone
+
+    def clear(self):
+        self.postings.clear()
+        self.doc_terms.clear()
+        self.doc_lengths.clear()
+        self.total_length = 0
+
+    def _idf(self, term: str) -> float:
+        count = len(self.doc_terms)
+        frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Busca documentos com termos da consulta
+
+        Returns:
+            Lista de (doc_id, cobertura) ordenada por BM25
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.doc_terms:
+            return []
+
+        avg_length = self.total_length / len(self.doc_terms)
+        idf = {term: self._idf(term) for term in terms}
+        total_idf = sum(idf.values())
+
+        bm25: Dict[int, float] = defaultdict(float)
+        coverage: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            for doc_id, frequency in self.postings.get(term, {}).items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                bm25[doc_id] += idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+                coverage[doc_id] += idf[term]
+
+        ranked = sorted(bm25, key=bm25.get, reverse=True)[:k]
+        return [(doc_id, coverage[doc_id] / total_idf) for doc_id in ranked]
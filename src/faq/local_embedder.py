@@ -0,0 +1,47 @@
+from typing import List
+import zlib
+import numpy as np
+from src.utils.text import normalize_text
+
+class HashingEmbedder:
+    """
+    Embedder local, sem rede: palavras e n-gramas de caracteres projetados
+    por hashing em um vetor de dimensão fixa (normalizado).
+
+    Usa crc32 (estável entre processos), então os vetores podem ser salvos em disco.
+    """
+
+    def __init__(self, dimension: int = 512, ngram_range: tuple = (3, 5)):
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+
+    @property
+    def model_name(self) -> str:
+        low, high = self.ngram_range
+        return f"local-hashing-{self.dimension}-{low}-{high}"
+
+    def _features(self, text: str) -> List[str]:
+        normalized = normalize_text(text)
+        features = [f"w:{word}" for word in normalized.split()]
+
+        padded = f" {normalized} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Cria embeddings normalizados (float32) para os textos
+        """
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                # Bit alto define o sinal, reduzindo o viés das colisões
+                vectors[row, h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -0,0 +1,38 @@
+from typing import List
+import asyncio
+import faiss
+import numpy as np
+from src.config import FAQ_EMBEDDING_BATCH_SIZE, FAQ_INGEST_CONCURRENCY
+
+async def embed_texts(
+    llm_client,
+    texts: List[str],
+    model: str,
+    batch_size: int = FAQ_EMBEDDING_BATCH_SIZE,
+    concurrency: int = FAQ_INGEST_CONCURRENCY
+) -> np.ndarray:
+    """
+    Cria embeddings normalizados (float32) em lotes, com concorrência limitada
+    
+    Args:
+        llm_client: Cliente com `create_embeddings(textos, modelo)`
+        texts: Textos a serem embutidos
+        model: Modelo de embedding
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def embed_batch(batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            return await llm_client.create_embeddings(batch, model)
+    
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    results = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+    
+    embeddings = np.array(
+        [vector for batch in results for vector in batch], dtype=np.float32
+    ).reshape(len(texts), -1)
+    faiss.normalize_L2(embeddings)
+    return embeddings
@@ -0,0 +1,159 @@
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Hashable, TypeVar
+import asyncio
+import json
+from openai import AsyncOpenAI
+from .single_flight import SingleFlight
+from src.config import OPENAI_API_KEY, OPENAI_MAX_CONCURRENCY, LLM_SINGLE_FLIGHT
+
+T = TypeVar("T")
+
+class LLMClient:
+    """
+    Cliente assíncrono compartilhado para chamadas à OpenAI.
+
+    Todas as chamadas de completion e embedding passam pelo mesmo semáforo,
+    limitando o número de requisições simultâneas por processo. Chamadas
+    idênticas em andamento são agrupadas (single-flight).
+    """
+    def __init__(
+        self,
+        client: Optional[AsyncOpenAI] = None,
+        max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+        single_flight: bool = LLM_SINGLE_FLIGHT
+    ):
+        self.client = client or AsyncOpenAI(api_key=OPENAI_API_KEY)
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.single_flight = SingleFlight() if single_flight else None
+    
+    async def _coalesce(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        if self.single_flight is None:
+            return await factory()
+        return await self.single_flight.do(key, factory)
+    
+    @staticmethod
+    def _request_key(kind: str, model: str, payload: Any, kwargs: Dict[str, Any]) -> str:
+        return json.dumps([kind, model, payload, kwargs], sort_keys=True, ensure_ascii=False)
+    
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        **kwargs: Any
+    ) -> str:
+        """
+        Executa uma chat completion e retorna o conteúdo da resposta
+        """
+        key = self._request_key("chat", model, messages, kwargs)
+        return await self._coalesce(
+            key, lambda: self._chat_completion(messages, model, **kwargs)
+        )
+    
+    async def _chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        **kwargs: Any
+    ) -> str:
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    **kwargs
+                )
+            finally:
+                self.in_flight -= 1
+        
+        return response.choices[0].message.content
+    
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Executa uma chat completion em modo streaming, produzindo os trechos
+        de texto à medida que chegam. A vaga no semáforo fica ocupada até o
+        fim do stream.
+        """
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    stream=True,
+                    **kwargs
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+            finally:
+                self.in_flight -= 1
+    
+    async def create_embedding(
+        self,
+        text: str,
+        model: str = "text-embedding-ada-002"
+    ) -> List[float]:
+        """
+        Cria o embedding de um texto
+        """
+        key = self._request_key("embedding", model, text, {})
+        return await self._coalesce(key, lambda: self._create_embedding(text, model))
+    
+    async def _create_embedding(self, text: str, model: str) -> List[float]:
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                response = await self.client.embeddings.create(
+                    model=model,
+                    input=text
+                )
+            finally:
+                self.in_flight -= 1
+        
+        return response.data[0].embedding
+    
+    async def create_embeddings(
+        self,
+        texts: List[str],
+        model: str = "text-embedding-ada-002"
+    ) -> List[List[float]]:
+        """
+        Cria embeddings para vários textos em uma única requisição
+        """
+        key = self._request_key("embeddings", model, texts, {})
+        return await self._coalesce(key, lambda: self._create_embeddings(texts, model))
+    
+    async def _create_embeddings(self, texts: List[str], model: str) -> List[List[float]]:
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                response = await self.client.embeddings.create(
+                    model=model,
+                    input=texts
+                )
+            finally:
+                self.in_flight -= 1
+        
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna o uso atual do limite de concorrência e do agrupamento de chamadas
+        """
+        metrics = {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight
+        }
+        if self.single_flight is not None:
+            metrics["single_flight"] = self.single_flight.get_metrics()
+        return metrics
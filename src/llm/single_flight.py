@@ -0,0 +1,49 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Agrupa chamadas idênticas simultâneas: apenas a primeira vai ao serviço
+    remoto e todas as demais aguardam o mesmo resultado
+    """
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.upstream_calls = 0
+    
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa `factory()` uma única vez por chave enquanto houver chamada em andamento
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.upstream_calls += 1
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        
+        # shield: o cancelamento de um chamador não cancela a chamada dos demais
+        return await asyncio.shield(task)
+    
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Consome a exceção caso todos os chamadores tenham desistido
+        if not task.cancelled():
+            task.exception()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna quantas chamadas foram agrupadas em chamadas já em andamento
+        """
+        coalesced = self.calls - self.upstream_calls
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": coalesced,
+            "coalescing_ratio": round(coalesced / self.calls, 4) if self.calls else 0.0,
+            "in_flight": len(self._in_flight)
+        }
@@ -1,21 +1,31 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
+import asyncio
+import json
 
 from .orchestrator.orchestrator import DialogOrchestrator
 from .orchestrator.context_manager import ContextManager
 from .cart.cart import ShoppingCart
 from .catalog.catalog_api import CatalogAPI
+from .llm.llm_client import LLMClient
 from .checkout.checkout_handler import CheckoutHandler
 from .checkout.payment_gateway import PaymentGateway
 from .logs.analytics import AnalyticsManager
+from .utils.deadline import request_deadline
+from .utils.memory import process_memory
+from .utils.http_client import http_client
+from .config import REQUEST_DEADLINE, BRAND_REFRESH_INTERVAL, FAQ_RELOAD_INTERVAL, CATALOG_MIRROR_REFRESH_INTERVAL
 
 # Inicialização da aplicação
 app = FastAPI(title="Shopping Bot API")
 
 # Inicialização dos serviços
-catalog_api = CatalogAPI()
-orchestrator = DialogOrchestrator()
+# Cliente LLM compartilhado: um único limite de concorrência (chat e embeddings do catálogo)
+llm_client = LLMClient()
+catalog_api = CatalogAPI(llm_client=llm_client)
+orchestrator = DialogOrchestrator(llm_client=llm_client, catalog_api=catalog_api)
 context_manager = ContextManager()
 shopping_cart = ShoppingCart(catalog_api)
 payment_gateway = PaymentGateway()
@@ -23,6 +33,41 @@ checkout_handler = CheckoutHandler(shopping_cart, payment_gateway)
 analytics_manager = AnalyticsManager()
 
 
+async def _refresh_brands_periodically():
+    while True:
+        await orchestrator.refresh_brands()
+        await asyncio.sleep(BRAND_REFRESH_INTERVAL)
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # Pool HTTP compartilhado pelas integrações (catálogo, pagamento, WhatsApp)
+    await http_client.start()
+    app.state.brand_refresh_task = asyncio.create_task(_refresh_brands_periodically())
+    app.state.faq_watch_task = None
+    if FAQ_RELOAD_INTERVAL > 0:
+        app.state.faq_watch_task = asyncio.create_task(
+            orchestrator.faq_store.watch_files(FAQ_RELOAD_INTERVAL)
+        )
+    app.state.catalog_mirror_task = None
+    if catalog_api.mirror is not None:
+        app.state.catalog_mirror_task = asyncio.create_task(
+            catalog_api.mirror.run(CATALOG_MIRROR_REFRESH_INTERVAL)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    app.state.brand_refresh_task.cancel()
+    if app.state.faq_watch_task is not None:
+        app.state.faq_watch_task.cancel()
+    if app.state.catalog_mirror_task is not None:
+        app.state.catalog_mirror_task.cancel()
+    if catalog_api.cache is not None:
+        await catalog_api.cache.close()
+    await http_client.close()
+
+
 # Models
 class MessageRequest(BaseModel):
     user_id: str
@@ -41,6 +86,17 @@ class CheckoutRequest(BaseModel):
     currency: str = "BRL"
 
 
+class FAQRequest(BaseModel):
+    pergunta: str
+    resposta: str
+    id: Optional[str] = None
+
+
+class FAQUpdateRequest(BaseModel):
+    pergunta: Optional[str] = None
+    resposta: Optional[str] = None
+
+
 # Rotas de Mensagens
 @app.post("/message")
 async def process_message(request: MessageRequest):
@@ -60,13 +116,14 @@ async def process_message(request: MessageRequest):
         # Obtém o contexto atual
         current_context = context_manager.get_context(request.user_id)
 
-        # Processa a mensagem
-        response = await orchestrator.process_message(
-            user_id=request.user_id,
-            message=request.message,
-            channel=request.channel,
-            context=current_context
-        )
+        # Processa a mensagem dentro do prazo da requisição
+        with request_deadline(REQUEST_DEADLINE):
+            response = await orchestrator.process_message(
+                user_id=request.user_id,
+                message=request.message,
+                channel=request.channel,
+                context=current_context
+            )
 
         # Registra a resposta enviada
         analytics_manager.track_message(
@@ -82,6 +139,68 @@ async def process_message(request: MessageRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """
+    Formata um evento Server-Sent Events
+    """
+    payload = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    if event:
+        return f"event: {event}\n{payload}"
+    return payload
+
+
+@app.post("/message/stream")
+async def stream_message(request: MessageRequest):
+    """
+    Variante de /message que envia a resposta via SSE à medida que é gerada
+    """
+    analytics_manager.track_message(
+        request.user_id,
+        request.message,
+        request.channel,
+        is_incoming=True
+    )
+
+    if request.context:
+        context_manager.update_context(request.user_id, request.context)
+
+    current_context = context_manager.get_context(request.user_id)
+
+    async def event_stream():
+        chunks = []
+        try:
+            # O prazo é definido aqui porque o corpo é gerado fora do handler
+            with request_deadline(REQUEST_DEADLINE):
+                async for chunk in orchestrator.stream_message(
+                    user_id=request.user_id,
+                    message=request.message,
+                    channel=request.channel,
+                    context=current_context
+                ):
+                    chunks.append(chunk)
+                    yield _sse_event({"delta": chunk})
+
+            # Registra a resposta completa ao final do stream
+            response = "".join(chunks)
+            analytics_manager.track_message(
+                request.user_id,
+                response,
+                request.channel,
+                is_incoming=False
+            )
+
+            yield _sse_event({"response": response}, event="done")
+        except Exception as e:
+            analytics_manager.track_error(e, request.user_id, request.context)
+            yield _sse_event({"detail": str(e)}, event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.delete("/conversation/{user_id}")
 async def clear_conversation(user_id: str):
     orchestrator.clear_conversation(user_id)
@@ -199,13 +318,57 @@ async def check_payment_status(order_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Rotas de FAQ
+@app.post("/faq")
+async def upsert_faqs(faqs: List[FAQRequest]):
+    try:
+        return await orchestrator.faq_store.upsert_faqs([faq.dict() for faq in faqs])
+    except Exception as e:
+        analytics_manager.track_error(e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/faq/reload")
+async def reload_faqs():
+    """
+    Recarrega a base de FAQ dos arquivos sem interromper as conversas
+    """
+    if not await orchestrator.faq_store.reload():
+        raise HTTPException(status_code=500, detail="Falha ao recarregar FAQs")
+    return {"message": "FAQs recarregadas com sucesso", "entries": len(orchestrator.faq_store.faq_data)}
+
+
+@app.put("/faq/{faq_id}")
+async def update_faq(faq_id: str, faq: FAQUpdateRequest):
+    try:
+        await orchestrator.faq_store.update_faq(faq_id, faq.pergunta, faq.resposta)
+        return {"message": "FAQ atualizada com sucesso"}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="FAQ não encontrada")
+    except Exception as e:
+        analytics_manager.track_error(e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete("/faq/{faq_id}")
+async def delete_faq(faq_id: str):
+    if not await orchestrator.faq_store.delete_faq(faq_id):
+        raise HTTPException(status_code=404, detail="FAQ não encontrada")
+    return {"message": "FAQ removida com sucesso"}
+
+
 # Rotas de Analytics
 @app.get("/metrics")
 async def get_metrics():
     """
     Retorna as métricas coletadas
     """
-    return analytics_manager.get_metrics()
+    return {
+        **analytics_manager.get_metrics(),
+        **orchestrator.get_metrics(),
+        "http_pool": http_client.get_metrics(),
+        "process_memory": process_memory()
+    }
 
 
 # Inicialização do servidor
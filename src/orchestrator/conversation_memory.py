@@ -0,0 +1,204 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict, deque
+import time
+from src.utils.tokens import count_tokens, count_message_tokens
+
+class Conversation:
+    __slots__ = (
+        "turns", "tokens", "summary", "summary_tokens",
+        "history_tokens", "history_messages", "last_access"
+    )
+    
+    def __init__(self, max_turns: int):
+        # Cada turno: (papel, conteúdo, tokens)
+        self.turns: deque = deque(maxlen=max_turns)
+        self.tokens = 0
+        self.summary = ""
+        self.summary_tokens = 0
+        # Tokens de todo o histórico, para comparar com o prompt realmente enviado
+        self.history_tokens = 0
+        self.history_messages = 0
+        self.last_access = time.monotonic()
+
+class ConversationMemory:
+    """
+    Memória de conversa por usuário com limites de memória:
+
+    - no máximo `max_users` conversas (LRU) e expiração por inatividade;
+    - por conversa, um buffer circular de `max_turns` turnos com teto de
+      `max_tokens`; turnos antigos são incorporados a um resumo rolante
+      limitado a `summary_max_tokens`.
+    """
+    def __init__(
+        self,
+        max_users: int = 100000,
+        max_turns: int = 20,
+        max_tokens: int = 2000,
+        summary_max_tokens: int = 200,
+        idle_ttl: float = 1800
+    ):
+        self.max_users = max_users
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.idle_ttl = idle_ttl
+        self.conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self.evicted_users = 0
+        self.prompt_tokens = 0
+        self.full_history_tokens = 0
+    
+    def _get(self, user_id: str, create: bool = False) -> Optional[Conversation]:
+        self._evict_idle()
+        conversation = self.conversations.get(user_id)
+        if conversation is None and create:
+            conversation = Conversation(self.max_turns)
+            self.conversations[user_id] = conversation
+            while len(self.conversations) > self.max_users:
+                self.conversations.popitem(last=False)
+                self.evicted_users += 1
+        if conversation is not None:
+            conversation.last_access = time.monotonic()
+            self.conversations.move_to_end(user_id)
+        return conversation
+    
+    def _evict_idle(self) -> None:
+        """Remove conversas inativas (as mais antigas ficam no início)"""
+        now = time.monotonic()
+        while self.conversations:
+            user_id, conversation = next(iter(self.conversations.items()))
+            if now - conversation.last_access <= self.idle_ttl:
+                break
+            del self.conversations[user_id]
+            self.evicted_users += 1
+    
+    def add_turn(self, user_id: str, role: str, content: str) -> bool:
+        """
+        Registra um turno da conversa
+
+        Returns:
+            True se o resumo passou do limite e deve ser compactado
+        """
+        conversation = self._get(user_id, create=True)
+        tokens = count_tokens(content)
+        conversation.history_tokens += tokens
+        conversation.history_messages += 1
+        
+        if len(conversation.turns) == conversation.turns.maxlen:
+            self._fold_into_summary(conversation, conversation.turns.popleft())
+        conversation.turns.append((role, content, tokens))
+        conversation.tokens += tokens
+        
+        while conversation.tokens > self.max_tokens and len(conversation.turns) > 1:
+            self._fold_into_summary(conversation, conversation.turns.popleft())
+        
+        return conversation.summary_tokens > self.summary_max_tokens
+    
+    def _fold_into_summary(self, conversation: Conversation, turn: Tuple[str, str, int]) -> None:
+        role, content, tokens = turn
+        conversation.tokens -= tokens
+        speaker = "Usuário" if role == "user" else "Assistente"
+        conversation.summary = f"{conversation.summary}\n{speaker}: {content}".strip()
+        conversation.summary_tokens = count_tokens(conversation.summary)
+        
+        # Limite rígido enquanto o resumo não é compactado: mantém o trecho mais recente
+        hard_limit = self.summary_max_tokens * 2
+        if conversation.summary_tokens > hard_limit:
+            keep_chars = len(conversation.summary) * hard_limit // conversation.summary_tokens
+            conversation.summary = conversation.summary[-keep_chars:]
+            conversation.summary_tokens = count_tokens(conversation.summary)
+    
+    def get_summary(self, user_id: str) -> str:
+        """
+        Retorna o resumo atual dos turnos antigos
+        """
+        conversation = self._get(user_id)
+        return conversation.summary if conversation else ""
+    
+    def set_summary(self, user_id: str, summary: str, previous: Optional[str] = None) -> None:
+        """
+        Substitui o resumo (ex.: versão compactada por LLM)
+
+        Args:
+            user_id: Identificador único do usuário
+            summary: Novo resumo
+            previous: Resumo usado para gerar o novo; turnos incorporados
+                depois dele são preservados após o novo resumo
+        """
+        conversation = self._get(user_id)
+        if conversation is None:
+            return
+        
+        suffix = ""
+        if previous is not None:
+            if not conversation.summary.startswith(previous):
+                # O resumo foi cortado enquanto era compactado; descarta o resultado
+                return
+            suffix = conversation.summary[len(previous):]
+        
+        conversation.summary = f"{summary.strip()}{suffix}".strip()
+        conversation.summary_tokens = count_tokens(conversation.summary)
+    
+    def build_messages(
+        self,
+        user_id: str,
+        message: str,
+        token_budget: int,
+        system_prompt: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Monta o prompt com resumo + turnos mais recentes que cabem no orçamento
+        de tokens, seguido da mensagem atual
+        """
+        conversation = self._get(user_id)
+        current = {"role": "user", "content": message}
+        
+        header = []
+        if system_prompt:
+            header.append({"role": "system", "content": system_prompt})
+        # Custo de enviar todo o histórico, para medir a economia
+        full = count_message_tokens(header + [current])
+        if conversation:
+            full += conversation.history_tokens + 4 * conversation.history_messages
+        
+        if conversation and conversation.summary:
+            header.append({
+                "role": "system",
+                "content": f"Resumo da conversa anterior:\n{conversation.summary}"
+            })
+        
+        used = count_message_tokens(header + [current])
+        recent: List[Dict[str, str]] = []
+        if conversation:
+            for role, content, tokens in reversed(conversation.turns):
+                if used + tokens + 4 > token_budget:
+                    break
+                recent.append({"role": role, "content": content})
+                used += tokens + 4
+        recent.reverse()
+        
+        messages = header + recent + [current]
+        
+        self.prompt_tokens += used
+        self.full_history_tokens += full
+        
+        return messages
+    
+    def clear(self, user_id: str) -> None:
+        """
+        Remove a conversa de um usuário
+        """
+        self.conversations.pop(user_id, None)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna uso de memória e economia de tokens frente ao histórico completo
+        """
+        saved = max(0, self.full_history_tokens - self.prompt_tokens)
+        return {
+            "users": len(self.conversations),
+            "evicted_users": self.evicted_users,
+            "prompt_tokens": self.prompt_tokens,
+            "full_history_tokens": self.full_history_tokens,
+            "saved_tokens": saved,
+            "saved_ratio": round(saved / self.full_history_tokens, 4) if self.full_history_tokens else 0.0
+        }
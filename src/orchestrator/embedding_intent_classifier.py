@@ -0,0 +1,142 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import faiss
+import numpy as np
+from .intent_detector import IntentType
+from src.llm.llm_client import LLMClient
+from src.config import INTENT_ROUTER_MARGIN, INTENT_ROUTER_MIN_SCORE
+
+# Frases de exemplo rotuladas usadas como vizinhos para classificação local
+DEFAULT_EXAMPLES: Dict[IntentType, List[str]] = {
+    IntentType.FAQ: [
+        "Qual o horário de funcionamento?",
+        "Vocês abrem no sábado?",
+        "Qual o prazo de entrega?",
+        "Quanto tempo demora para chegar?",
+        "Vocês entregam na minha cidade?",
+        "Quais formas de pagamento vocês aceitam?",
+        "Aceitam PIX ou boleto?",
+        "Posso parcelar no cartão?",
+        "Como faço para trocar um produto?",
+        "Qual a política de devolução?",
+        "O produto tem garantia?",
+        "Como entrar em contato com o suporte?",
+        "Onde fica a loja?",
+    ],
+    IntentType.PRODUCT_SEARCH: [
+        "Quero comprar um perfume lattafa",
+        "Liste todos os perfumes armaf",
+        "Mostrar produtos apple",
+        "Preciso de um celular xiaomi",
+        "Vocês têm perfume da marca chanel?",
+        "Quanto custa o iphone?",
+        "Tem estoque do perfume afnan?",
+        "Buscar notebook",
+        "Quais marcas de perfume vocês vendem?",
+        "Me mostra os celulares samsung",
+        "Qual o preço do perfume dior?",
+    ],
+    IntentType.GENERAL: [
+        "Olá, tudo bem?",
+        "Bom dia",
+        "Obrigado pela ajuda",
+        "Quem é você?",
+        "Me conte uma curiosidade",
+        "Qual perfume combina com o verão?",
+        "Me dá uma dica de presente",
+        "Você é um robô?",
+        "Tchau",
+    ],
+}
+
+class EmbeddingIntentClassifier:
+    """
+    Classifica intenções localmente por vizinhos mais próximos (FAISS) sobre
+    frases de exemplo rotuladas. Retorna None quando a margem entre a melhor
+    e a segunda melhor categoria fica abaixo do limiar de confiança.
+    """
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        examples: Optional[Dict[IntentType, List[str]]] = None,
+        margin: float = INTENT_ROUTER_MARGIN,
+        min_score: float = INTENT_ROUTER_MIN_SCORE
+    ):
+        self.llm_client = llm_client
+        self.examples = examples or DEFAULT_EXAMPLES
+        self.margin = margin
+        self.min_score = min_score
+        self.index = None
+        self.labels: List[IntentType] = []
+        self._build_lock = asyncio.Lock()
+        self.local_hits = 0
+        self.escalations = 0
+    
+    async def _ensure_index(self) -> None:
+        """Cria o índice de exemplos na primeira utilização"""
+        if self.index is not None:
+            return
+        
+        async with self._build_lock:
+            if self.index is not None:
+                return
+            
+            texts = []
+            labels = []
+            for intent, utterances in self.examples.items():
+                texts.extend(utterances)
+                labels.extend([intent] * len(utterances))
+            
+            embeddings = await self.llm_client.create_embeddings(texts)
+            embeddings_array = np.array(embeddings, dtype=np.float32)
+            faiss.normalize_L2(embeddings_array)
+            
+            index = faiss.IndexFlatIP(embeddings_array.shape[1])
+            index.add(embeddings_array)
+            
+            self.labels = labels
+            self.index = index
+    
+    async def classify(self, message: str) -> Optional[IntentType]:
+        """
+        Retorna a intenção se a classificação local for confiável, senão None
+        """
+        await self._ensure_index()
+        
+        embedding = await self.llm_client.create_embedding(message)
+        query_embedding = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(query_embedding)
+        
+        # Poucos exemplos: compara com todos para obter a margem exata
+        scores, indices = self.index.search(query_embedding, k=self.index.ntotal)
+        
+        best_by_intent: Dict[IntentType, float] = {}
+        for score, idx in zip(scores[0], indices[0]):
+            if idx < 0:
+                continue
+            intent = self.labels[idx]
+            if score > best_by_intent.get(intent, -1.0):
+                best_by_intent[intent] = float(score)
+        
+        ranked = sorted(best_by_intent.values(), reverse=True)
+        best_intent = max(best_by_intent, key=best_by_intent.get)
+        best_score = ranked[0]
+        runner_up = ranked[1] if len(ranked) > 1 else -1.0
+        
+        if best_score >= self.min_score and best_score - runner_up >= self.margin:
+            self.local_hits += 1
+            return best_intent
+        
+        self.escalations += 1
+        return None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna quantas mensagens foram roteadas localmente ou escaladas
+        """
+        total = self.local_hits + self.escalations
+        return {
+            "local_hits": self.local_hits,
+            "escalations": self.escalations,
+            "local_ratio": round(self.local_hits / total, 4) if total else 0.0
+        }
@@ -1,37 +1,251 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List
 from enum import Enum
-from openai import OpenAI
-from src.config import OPENAI_API_KEY
+from dataclasses import dataclass
+import json
+from src.llm.llm_client import LLMClient
+from src.cache.ttl_cache import TTLCache
+from src.utils.text import normalize_text
+from src.utils.deadline import run_with_budget
+from src.utils.micro_batcher import MicroBatcher
+from src.utils.keyword_matcher import KeywordMatcher
+from src.config import (
+    INTENT_CACHE_SIZE,
+    INTENT_CACHE_TTL,
+    STAGE_TIMEOUT_INTENT,
+    STAGE_TIMEOUT_EXTRACTION,
+    INTENT_BATCHING,
+    INTENT_BATCH_WINDOW_MS,
+    INTENT_BATCH_MAX_SIZE
+)
+
+# Marcas usadas pelo fallback até a primeira carga da lista do catálogo
+DEFAULT_BRANDS = ['lattafa', 'armaf', 'xiaomi', 'apple', 'samsung', 'afnan', 'chanel', 'gucci', 'dior']
+# Palavras que indicam busca de produto (casam também no plural: "produtos")
+PRODUCT_WORDS = ["produto", "comprar", "perfume", "celular", "liste", "mostrar"]
+# Produtos genéricos usados como termo de busca quando não há marca
+PRODUCT_NOUNS = ["perfume", "celular"]
+FAQ_WORDS = ["horario", "entrega", "pagamento", "como", "quando", "onde"]
 
 class IntentType(Enum):
     FAQ = "faq"
     PRODUCT_SEARCH = "product_search"
     GENERAL = "general"
 
+@dataclass
+class IntentResult:
+    intent: IntentType
+    search_term: Optional[str] = None
+
 class IntentDetector:
-    def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        router=None,
+        batching: bool = INTENT_BATCHING
+    ):
+        self.llm_client = llm_client or LLMClient()
+        # Classificador local opcional (EmbeddingIntentClassifier); escala para a IA
+        # apenas quando não tem confiança suficiente
+        self.router = router
+        # Matcher de palavras-chave do fallback offline (reconstruído com as marcas do catálogo)
+        self._brand_key = frozenset()
+        self.matcher = KeywordMatcher()
+        self.update_brands(DEFAULT_BRANDS)
+        # Classificação em lote: mensagens de vários usuários em um único prompt
+        self.batcher = None
+        if batching:
+            self.batcher = MicroBatcher(
+                self._classify_batch_with_openai,
+                window=INTENT_BATCH_WINDOW_MS / 1000,
+                max_size=INTENT_BATCH_MAX_SIZE
+            )
+        # Cache de resultados da IA, chaveado pelo texto normalizado
+        self.cache = TTLCache(max_size=INTENT_CACHE_SIZE, ttl=INTENT_CACHE_TTL)
     
-    def detect_intent(self, message: str) -> IntentType:
+    async def classify(self, message: str) -> IntentResult:
+        """
+        Detecta intenção e extrai o termo de busca em uma única chamada
+        """
+        key = normalize_text(message)
+        cached = self.cache.get(("classify", key))
+        if cached is not None:
+            return cached
+        
+        intent = await self._route_locally(message)
+        if intent is not None:
+            # Termo pelas marcas/produtos conhecidos; sem casamento, o orquestrador
+            # pede a extração à IA
+            search_term = None
+            if intent == IntentType.PRODUCT_SEARCH:
+                search_term = self._match_search_term(message)
+            result = IntentResult(intent, search_term)
+            self.cache.set(("classify", key), result)
+            self.cache.set(("intent", key), intent)
+            if search_term:
+                self.cache.set(("term", key), search_term)
+            return result
+        
+        try:
+            if self.batcher is not None:
+                classification = self.batcher.submit(message)
+            else:
+                classification = self._classify_with_openai(message)
+            result = await run_with_budget(classification, STAGE_TIMEOUT_INTENT)
+            if result is None:
+                raise ValueError("Mensagem ausente na resposta do lote")
+            self.cache.set(("classify", key), result)
+            self.cache.set(("intent", key), result.intent)
+            if result.search_term:
+                self.cache.set(("term", key), result.search_term)
+            return result
+        except Exception:
+            intent = self._simple_detection(message)
+            search_term = None
+            if intent == IntentType.PRODUCT_SEARCH:
+                search_term = self._simple_extract(message)
+            return IntentResult(intent, search_term)
+    
+    async def detect_intent(self, message: str) -> IntentType:
         """
         Detecta intenção usando OpenAI
         """
+        key = normalize_text(message)
+        cached = self.cache.get(("intent", key))
+        if cached is not None:
+            return cached
+        
+        intent = await self._route_locally(message)
+        if intent is not None:
+            self.cache.set(("intent", key), intent)
+            return intent
+        
         try:
-            return self._detect_with_openai(message)
-        except:
+            intent = await run_with_budget(
+                self._detect_with_openai(message), STAGE_TIMEOUT_INTENT
+            )
+            self.cache.set(("intent", key), intent)
+            return intent
+        except Exception:
             # Fallback para detecção simples
             return self._simple_detection(message)
     
-    def extract_search_term(self, message: str) -> str:
+    async def extract_search_term(self, message: str) -> str:
         """
         Extrai apenas o termo de busca da mensagem usando IA
         """
+        key = normalize_text(message)
+        cached = self.cache.get(("term", key))
+        if cached is not None:
+            return cached
+        
         try:
-            return self._extract_with_openai(message)
-        except:
+            search_term = await run_with_budget(
+                self._extract_with_openai(message), STAGE_TIMEOUT_EXTRACTION
+            )
+            self.cache.set(("term", key), search_term)
+            return search_term
+        except Exception:
             return self._simple_extract(message)
     
-    def _extract_with_openai(self, message: str) -> str:
+    async def _route_locally(self, message: str) -> Optional[IntentType]:
+        """Tenta classificar sem chat completion usando o roteador local"""
+        if self.router is None:
+            return None
+        try:
+            return await run_with_budget(
+                self.router.classify(message), STAGE_TIMEOUT_INTENT
+            )
+        except Exception as e:
+            print(f"Erro no roteador local de intenções: {e!r}")
+            return None
+    
+    async def _classify_with_openai(self, message: str) -> IntentResult:
+        """Usa OpenAI para classificar e extrair o termo com saída estruturada"""
+        prompt = f"""Classifique esta mensagem em UMA das categorias:
+
+FAQ: perguntas sobre horário, funcionamento, entrega, pagamento, suporte, garantia, troca
+PRODUCT_SEARCH: busca/lista de produtos, marcas, preços, compras, estoque
+GENERAL: outras perguntas gerais
+
+Se for PRODUCT_SEARCH, extraia também APENAS o nome da marca ou produto buscado.
+
+Exemplos:
+- "quero comprar um perfume lattafa" → {{"intent": "PRODUCT_SEARCH", "search_term": "lattafa"}}
+- "preciso de um celular xiaomi" → {{"intent": "PRODUCT_SEARCH", "search_term": "xiaomi"}}
+- "buscar notebook" → {{"intent": "PRODUCT_SEARCH", "search_term": "notebook"}}
+- "qual o prazo de entrega?" → {{"intent": "FAQ", "search_term": null}}
+- "me conte uma curiosidade" → {{"intent": "GENERAL", "search_term": null}}
+
+Mensagem: "{message}"
+
+Responda APENAS com JSON no formato {{"intent": "...", "search_term": "..." ou null}}"""
+        
+        content = await self.llm_client.chat_completion(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=40,
+            response_format={"type": "json_object"}
+        )
+        
+        return self._parse_classification(json.loads(content))
+    
+    async def _classify_batch_with_openai(self, messages: List[str]) -> List[Optional[IntentResult]]:
+        """Classifica várias mensagens em uma única chamada"""
+        if len(messages) == 1:
+            return [await self._classify_with_openai(messages[0])]
+        
+        numbered = "\n".join(
+            f"{i}. {json.dumps(message, ensure_ascii=False)}"
+            for i, message in enumerate(messages, start=1)
+        )
+        prompt = f"""Classifique CADA mensagem abaixo em UMA das categorias:
+
+FAQ: perguntas sobre horário, funcionamento, entrega, pagamento, suporte, garantia, troca
+PRODUCT_SEARCH: busca/lista de produtos, marcas, preços, compras, estoque
+GENERAL: outras perguntas gerais
+
+Se for PRODUCT_SEARCH, extraia também APENAS o nome da marca ou produto buscado.
+
+Mensagens:
+{numbered}
+
+Responda APENAS com JSON no formato
+{{"results": [{{"id": 1, "intent": "...", "search_term": "..." ou null}}, ...]}}
+com um item para cada mensagem."""
+        
+        content = await self.llm_client.chat_completion(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=40 * len(messages),
+            response_format={"type": "json_object"}
+        )
+        
+        results: List[Optional[IntentResult]] = [None] * len(messages)
+        for item in json.loads(content).get("results", []):
+            try:
+                position = int(item.get("id")) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= position < len(messages):
+                results[position] = self._parse_classification(item)
+        return results
+    
+    def _parse_classification(self, data: Dict[str, Any]) -> IntentResult:
+        """Converte o JSON do classificador em IntentResult"""
+        result = str(data.get("intent", "")).strip().upper()
+        
+        if "PRODUCT_SEARCH" in result:
+            search_term = (data.get("search_term") or "").strip().lower()
+            print(f"Termo extraído pela IA: '{search_term}'")
+            return IntentResult(IntentType.PRODUCT_SEARCH, search_term or None)
+        elif "FAQ" in result:
+            return IntentResult(IntentType.FAQ)
+        else:
+            return IntentResult(IntentType.GENERAL)
+    
+    async def _extract_with_openai(self, message: str) -> str:
         """Usa OpenAI para extrair termo de busca"""
         prompt = f"""Extraia APENAS o nome da marca ou produto que o usuário quer buscar.
 
@@ -48,37 +262,79 @@ Mensagem: "{message}"
 
 Responda APENAS com o termo de busca (marca ou produto):"""
         
-        response = self.client.chat.completions.create(
+        content = await self.llm_client.chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.1,
             max_tokens=20
         )
         
-        result = response.choices[0].message.content.strip().lower()
+        result = content.strip().lower()
         print(f"Termo extraído pela IA: '{result}'")
         return result
     
+    def guess_search_term(self, message: str) -> Optional[str]:
+        """
+        Estimativa local e instantânea do termo de busca (sem IA), ou None se a
+        mensagem não cita marca nem produto conhecido
+        """
+        return self._match_search_term(message)
+    
+    def update_brands(self, brands: List[str]) -> bool:
+        """
+        Reconstrói o matcher do fallback se a lista de marcas mudou
+        """
+        names = {brand.strip().lower() for brand in brands if brand and brand.strip()}
+        key = frozenset(normalize_text(name) for name in names)
+        if not key or key == self._brand_key:
+            return False
+        
+        matcher = KeywordMatcher()
+        for name in names:
+            matcher.add(name, ("brand", name))
+        for word in PRODUCT_WORDS:
+            matcher.add(word, ("product", word), whole_word=False)
+        for word in FAQ_WORDS:
+            matcher.add(word, ("faq", word), whole_word=False)
+        
+        # Troca atômica: buscas em andamento continuam com o matcher anterior
+        self.matcher = matcher
+        self._brand_key = key
+        return True
+    
+    async def refresh_brands(self, catalog_api) -> bool:
+        """
+        Atualiza as marcas do fallback a partir de CatalogAPI.get_brands()
+        """
+        brands = await catalog_api.get_brands()
+        changed = self.update_brands([brand.get('nome', '') for brand in brands])
+        if changed:
+            print(f"Matcher de marcas reconstruído com {len(self._brand_key)} marcas")
+        return changed
+    
     def _simple_extract(self, message: str) -> str:
         """Extração simples como fallback"""
-        message_lower = message.lower()
+        return self._match_search_term(message) or 'perfume'
+    
+    def _match_search_term(self, message: str) -> Optional[str]:
+        """Marca ou produto genérico citado na mensagem, ou None se nenhum casar"""
+        matches = self.matcher.find_all(message)
         
-        # Marcas conhecidas (busca mais ampla)
-        brands = ['lattafa', 'armaf', 'xiaomi', 'apple', 'samsung', 'afnan', 'chanel', 'gucci', 'dior']
-        for brand in brands:
-            if brand in message_lower:
-                print(f"Marca encontrada no fallback: {brand}")
-                return brand
+        # Marcas conhecidas: a mais específica (mais longa) e, no empate, a primeira
+        brands = [m for m in matches if m.value[0] == "brand"]
+        if brands:
+            best = min(brands, key=lambda m: (-len(m.keyword), m.start))
+            print(f"Marca encontrada no fallback: {best.value[1]}")
+            return best.value[1]
         
         # Produtos genéricos
-        if 'perfume' in message_lower:
-            return 'perfume'
-        elif 'celular' in message_lower:
-            return 'celular'
+        for match in matches:
+            if match.value[0] == "product" and match.value[1] in PRODUCT_NOUNS:
+                return match.value[1]
         
-        return 'perfume'
+        return None
     
-    def _detect_with_openai(self, message: str) -> IntentType:
+    async def _detect_with_openai(self, message: str) -> IntentType:
         """Usa OpenAI para detectar intenção"""
         prompt = f"""Classifique esta mensagem em UMA das categorias:
 
@@ -90,14 +346,14 @@ Mensagem: "{message}"
 
 Responda APENAS: FAQ, PRODUCT_SEARCH ou GENERAL"""
         
-        response = self.client.chat.completions.create(
+        content = await self.llm_client.chat_completion(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.1,
             max_tokens=10
         )
         
-        result = response.choices[0].message.content.strip().upper()
+        result = content.strip().upper()
         
         if "PRODUCT_SEARCH" in result:
             return IntentType.PRODUCT_SEARCH
@@ -108,16 +364,28 @@ Responda APENAS: FAQ, PRODUCT_SEARCH ou GENERAL"""
     
     def _simple_detection(self, message: str) -> IntentType:
         """Fallback simples se Ollama não estiver disponível"""
-        message_lower = message.lower()
+        kinds = {match.value[0] for match in self.matcher.find_all(message)}
         
-        # Palavras-chave de produto
-        product_words = ["produto", "comprar", "perfume", "celular", "lattafa", "armaf", "liste", "mostrar"]
-        if any(word in message_lower for word in product_words):
+        # Marcas e palavras-chave de produto
+        if "brand" in kinds or "product" in kinds:
             return IntentType.PRODUCT_SEARCH
         
         # Palavras-chave de FAQ
-        faq_words = ["horario", "entrega", "pagamento", "como", "quando", "onde"]
-        if any(word in message_lower for word in faq_words):
+        if "faq" in kinds:
             return IntentType.FAQ
         
-        return IntentType.GENERAL
\ No newline at end of file
+        return IntentType.GENERAL
+    
+    def get_batch_metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        Retorna métricas da classificação em lote, se ativa
+        """
+        if self.batcher is None:
+            return None
+        return self.batcher.get_metrics()
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna métricas do cache de intenções
+        """
+        return self.cache.get_metrics()
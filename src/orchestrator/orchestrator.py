@@ -1,16 +1,72 @@
-from typing import Dict, Any, Optional
-from openai import OpenAI
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
+from dataclasses import dataclass
+import asyncio
+import contextvars
+import time
 from .intent_detector import IntentDetector, IntentType
+from .embedding_intent_classifier import EmbeddingIntentClassifier
+from .stage_metrics import StageMetrics
+from .conversation_memory import ConversationMemory
 from ..faq.faq_vector_store import FAQVectorStore
 from ..catalog.catalog_api import CatalogAPI
-from ..config import OPENAI_API_KEY, OPENAI_MODEL
+from ..catalog.product_formatter import render_product_list
+from ..llm.llm_client import LLMClient
+from ..utils.deadline import run_with_budget, iterate_with_budget
+from ..config import (
+    OPENAI_MODEL,
+    INTENT_ROUTING_MODE,
+    PRODUCT_PRESENTATION_MODE,
+    PRODUCT_LOCALE,
+    SPECULATIVE_ROUTING,
+    STAGE_TIMEOUT_CATALOG,
+    STAGE_TIMEOUT_COMPLETION,
+    CONVERSATION_MAX_USERS,
+    CONVERSATION_MAX_TURNS,
+    CONVERSATION_MAX_TOKENS,
+    CONVERSATION_IDLE_TTL,
+    SUMMARY_MAX_TOKENS,
+    PROMPT_TOKEN_BUDGET
+)
+
+ERROR_MESSAGE = "Desculpe, ocorreu um erro. Tente novamente."
+TIMEOUT_MESSAGE = "Desculpe, estou com dificuldade para responder agora. Tente novamente em instantes."
+
+@dataclass
+class RouteDecision:
+    intent: IntentType
+    faq_response: Optional[str] = None
+    search_term: Optional[str] = None
+    products: Optional[List[Dict[str, Any]]] = None
 
 class DialogOrchestrator:
-    def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
-        self.intent_detector = IntentDetector()
-        self.faq_store = FAQVectorStore()
-        self.catalog_api = CatalogAPI()
+    def __init__(
+        self,
+        llm_client: Optional[LLMClient] = None,
+        product_presentation: str = PRODUCT_PRESENTATION_MODE,
+        speculative: bool = SPECULATIVE_ROUTING,
+        catalog_api: Optional[CatalogAPI] = None
+    ):
+        # Cliente compartilhado: um único limite de concorrência para todas as chamadas
+        self.llm_client = llm_client or LLMClient()
+        self.product_presentation = product_presentation
+        self.speculative = speculative
+        self.intent_router = None
+        if INTENT_ROUTING_MODE == "embedding":
+            self.intent_router = EmbeddingIntentClassifier(self.llm_client)
+        self.intent_detector = IntentDetector(self.llm_client, self.intent_router)
+        self.faq_store = FAQVectorStore(self.llm_client)
+        # Compartilhado com o carrinho, para usarem o mesmo cache do catálogo
+        self.catalog_api = catalog_api or CatalogAPI()
+        self.stage_metrics = StageMetrics()
+        self.memory = ConversationMemory(
+            max_users=CONVERSATION_MAX_USERS,
+            max_turns=CONVERSATION_MAX_TURNS,
+            max_tokens=CONVERSATION_MAX_TOKENS,
+            summary_max_tokens=SUMMARY_MAX_TOKENS,
+            idle_ttl=CONVERSATION_IDLE_TTL
+        )
+        # Compactações em andamento por usuário (referência forte até terminarem)
+        self._compacting: Dict[str, asyncio.Task] = {}
         
     async def process_message(
         self,
@@ -23,42 +79,286 @@ class DialogOrchestrator:
         Processa mensagem com roteamento inteligente
         """
         try:
-            # Detecta intenção
-            intent = self.intent_detector.detect_intent(message)
-            print(f"Intent detectado: {intent.value}")
-            
-            # Rota 1: FAQ - Banco Vetorial
-            if intent == IntentType.FAQ:
-                faq_response = self.faq_store.search_faq(message)
-                if faq_response:
-                    return faq_response
-                # Se não encontrar FAQ, vai para rota geral
+            response = await self._respond(user_id, message)
+        except Exception as e:
+            print(f"Erro ao processar mensagem: {e}")
+            return ERROR_MESSAGE
+        
+        self._remember(user_id, message, response)
+        return response
+    
+    async def _respond(self, user_id: str, message: str) -> str:
+        decision = await self._route(message)
+        
+        # Rota 1: FAQ - Banco Vetorial
+        if decision.intent == IntentType.FAQ:
+            if decision.faq_response:
+                return decision.faq_response
+            # Se não encontrar FAQ, vai para rota geral
+        
+        # Rota 2: Catálogo de Produtos
+        elif decision.intent == IntentType.PRODUCT_SEARCH:
+            return await self._handle_product_search(
+                message, decision.search_term, decision.products
+            )
+        
+        # Rota 3: Perguntas Gerais
+        return await self._handle_general_question(message, user_id)
+    
+    async def stream_message(
+        self,
+        user_id: str,
+        message: str,
+        channel: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Processa mensagem como process_message, mas entrega a resposta em
+        pedaços à medida que o modelo os gera
+        """
+        chunks = []
+        try:
+            async for chunk in self._stream_respond(user_id, message):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            print(f"Erro ao processar mensagem: {e}")
+            yield ERROR_MESSAGE
+            return
+        
+        self._remember(user_id, message, "".join(chunks))
+    
+    async def _stream_respond(self, user_id: str, message: str) -> AsyncIterator[str]:
+        decision = await self._route(message)
+        
+        if decision.intent == IntentType.FAQ:
+            if decision.faq_response:
+                yield decision.faq_response
+                return
+        
+        elif decision.intent == IntentType.PRODUCT_SEARCH:
+            text, messages = await self._product_reply(
+                message, decision.search_term, decision.products
+            )
+            if messages is None:
+                yield text
+                return
+            async for chunk in self._stream_completion(messages, fallback=text):
+                yield chunk
+            return
+        
+        async for chunk in self._stream_completion(
+            self._general_messages(message, user_id), fallback=TIMEOUT_MESSAGE
+        ):
+            yield chunk
+    
+    async def _route(self, message: str) -> RouteDecision:
+        """
+        Detecta a intenção e executa a busca correspondente (FAQ ou catálogo)
+        """
+        if self.speculative:
+            return await self._route_speculatively(message)
+        
+        # Detecta intenção (e termo de busca) em uma única chamada
+        result = await self.stage_metrics.timed(
+            "intent", self.intent_detector.classify(message)
+        )
+        print(f"Intent detectado: {result.intent.value}")
+        
+        if result.intent == IntentType.FAQ:
+            faq_response = await self.stage_metrics.timed(
+                "faq", self.faq_store.search_faq(message)
+            )
+            return RouteDecision(result.intent, faq_response=faq_response)
+        
+        if result.intent == IntentType.PRODUCT_SEARCH:
+            search_term, products = await self._search_products(message, result.search_term)
+            return RouteDecision(result.intent, search_term=search_term, products=products)
+        
+        return RouteDecision(result.intent)
+    
+    async def _route_speculatively(self, message: str) -> RouteDecision:
+        """
+        Inicia a busca na FAQ e no catálogo enquanto a intenção ainda está
+        sendo detectada; ao final cancela os ramos que não serão usados
+        """
+        guessed_term = self.intent_detector.guess_search_term(message)
+        
+        branches = {
+            "intent": self.intent_detector.classify(message),
+            "faq": self.faq_store.search_faq(message),
+        }
+        # Sem marca ou produto reconhecido, um palpite genérico só geraria carga no catálogo
+        if guessed_term is not None:
+            branches["catalog"] = self._catalog_search(guessed_term)
+        tasks = {
+            name: asyncio.create_task(self.stage_metrics.timed(f"speculative_{name}", coro))
+            for name, coro in branches.items()
+        }
+        for task in tasks.values():
+            # Evita avisos de exceção não consumida em ramos descartados
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        
+        try:
+            result = await tasks["intent"]
+            print(f"Intent detectado: {result.intent.value}")
             
-            # Rota 2: Catálogo de Produtos
-            elif intent == IntentType.PRODUCT_SEARCH:
-                return await self._handle_product_search(message)
+            if result.intent == IntentType.FAQ:
+                if "catalog" in tasks:
+                    tasks["catalog"].cancel()
+                return RouteDecision(result.intent, faq_response=await tasks["faq"])
             
-            # Rota 3: Perguntas Gerais
-            return await self._handle_general_question(message, user_id)
+            if result.intent == IntentType.PRODUCT_SEARCH:
+                tasks["faq"].cancel()
+                search_term = result.search_term
+                if not search_term:
+                    search_term = await self.intent_detector.extract_search_term(message)
+                
+                if "catalog" in tasks and search_term == guessed_term:
+                    products = await tasks["catalog"]
+                else:
+                    # Sem palpite ou palpite errado: descarta a busca especulativa
+                    if "catalog" in tasks:
+                        tasks["catalog"].cancel()
+                    search_term, products = await self._search_products(message, search_term)
+                
+                print(f"Produtos encontrados: {len(products)}")
+                return RouteDecision(result.intent, search_term=search_term, products=products)
             
-        except Exception as e:
-            print(f"Erro ao processar mensagem: {e}")
-            return "Desculpe, ocorreu um erro. Tente novamente."
+            return RouteDecision(result.intent)
+        finally:
+            for task in tasks.values():
+                task.cancel()
     
-    async def _handle_product_search(self, message: str) -> str:
+    async def _handle_product_search(
+        self,
+        message: str,
+        search_term: Optional[str] = None,
+        products: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
         """Rota 2: Busca produtos e formata resposta"""
-        # Extrai termo de busca usando IA
-        search_term = self.intent_detector.extract_search_term(message)
+        text, messages = await self._product_reply(message, search_term, products)
+        if messages is None:
+            return text
+        
+        # Formata resposta com LLM; se o prazo esgotar, usa o template
+        return await self._completion(messages, fallback=text)
+    
+    async def _product_reply(
+        self,
+        message: str,
+        search_term: Optional[str] = None,
+        products: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[str, Optional[List[Dict[str, str]]]]:
+        """
+        Busca produtos (se necessário) e prepara a resposta da rota 2, comum à
+        resposta completa e ao streaming
+        
+        Returns:
+            (texto, mensagens): sem mensagens, o texto já é a resposta; com
+            mensagens, a resposta vem do LLM e o texto (template) é o fallback
+        """
+        if products is None:
+            search_term, products = await self._search_products(message, search_term)
+        
+        if not products:
+            products = await self._semantic_search(message)
+        if not products:
+            return self._no_products_message(search_term), None
+        
+        # Por padrão, apresentação determinística sem chamada ao modelo
+        template = render_product_list(products, search_term, locale=PRODUCT_LOCALE)
+        if self.product_presentation != "llm":
+            return template, None
+        return template, self._product_messages(products)
+    
+    async def _search_products(
+        self,
+        message: str,
+        search_term: Optional[str] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Extrai o termo de busca (se necessário) e consulta o catálogo"""
+        # Extrai termo de busca usando IA, se o classificador não o trouxe
+        if not search_term:
+            search_term = await self.intent_detector.extract_search_term(message)
         print(f"Termo extraído: '{search_term}' da mensagem: '{message}'")
         
         # Busca produtos
-        products = await self.catalog_api.search_products(search_term)
+        products = await self.stage_metrics.timed("catalog", self._catalog_search(search_term))
         print(f"Produtos encontrados: {len(products)}")
         
-        if not products:
-            return f"Não encontrei produtos para '{search_term}'. Tente outro termo."
-        
-        # Formata resposta com LLM
+        return search_term, products
+    
+    async def _catalog_search(self, search_term: str) -> List[Dict[str, Any]]:
+        """Consulta o catálogo dentro do orçamento da etapa (lista vazia se esgotar)"""
+        try:
+            return await run_with_budget(
+                self.catalog_api.search_products(search_term), STAGE_TIMEOUT_CATALOG
+            )
+        except asyncio.TimeoutError:
+            print(f"Tempo esgotado ao buscar produtos para '{search_term}'")
+            return []
+    
+    async def _semantic_search(self, message: str) -> List[Dict[str, Any]]:
+        """Busca semântica no catálogo quando a busca por texto não encontrou nada"""
+        try:
+            products = await self.stage_metrics.timed("catalog_semantic", run_with_budget(
+                self.catalog_api.semantic_search_products(message), STAGE_TIMEOUT_CATALOG
+            ))
+        except asyncio.TimeoutError:
+            print(f"Tempo esgotado na busca semântica para '{message}'")
+            return []
+        except Exception as e:
+            print(f"Erro na busca semântica: {e}")
+            return []
+        if products:
+            print(f"Busca semântica encontrou {len(products)} produtos")
+        return products
+    
+    async def _completion(self, messages: List[Dict[str, str]], fallback: str) -> str:
+        """Chat completion dentro do orçamento da etapa, com resposta degradada"""
+        try:
+            return await self.stage_metrics.timed("completion", run_with_budget(
+                self.llm_client.chat_completion(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    temperature=0.7
+                ),
+                STAGE_TIMEOUT_COMPLETION
+            ))
+        except asyncio.TimeoutError:
+            return fallback
+    
+    async def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        fallback: str
+    ) -> AsyncIterator[str]:
+        """Versão em streaming de _completion; usa o fallback se nada chegou a tempo"""
+        sent_any = False
+        start = time.perf_counter()
+        try:
+            async for chunk in iterate_with_budget(
+                self.llm_client.stream_chat_completion(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    temperature=0.7
+                ),
+                STAGE_TIMEOUT_COMPLETION
+            ):
+                sent_any = True
+                yield chunk
+        except asyncio.TimeoutError:
+            self.stage_metrics.record("stream_completion", time.perf_counter() - start, "timeout")
+            if not sent_any:
+                yield fallback
+    
+    def _no_products_message(self, search_term: str) -> str:
+        return f"Não encontrei produtos para '{search_term}'. Tente outro termo."
+    
+    @staticmethod
+    def _product_messages(products: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Monta o prompt de apresentação dos produtos"""
         products_text = "\n".join([
             f"- {p.get('titulo', 'N/A')} - {p.get('moeda', {}).get('simbolo', 'R$')} {p.get('valor_venda', '0')}"
             for p in products[:5]
@@ -70,26 +370,83 @@ class DialogOrchestrator:
 
 Responda de forma profissional e incentive a compra."""
         
-        response = self.client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content
+        return [{"role": "user", "content": prompt}]
+    
+    def _general_messages(self, message: str, user_id: str) -> List[Dict[str, str]]:
+        """Monta o prompt de perguntas gerais com o histórico que cabe no orçamento"""
+        return self.memory.build_messages(user_id, message, PROMPT_TOKEN_BUDGET)
+    
+    def _remember(self, user_id: str, message: str, response: str) -> None:
+        """Registra o turno na memória e agenda a compactação do resumo se necessário"""
+        self.memory.add_turn(user_id, "user", message)
+        needs_compaction = self.memory.add_turn(user_id, "assistant", response)
+        if needs_compaction and user_id not in self._compacting:
+            # Contexto vazio: o resumo tem o próprio orçamento, não o que resta da requisição
+            task = asyncio.get_running_loop().create_task(
+                self._compact_summary(user_id), context=contextvars.Context()
+            )
+            self._compacting[user_id] = task
+            task.add_done_callback(lambda _: self._compacting.pop(user_id, None))
+    
+    async def _compact_summary(self, user_id: str) -> None:
+        """Resume os turnos antigos com o LLM para manter o resumo dentro do limite"""
+        summary = self.memory.get_summary(user_id)
+        prompt = f"""Resuma a conversa abaixo em no máximo {SUMMARY_MAX_TOKENS // 2} palavras.
+Mantenha preferências, produtos, marcas e dados citados pelo usuário.
+
+{summary}"""
+        try:
+            compacted = await run_with_budget(
+                self.llm_client.chat_completion(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.1,
+                    max_tokens=SUMMARY_MAX_TOKENS
+                ),
+                STAGE_TIMEOUT_COMPLETION
+            )
+        except Exception as e:
+            # O resumo continua limitado pelo corte rígido da memória
+            print(f"Erro ao resumir conversa: {e!r}")
+            return
+        self.memory.set_summary(user_id, compacted, previous=summary)
     
     async def _handle_general_question(self, message: str, user_id: str) -> str:
         """Rota 3: Perguntas gerais com GPT"""
-        response = self.client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": message}],
-            temperature=0.7
+        return await self._completion(
+            self._general_messages(message, user_id), fallback=TIMEOUT_MESSAGE
         )
-        
-        return response.choices[0].message.content
     
-
+    async def refresh_brands(self) -> None:
+        """
+        Atualiza o matcher de marcas do fallback com a lista do catálogo
+        """
+        try:
+            await self.intent_detector.refresh_brands(self.catalog_api)
+        except Exception as e:
+            print(f"Erro ao atualizar marcas: {e}")
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna métricas internas do pipeline (LLM, caches e etapas)
+        """
+        metrics = {
+            "llm": self.llm_client.get_metrics(),
+            "intent_cache": self.intent_detector.get_cache_metrics(),
+            "stages": self.stage_metrics.get_metrics(),
+            "conversation_memory": self.memory.get_metrics(),
+            "faq": self.faq_store.get_metrics(),
+            "catalog_cache": self.catalog_api.get_cache_metrics(),
+            "catalog_mirror": self.catalog_api.get_mirror_metrics(),
+            "catalog_semantic": self.catalog_api.get_semantic_metrics()
+        }
+        if self.intent_router is not None:
+            metrics["intent_router"] = self.intent_router.get_metrics()
+        batch_metrics = self.intent_detector.get_batch_metrics()
+        if batch_metrics is not None:
+            metrics["intent_batcher"] = batch_metrics
+        return metrics
     
     def clear_conversation(self, user_id: str) -> None:
-        """Limpa conversa (mantido para compatibilidade)"""
-        pass
+        """Limpa o histórico de conversa do usuário"""
+        self.memory.clear(user_id)
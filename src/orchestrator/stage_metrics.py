@@ -0,0 +1,53 @@
+from typing import Dict, Any, Awaitable, TypeVar
+import asyncio
+import time
+
+T = TypeVar("T")
+
+class StageMetrics:
+    """
+    Acumula tempos e resultados (ok, erro, timeout, cancelado) por etapa do pipeline
+    """
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+    
+    def record(self, stage: str, elapsed: float, outcome: str = "ok") -> None:
+        """
+        Registra a execução de uma etapa
+        """
+        stats = self.stages.setdefault(stage, {"runs": 0, "total_ms": 0.0})
+        stats["runs"] += 1
+        stats["total_ms"] += elapsed * 1000
+        stats[outcome] = stats.get(outcome, 0) + 1
+    
+    async def timed(self, stage: str, awaitable: Awaitable[T]) -> T:
+        """
+        Aguarda `awaitable` registrando duração e resultado da etapa
+        """
+        start = time.perf_counter()
+        try:
+            result = await awaitable
+        except asyncio.CancelledError:
+            self.record(stage, time.perf_counter() - start, "cancelled")
+            raise
+        except asyncio.TimeoutError:
+            self.record(stage, time.perf_counter() - start, "timeout")
+            raise
+        except Exception:
+            self.record(stage, time.perf_counter() - start, "error")
+            raise
+        self.record(stage, time.perf_counter() - start)
+        return result
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna as estatísticas por etapa com a média em milissegundos
+        """
+        return {
+            stage: {
+                **stats,
+                "total_ms": round(stats["total_ms"], 2),
+                "avg_ms": round(stats["total_ms"] / stats["runs"], 2)
+            }
+            for stage, stats in self.stages.items()
+        }
@@ -0,0 +1,68 @@
+from typing import Any, AsyncIterator, Awaitable, Optional, TypeVar
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import time
+
+T = TypeVar("T")
+
+# Prazo absoluto (time.monotonic) da requisição atual; propagado para as
+# tasks criadas a partir dela
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """
+    Define o prazo da requisição atual para as etapas executadas dentro do bloco
+    """
+    if seconds is None:
+        yield
+        return
+    
+    token = _request_deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+def remaining_time() -> Optional[float]:
+    """
+    Segundos restantes até o prazo da requisição, ou None se não houver prazo
+    """
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+def stage_budget(budget: float) -> float:
+    """
+    Tempo disponível para uma etapa: o menor entre seu orçamento e o restante da requisição
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return budget
+    return min(budget, remaining)
+
+async def run_with_budget(awaitable: Awaitable[T], budget: float) -> T:
+    """
+    Aguarda `awaitable` respeitando o orçamento da etapa.
+    Levanta asyncio.TimeoutError se o tempo acabar.
+    """
+    return await asyncio.wait_for(awaitable, timeout=stage_budget(budget))
+
+async def iterate_with_budget(iterator: AsyncIterator[Any], budget: float) -> AsyncIterator[Any]:
+    """
+    Repassa os itens de um iterador assíncrono até o fim do orçamento da etapa.
+    Levanta asyncio.TimeoutError se o tempo acabar antes do fim.
+    """
+    ends_at = time.monotonic() + stage_budget(budget)
+    iterator = iterator.__aiter__()
+    while True:
+        try:
+            item = await asyncio.wait_for(
+                iterator.__anext__(),
+                timeout=max(0.0, ends_at - time.monotonic())
+            )
+        except StopAsyncIteration:
+            return
+        yield item
@@ -0,0 +1,140 @@
+from typing import Any, AsyncIterator, Dict, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import aiohttp
+from src.config import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_TIMEOUT
+)
+
+class HTTPClient:
+    """
+    Sessão aiohttp compartilhada pelas integrações (catálogo, pagamento, WhatsApp).
+    
+    Mantém um pool de conexões por host com keep-alive e cache de DNS, evitando
+    uma nova conexão TCP + TLS + DNS a cada chamada. A sessão é aberta no
+    startup da aplicação (ou no primeiro uso) e fechada no shutdown.
+    """
+    
+    def __init__(
+        self,
+        limit: int = HTTP_POOL_LIMIT,
+        limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = HTTP_DNS_CACHE_TTL,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        timeout: float = HTTP_TIMEOUT
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = 0
+        self.sessions_opened = 0
+    
+    async def start(self) -> aiohttp.ClientSession:
+        """
+        Abre a sessão (se ainda não estiver aberta no loop atual)
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+        
+        stale = self._session
+        if stale is not None and not stale.closed:
+            # Sessão criada em outro loop: fecha antes de trocar para não vazar o pool
+            try:
+                await stale.close()
+            except Exception as e:
+                print(f"Erro ao fechar sessão HTTP do loop anterior: {e!r}")
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.dns_cache_ttl > 0,
+            ttl_dns_cache=self.dns_cache_ttl or None
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        self._loop = loop
+        self.sessions_opened += 1
+        return self._session
+    
+    async def close(self) -> None:
+        """
+        Fecha a sessão e as conexões do pool
+        """
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+    
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Faz uma requisição usando o pool compartilhado
+        
+        Aceita os mesmos argumentos de aiohttp.ClientSession.request (incluindo
+        `timeout` por chamada). A conexão volta ao pool ao sair do bloco.
+        """
+        session = await self.start()
+        self.requests += 1
+        async with session.request(method, url, **kwargs) as response:
+            yield response
+    
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna a ocupação do pool de conexões
+        """
+        metrics = {
+            "open": self._session is not None and not self._session.closed,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "requests": self.requests,
+            "sessions_opened": self.sessions_opened,
+            "in_use": 0,
+            "idle": 0,
+            "waiting": 0,
+            "utilization": 0.0,
+            "hosts": {}
+        }
+        if not metrics["open"]:
+            return metrics
+        
+        # O aiohttp não expõe o estado do pool publicamente: atributos privados do
+        # TCPConnector, conferidos do 3.9 (versão do requirements) ao 3.14. Se
+        # sumirem numa versão futura, as métricas zeram em vez de quebrar
+        connector = self._session.connector
+        acquired_per_host = getattr(connector, "_acquired_per_host", {})
+        idle_per_host = getattr(connector, "_conns", {})
+        waiters = getattr(connector, "_waiters", {})
+        
+        metrics["in_use"] = len(getattr(connector, "_acquired", ()))
+        metrics["idle"] = sum(len(conns) for conns in idle_per_host.values())
+        metrics["waiting"] = sum(len(queue) for queue in waiters.values())
+        if self.limit:
+            metrics["utilization"] = round(metrics["in_use"] / self.limit, 4)
+        
+        for key in set(acquired_per_host) | set(idle_per_host):
+            in_use = len(acquired_per_host.get(key, ()))
+            metrics["hosts"][f"{key.host}:{key.port}"] = {
+                "in_use": in_use,
+                "idle": len(idle_per_host.get(key, ())),
+                "utilization": round(in_use / self.limit_per_host, 4) if self.limit_per_host else 0.0
+            }
+        return metrics
+
+# Instância compartilhada pela aplicação
+http_client = HTTPClient()
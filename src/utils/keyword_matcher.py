@@ -0,0 +1,103 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from collections import deque
+from .text import normalize_text
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int
+    keyword: str
+    value: Any
+
+class KeywordMatcher:
+    """
+    Busca de várias palavras-chave em uma única passada (Aho-Corasick).
+    Texto e palavras-chave são normalizados (minúsculas, sem acentos e sem
+    pontuação) antes da comparação.
+    """
+    def __init__(self, keywords: Optional[Iterable[Tuple[str, Any, bool]]] = None):
+        # Cada nó: transições, link de falha e saídas (palavra, valor, palavra inteira)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[str, Any, bool]]] = [[]]
+        self._compiled = True
+        self.size = 0
+        
+        for keyword, value, whole_word in keywords or []:
+            self.add(keyword, value, whole_word)
+    
+    def add(self, keyword: str, value: Any = None, whole_word: bool = True) -> None:
+        """
+        Adiciona uma palavra-chave. Com `whole_word=False` basta que o texto
+        tenha uma palavra começando pela chave ("produto" casa "produtos").
+        """
+        keyword = normalize_text(keyword)
+        if not keyword:
+            return
+        
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        
+        self._outputs[node].append((keyword, value if value is not None else keyword, whole_word))
+        self._compiled = False
+        self.size += 1
+    
+    def _compile(self) -> None:
+        """Calcula os links de falha (BFS a partir da raiz)"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+        
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+        
+        self._compiled = True
+    
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """
+        Retorna todas as ocorrências das palavras-chave que começam em início de palavra
+        """
+        if not self._compiled:
+            self._compile()
+        
+        text = normalize_text(text)
+        matches = []
+        node = 0
+        
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            
+            output_node = node
+            while output_node:
+                for keyword, value, whole_word in self._outputs[output_node]:
+                    start = position - len(keyword) + 1
+                    end = position + 1
+                    if start > 0 and text[start - 1] != " ":
+                        continue
+                    if whole_word and end < len(text) and text[end] != " ":
+                        continue
+                    matches.append(KeywordMatch(start, end, keyword, value))
+                output_node = self._fail[output_node]
+        
+        return matches
+    
+    def __len__(self) -> int:
+        return self.size
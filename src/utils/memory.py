@@ -0,0 +1,34 @@
+from typing import Dict
+import resource
+import sys
+
+# Campos de /proc/self/status e /proc/self/smaps_rollup (em kB)
+PROC_FIELDS = {
+    "VmRSS": "rss_mb",
+    "RssAnon": "rss_anon_mb",
+    "RssFile": "rss_file_mb",
+    "Pss": "pss_mb"
+}
+
+def process_memory() -> Dict[str, float]:
+    """
+    Memória do processo atual em MB.
+
+    No Linux separa a memória residente anônima (exclusiva do processo) da
+    mapeada de arquivos (page cache, compartilhável entre processos) e
+    informa o PSS, que divide as páginas compartilhadas entre quem as usa.
+    """
+    memory = {}
+    try:
+        for path in ("/proc/self/status", "/proc/self/smaps_rollup"):
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in PROC_FIELDS:
+                        memory[PROC_FIELDS[key]] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        # Fora do Linux: apenas o pico de memória residente
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory["max_rss_mb"] = round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+    return memory
@@ -0,0 +1,84 @@
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+import asyncio
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Agrupa itens que chegam dentro de uma janela curta (ou até atingir
+    `max_size`) e os processa com uma única chamada ao `handler`, devolvendo
+    a cada chamador o resultado correspondente
+    """
+    def __init__(
+        self,
+        handler: Callable[[List[T]], Awaitable[List[R]]],
+        window: float = 0.02,
+        max_size: int = 16
+    ):
+        self.handler = handler
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # O loop guarda só referências fracas às tasks: sem este conjunto, um
+        # lote em andamento pode ser coletado pelo GC
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+    
+    async def submit(self, item: T) -> R:
+        """
+        Enfileira um item e aguarda o resultado do lote
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        
+        # Itens repetidos no mesmo lote são enviados uma única vez
+        unique_items = list(dict.fromkeys(item for item, _ in batch))
+        
+        try:
+            results = await self.handler(unique_items)
+            by_item = dict(zip(unique_items, results))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for item, future in batch:
+            if not future.done():
+                future.set_result(by_item.get(item))
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Retorna o número de lotes e o tamanho médio dos lotes
+        """
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0
+        }
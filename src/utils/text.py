@@ -0,0 +1,21 @@
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+def strip_accents(text: str) -> str:
+    """
+    Remove acentos mantendo os caracteres base ("horário" → "horario")
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza texto para comparação: minúsculas, sem acentos,
+    sem pontuação e com espaços colapsados
+    """
+    text = strip_accents(text.lower())
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
@@ -0,0 +1,25 @@
+from typing import Dict, List
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    # tiktoken ausente ou sem acesso ao arquivo de vocabulário
+    _encoding = None
+
+def count_tokens(text: str) -> int:
+    """
+    Conta tokens no vocabulário dos modelos de chat (aprox. 4 caracteres por
+    token se o tiktoken não estiver disponível)
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Conta tokens de uma lista de mensagens, incluindo o custo fixo por mensagem
+    """
+    return sum(count_tokens(message["content"]) + 4 for message in messages)
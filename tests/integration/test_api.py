@@ -44,3 +44,19 @@ def test_process_message_endpoint(test_client):
     assert response.status_code == 200
     data = response.json()
     assert "response" in data
+
+def test_stream_message_endpoint(test_client):
+    with test_client.stream(
+        "POST",
+        "/message/stream",
+        json={
+            "user_id": "user1",
+            "message": "olá",
+            "channel": "whatsapp"
+        }
+    ) as response:
+        body = "".join(response.iter_text())
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: done" in body
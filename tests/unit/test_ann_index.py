@@ -0,0 +1,43 @@
+import pytest
+import faiss
+import numpy as np
+from src.faq.ann_index import ANNIndexFactory
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((20, 32)).astype(np.float32)
+    data = centers[rng.integers(0, 20, 2000)] + 0.3 * rng.standard_normal((2000, 32)).astype(np.float32)
+    faiss.normalize_L2(data)
+    return data
+
+@pytest.mark.parametrize("index_type", ["flat", "sq8", "hnsw", "ivf_flat", "ivf_pq"])
+def test_index_types_find_nearest_neighbour(vectors, index_type):
+    ids = np.arange(len(vectors), dtype=np.int64) + 100
+    factory = ANNIndexFactory(index_type, ivf_nprobe=8, pq_m=16, pq_nbits=4)
+    index = factory.build(vectors, ids)
+
+    # PQ é aproximado: basta o vizinho exato estar entre os 10 primeiros
+    k = 10 if index_type == "ivf_pq" else 1
+    _, found = index.search(vectors[:50], k)
+
+    recall = np.mean([expected in row for expected, row in zip(ids[:50], found)])
+    assert recall >= 0.95
+
+def test_small_corpus_falls_back_to_exact_index(vectors):
+    factory = ANNIndexFactory("ivf_pq", pq_m=8)
+    index = factory.build(vectors[:10], np.arange(10, dtype=np.int64))
+
+    assert index.ntotal == 10
+    assert factory.needs_training(index, 10, 32) is False
+    assert factory.needs_training(index, 2000, 32) is True
+
+def test_removal_support(vectors):
+    ids = np.arange(len(vectors), dtype=np.int64)
+
+    assert ANNIndexFactory.supports_removal(ANNIndexFactory("ivf_flat").build(vectors, ids))
+    assert not ANNIndexFactory.supports_removal(ANNIndexFactory("hnsw").build(vectors, ids))
+
+def test_invalid_index_type():
+    with pytest.raises(ValueError):
+        ANNIndexFactory("lsh")
@@ -0,0 +1,43 @@
+import pytest
+import asyncio
+from src.catalog.catalog_api import CatalogAPI, CatalogUnavailable
+
+class FakeCatalogAPI(CatalogAPI):
+    def __init__(self):
+        super().__init__(mirror_enabled=False, semantic_search=False)
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+    
+    async def _fetch_product(self, product_id):
+        self.calls.append(product_id)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if product_id == "404":
+            return None
+        if product_id == "500":
+            raise CatalogUnavailable("HTTP 500")
+        return {"id": product_id}
+
+@pytest.mark.asyncio
+async def test_get_products_dedupes_uses_cache_and_keeps_order():
+    catalog = FakeCatalogAPI()
+    await catalog.get_product("1")
+    
+    ids = ["3", "1", "2", "3", "404", "500", "4", "5", "6"]
+    products = await catalog.get_products(ids, concurrency=2)
+    
+    assert products == [
+        {"id": "3"}, {"id": "1"}, {"id": "2"}, {"id": "3"}, None, None,
+        {"id": "4"}, {"id": "5"}, {"id": "6"}
+    ]
+    # "1" veio do cache e "3" foi buscado uma única vez
+    assert sorted(catalog.calls) == ["1", "2", "3", "4", "404", "5", "500", "6"]
+    assert catalog.peak == 2
+    
+    # 404 fica no cache negativo; o erro 500 não é cacheado
+    await catalog.get_products(["404", "500"])
+    assert catalog.calls.count("404") == 1
+    assert catalog.calls.count("500") == 2
@@ -0,0 +1,73 @@
+import pytest
+from src.catalog.catalog_mirror import CatalogMirror
+from src.catalog.product_index import ProductSearchIndex
+
+PRODUCTS = [
+    {"id": 1, "titulo": "Perfume Lattafa Khamrah Eau de Parfum 100ml", "marca": {"nome": "Lattafa"}, "codigo": "LAT-001"},
+    {"id": 2, "titulo": "Perfume Armaf Club de Nuit Intense", "marca": "Armaf", "codigo": "ARM-002"},
+    {"id": 3, "titulo": "Celular Xiaomi Redmi Note 13", "marca": "Xiaomi", "codigo": "XIA-013"},
+    {"id": 4, "titulo": "Água de Colônia Cítrica", "marca": "Natura", "codigo": "NAT-004"}
+]
+
+def titles(results):
+    return [product["id"] for product in results]
+
+def test_index_matches_accents_prefixes_typos_and_codes():
+    index = ProductSearchIndex()
+    index.replace_all(PRODUCTS)
+    
+    assert titles(index.search("agua citrica")) == [4]
+    assert titles(index.search("khamr")) == [1]
+    assert titles(index.search("latafa")) == [1]
+    assert titles(index.search("xiaomj")) == [3]
+    assert titles(index.search("xiaomi redmi")) == [3]
+    assert titles(index.search("arm 002")) == [2]
+    assert titles(index.search("perfume")) == [1, 2]
+    assert index.search("geladeira") == []
+
+def test_index_applies_listing_diff():
+    index = ProductSearchIndex()
+    index.replace_all(PRODUCTS)
+    
+    renamed = dict(PRODUCTS[2], titulo="Celular Xiaomi Poco X6")
+    assert index.replace_all([PRODUCTS[0], renamed]) == (0, 1, 2)
+    
+    assert titles(index.search("poco")) == [3]
+    assert index.search("redmi") == []
+    assert index.search("armaf") == []
+    assert len(index) == 2
+
+class FakeCatalog:
+    def __init__(self, products, page_size):
+        self.products = products
+        self.page_size = page_size
+        self.down = False
+        self.pages = []
+    
+    async def fetch_page(self, page, per_page):
+        if self.down:
+            raise ConnectionError("API fora do ar")
+        self.pages.append(page)
+        start = (page - 1) * per_page
+        items = self.products[start:start + per_page]
+        return items, start + per_page < len(self.products)
+
+@pytest.mark.asyncio
+async def test_mirror_syncs_persists_and_survives_outage(tmp_path):
+    path = str(tmp_path / "catalog_mirror.json.gz")
+    catalog = FakeCatalog(list(PRODUCTS), page_size=3)
+    mirror = CatalogMirror(catalog.fetch_page, path, page_size=3)
+    
+    assert not mirror.ready
+    assert await mirror.sync() is True
+    assert catalog.pages == [1, 2]
+    assert titles(mirror.search("lattafa")) == [1]
+    
+    # Novo processo com a API fora do ar: responde a partir do arquivo
+    catalog.down = True
+    restarted = CatalogMirror(catalog.fetch_page, path, page_size=3)
+    
+    assert restarted.ready
+    assert await restarted.sync() is False
+    assert titles(restarted.search("redmi")) == [3]
+    assert restarted.get_metrics()["sync_errors"] == 1
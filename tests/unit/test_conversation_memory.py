@@ -0,0 +1,45 @@
+import pytest
+from src.orchestrator.conversation_memory import ConversationMemory
+
+def test_old_turns_are_folded_into_summary():
+    memory = ConversationMemory(max_turns=2, max_tokens=1000)
+    memory.add_turn("user1", "user", "quero perfume lattafa")
+    memory.add_turn("user1", "assistant", "temos o Asad")
+    memory.add_turn("user1", "user", "e o preço?")
+    
+    messages = memory.build_messages("user1", "obrigado", token_budget=1000)
+    
+    assert "quero perfume lattafa" in messages[0]["content"]
+    assert [m["content"] for m in messages[1:]] == ["temos o Asad", "e o preço?", "obrigado"]
+
+def test_prompt_respects_token_budget_and_reports_savings():
+    memory = ConversationMemory(max_turns=50, max_tokens=100000)
+    for i in range(20):
+        memory.add_turn("user1", "user", "mensagem longa " * 20)
+    
+    messages = memory.build_messages("user1", "oi", token_budget=100)
+    
+    assert len(messages) < 21
+    assert messages[-1]["content"] == "oi"
+    metrics = memory.get_metrics()
+    assert metrics["prompt_tokens"] <= 100
+    assert metrics["saved_tokens"] > 0
+
+def test_user_count_is_bounded():
+    memory = ConversationMemory(max_users=2)
+    for user_id in ["a", "b", "c"]:
+        memory.add_turn(user_id, "user", "oi")
+    
+    assert list(memory.conversations) == ["b", "c"]
+    assert memory.get_metrics()["evicted_users"] == 1
+
+def test_set_summary_keeps_turns_folded_during_compaction():
+    memory = ConversationMemory(max_turns=1)
+    memory.add_turn("user1", "user", "primeira")
+    memory.add_turn("user1", "user", "segunda")
+    previous = memory.get_summary("user1")
+    memory.add_turn("user1", "user", "terceira")
+    
+    memory.set_summary("user1", "resumo curto", previous=previous)
+    
+    assert memory.get_summary("user1") == "resumo curto\nUsuário: segunda"
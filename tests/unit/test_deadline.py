@@ -0,0 +1,23 @@
+import pytest
+import asyncio
+from src.utils.deadline import request_deadline, remaining_time, stage_budget, run_with_budget
+
+def test_stage_budget_without_deadline():
+    assert remaining_time() is None
+    assert stage_budget(3) == 3
+
+def test_stage_budget_capped_by_request_deadline():
+    with request_deadline(1):
+        assert stage_budget(3) <= 1
+        assert stage_budget(0.5) == 0.5
+    assert remaining_time() is None
+
+@pytest.mark.asyncio
+async def test_deadline_propagates_to_tasks_and_times_out():
+    async def slow():
+        await asyncio.sleep(1)
+    
+    with request_deadline(0.05):
+        task = asyncio.create_task(run_with_budget(slow(), 10))
+        with pytest.raises(asyncio.TimeoutError):
+            await task
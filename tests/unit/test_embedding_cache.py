@@ -0,0 +1,46 @@
+import pytest
+import numpy as np
+from src.cache.embedding_cache import EmbeddingCache
+
+@pytest.mark.asyncio
+async def test_memory_hit_uses_normalized_text():
+    cache = EmbeddingCache(max_size=10)
+    await cache.set("Qual o horário?", "ada", [0.1, 0.2])
+    
+    vector = await cache.get("qual o horario", "ada")
+    
+    assert np.allclose(vector, [0.1, 0.2])
+    assert await cache.get("qual o horario", "outro-modelo") is None
+    assert cache.get_metrics()["memory_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    await EmbeddingCache(disk_path=path).set("prazo de entrega", "ada", [1.0, 2.0, 3.0])
+    
+    restarted = EmbeddingCache(disk_path=path)
+    vector = await restarted.get("Prazo de entrega?", "ada")
+    
+    assert vector.dtype == np.float32
+    assert np.allclose(vector, [1.0, 2.0, 3.0])
+    assert restarted.get_metrics()["disk_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_disk_tier_prunes_oldest_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.cache.embedding_cache.PRUNE_INTERVAL", 1)
+    path = str(tmp_path / "cache.sqlite")
+    cache = EmbeddingCache(disk_path=path, disk_max_rows=3)
+    for i in range(5):
+        await cache.set(f"pergunta {i}", "ada", [float(i)])
+    
+    restarted = EmbeddingCache(disk_path=path, disk_max_rows=3)
+    
+    assert await restarted.get("pergunta 0", "ada") is None
+    assert await restarted.get("pergunta 1", "ada") is None
+    assert np.allclose(await restarted.get("pergunta 4", "ada"), [4.0])
+    assert cache.get_metrics()["disk_pruned"] == 2
+    
+    # Limite reduzido: a abertura já remove o excedente
+    smaller = EmbeddingCache(disk_path=path, disk_max_rows=1)
+    assert smaller.get_metrics()["disk_pruned"] == 2
+    assert np.allclose(await EmbeddingCache(disk_path=path).get("pergunta 4", "ada"), [4.0])
@@ -0,0 +1,39 @@
+import pytest
+from src.orchestrator.intent_detector import IntentType
+from src.orchestrator.embedding_intent_classifier import EmbeddingIntentClassifier
+
+VECTORS = {
+    "horario": [1.0, 0.0, 0.0],
+    "perfume": [0.0, 1.0, 0.0],
+    "ola": [0.0, 0.0, 1.0],
+    "ambiguo": [1.0, 1.0, 0.0],
+}
+
+class FakeLLMClient:
+    async def create_embedding(self, text, model=None):
+        return VECTORS[text]
+    
+    async def create_embeddings(self, texts, model=None):
+        return [VECTORS[t] for t in texts]
+
+def make_classifier():
+    examples = {
+        IntentType.FAQ: ["horario"],
+        IntentType.PRODUCT_SEARCH: ["perfume"],
+        IntentType.GENERAL: ["ola"],
+    }
+    return EmbeddingIntentClassifier(FakeLLMClient(), examples, margin=0.1, min_score=0.5)
+
+@pytest.mark.asyncio
+async def test_confident_match_is_routed_locally():
+    classifier = make_classifier()
+    
+    assert await classifier.classify("perfume") == IntentType.PRODUCT_SEARCH
+    assert classifier.get_metrics()["local_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_low_margin_escalates():
+    classifier = make_classifier()
+    
+    assert await classifier.classify("ambiguo") is None
+    assert classifier.get_metrics()["escalations"] == 1
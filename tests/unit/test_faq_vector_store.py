@@ -0,0 +1,216 @@
+import pytest
+import asyncio
+import json
+import numpy as np
+from src.faq.faq_vector_store import FAQVectorStore
+
+class FakeLLMClient:
+    def __init__(self, vectors):
+        self.vectors = vectors
+    
+    async def create_embedding(self, text, model=None):
+        return self.vectors[text]
+
+@pytest.fixture
+def legacy_store_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dados").mkdir()
+    legacy = {
+        "faqs": [
+            {"pergunta": "Qual o horário?", "resposta": "8h às 18h"},
+            {"pergunta": "Qual o prazo de entrega?", "resposta": "2 a 5 dias"}
+        ],
+        "embeddings": [[3.0, 0.0, 0.0], [0.0, 2.0, 0.0]]
+    }
+    (tmp_path / "dados" / "faq_embeddings.json").write_text(json.dumps(legacy))
+    return tmp_path
+
+@pytest.mark.asyncio
+async def test_legacy_json_is_migrated_to_binary(legacy_store_dir):
+    llm_client = FakeLLMClient({"que horas abre?": [1.0, 0.1, 0.0]})
+    store = FAQVectorStore(llm_client)
+    
+    assert (legacy_store_dir / "dados" / "faq_embeddings.npy").exists()
+    assert (legacy_store_dir / "dados" / "faq_metadata.json").exists()
+    assert await store.search_faq("que horas abre?") == "8h às 18h"
+    
+    reloaded = FAQVectorStore(llm_client)
+    
+    assert isinstance(reloaded.embeddings, np.memmap)
+    assert np.allclose(np.linalg.norm(reloaded.embeddings, axis=1), 1.0)
+    assert await reloaded.search_faq("que horas abre?") == "8h às 18h"
+
+class BatchLLMClient(FakeLLMClient):
+    def __init__(self, vectors):
+        super().__init__(vectors)
+        self.batches = []
+    
+    async def create_embeddings(self, texts, model=None):
+        self.batches.append(list(texts))
+        return [self.vectors[text] for text in texts]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_mmap", [True, False])
+async def test_incremental_ingestion_only_embeds_changes(legacy_store_dir, monkeypatch, index_mmap):
+    # Índice mapeado do disco é somente leitura: alterações usam uma cópia
+    monkeypatch.setattr("src.faq.faq_vector_store.FAQ_INDEX_MMAP", index_mmap)
+    llm_client = BatchLLMClient({
+        "Aceitam PIX?": [0.0, 0.0, 1.0],
+        "pix?": [0.0, 0.1, 1.0],
+        "Qual o horário de atendimento?": [1.0, 0.0, 0.0],
+        "que horas abre?": [1.0, 0.1, 0.0]
+    })
+    store = FAQVectorStore(llm_client)
+    
+    summary = await store.upsert_faqs([
+        {"pergunta": "Aceitam PIX?", "resposta": "Sim"},
+        {"pergunta": "Qual o prazo de entrega?", "resposta": "2 a 5 dias"}
+    ])
+    
+    assert summary == {"added": 1, "updated": 0, "unchanged": 1}
+    assert llm_client.batches == [["Aceitam PIX?"]]
+    assert await store.search_faq("pix?") == "Sim"
+    
+    # Mudar só a resposta não gera novo embedding
+    faq_id = store.faq_data[0]["id"]
+    await store.update_faq(faq_id, resposta="9h às 18h")
+    assert len(llm_client.batches) == 1
+    assert await store.search_faq("que horas abre?") == "9h às 18h"
+    
+    await store.update_faq(faq_id, pergunta="Qual o horário de atendimento?")
+    assert llm_client.batches[-1] == ["Qual o horário de atendimento?"]
+    
+    assert await store.delete_faq(faq_id)
+    assert await store.search_faq("que horas abre?") is None
+    
+    reloaded = FAQVectorStore(llm_client)
+    assert [faq["pergunta"] for faq in reloaded.faq_data] == [
+        "Qual o prazo de entrega?", "Aceitam PIX?"
+    ]
+    assert await reloaded.search_faq("pix?") == "Sim"
+
+@pytest.mark.asyncio
+async def test_hnsw_index_is_persisted_and_rebuilt_on_update(legacy_store_dir, monkeypatch):
+    monkeypatch.setattr("src.faq.faq_vector_store.FAQ_INDEX_TYPE", "hnsw")
+    llm_client = BatchLLMClient({
+        "Qual o horário de atendimento?": [0.0, 0.0, 1.0],
+        "que horas abre?": [1.0, 0.1, 0.0],
+        "atendimento?": [0.0, 0.1, 1.0]
+    })
+    FAQVectorStore(llm_client)
+    
+    assert (legacy_store_dir / "dados" / "faq_index.faiss").exists()
+    
+    store = FAQVectorStore(llm_client)
+    assert not store.index_factory.supports_removal(store.index)
+    assert await store.search_faq("que horas abre?") == "8h às 18h"
+    
+    await store.update_faq(store.faq_data[0]["id"], pergunta="Qual o horário de atendimento?")
+    
+    assert store.index.ntotal == 2
+    assert await store.search_faq("atendimento?") == "8h às 18h"
+    assert await store.search_faq("que horas abre?") is None
+
+class FailingLLMClient:
+    async def create_embedding(self, text, model=None):
+        raise RuntimeError("provedor indisponível")
+
+@pytest.mark.asyncio
+async def test_faiss_without_index_mmap_reads_index_into_memory(legacy_store_dir, monkeypatch):
+    # faiss < 1.8 (ex.: 1.7.4 do requirements) não tem IO_FLAG_MMAP_IFC
+    monkeypatch.setattr("src.faq.faq_vector_store.INDEX_MMAP_FLAG", None)
+    llm_client = FakeLLMClient({"que horas abre?": [1.0, 0.1, 0.0]})
+    FAQVectorStore(llm_client)
+    
+    reloaded = FAQVectorStore(llm_client)
+    
+    assert isinstance(reloaded.embeddings, np.memmap)
+    assert await reloaded.search_faq("que horas abre?") == "8h às 18h"
+
+@pytest.mark.asyncio
+async def test_quantized_index_and_float16_vectors(legacy_store_dir, monkeypatch):
+    monkeypatch.setattr("src.faq.faq_vector_store.FAQ_INDEX_TYPE", "sq8")
+    monkeypatch.setattr("src.faq.faq_vector_store.FAQ_EMBEDDING_DTYPE", "float16")
+    llm_client = FakeLLMClient({"que horas abre?": [1.0, 0.1, 0.0], "entrega?": [0.05, 1.0, 0.0]})
+    store = FAQVectorStore(llm_client)
+    metadata = json.loads((legacy_store_dir / "dados" / "faq_metadata.json").read_text())
+    
+    assert store.embeddings.dtype == np.float16
+    assert metadata["dtype"] == "float16"
+    assert metadata["index"]["type"] == "sq8"
+    assert await store.search_faq("que horas abre?") == "8h às 18h"
+    assert await store.search_faq("entrega?") == "2 a 5 dias"
+    
+    # Voltar para float32 regrava os vetores na nova precisão
+    monkeypatch.setattr("src.faq.faq_vector_store.FAQ_EMBEDDING_DTYPE", "float32")
+    reloaded = FAQVectorStore(llm_client)
+    
+    assert reloaded.embeddings.dtype == np.float32
+    assert await reloaded.search_faq("que horas abre?") == "8h às 18h"
+
+@pytest.mark.asyncio
+async def test_keyword_questions_survive_provider_outage(legacy_store_dir):
+    store = FAQVectorStore(FailingLLMClient())
+    
+    assert await store.search_faq("prazo de entrega?") == "2 a 5 dias"
+    assert await store.search_faq("vocês vendem perfumes?") is None
+    
+    metrics = store.get_metrics()
+    assert metrics["lexical_hits"] == 1
+    assert metrics["lexical_fallbacks"] == 1
+
+@pytest.mark.asyncio
+async def test_local_embedder_needs_no_network(legacy_store_dir, monkeypatch):
+    monkeypatch.setattr("src.faq.faq_vector_store.FAQ_EMBEDDER", "local")
+    store = FAQVectorStore(FailingLLMClient())
+    
+    assert store.embedding_model.startswith("local-hashing")
+    assert store.embeddings.shape == (2, 512)
+    assert await store.search_faq("qual o horario") == "8h às 18h"
+
+class SlowLLMClient(BatchLLMClient):
+    async def create_embedding(self, text, model=None):
+        await asyncio.sleep(0.05)
+        return self.vectors[text]
+
+@pytest.mark.asyncio
+async def test_reload_swaps_snapshot_without_disturbing_searches(legacy_store_dir):
+    llm_client = SlowLLMClient({
+        "Aceitam PIX?": [0.0, 0.0, 1.0],
+        "que horas abre?": [1.0, 0.1, 0.0],
+        "pagam com pix?": [0.0, 0.1, 1.0]
+    })
+    serving = FAQVectorStore(llm_client)
+    old_snapshot = serving.snapshot
+    
+    # Outro processo (ex.: importação) altera os arquivos
+    writer = FAQVectorStore(llm_client)
+    await writer.delete_faq(writer.faq_data[0]["id"])
+    await writer.add_faq("Aceitam PIX?", "Sim")
+    
+    in_flight = asyncio.create_task(serving.search_faq("que horas abre?"))
+    await asyncio.sleep(0.01)
+    assert await serving.reload()
+    
+    assert await in_flight == "8h às 18h"
+    assert serving.snapshot is not old_snapshot
+    assert [faq["pergunta"] for faq in serving.faq_data] == ["Qual o prazo de entrega?", "Aceitam PIX?"]
+    assert await serving.search_faq("pagam com pix?") == "Sim"
+    assert serving.get_metrics()["reloads"] == 1
+
+@pytest.mark.asyncio
+async def test_file_watcher_reloads_changed_files(legacy_store_dir):
+    llm_client = BatchLLMClient({"Aceitam PIX?": [0.0, 0.0, 1.0]})
+    serving = FAQVectorStore(llm_client)
+    watcher = asyncio.create_task(serving.watch_files(0.01))
+    
+    await asyncio.sleep(0.03)
+    assert serving.reloads == 0
+    
+    await FAQVectorStore(llm_client).add_faq("Aceitam PIX?", "Sim")
+    await asyncio.sleep(0.1)
+    watcher.cancel()
+    
+    assert serving.reloads == 1
+    assert len(serving.faq_data) == 3
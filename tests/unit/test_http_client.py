@@ -0,0 +1,60 @@
+import pytest
+import asyncio
+from aiohttp import web
+from src.catalog.catalog_api import CatalogAPI
+from src.utils.http_client import HTTPClient
+
+@pytest.fixture
+async def server():
+    peers = []
+    
+    async def product(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        product_id = request.match_info["product_id"]
+        if product_id == "404":
+            return web.json_response({}, status=404)
+        return web.json_response({"id": product_id})
+    
+    app = web.Application()
+    app.router.add_get("/products/{product_id}", product)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", peers
+    await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connection(server):
+    base_url, peers = server
+    http_client = HTTPClient(limit=10, limit_per_host=2)
+    catalog = CatalogAPI(http_client=http_client)
+    catalog.base_url = base_url
+    
+    assert await catalog.get_product("1") == {"id": "1"}
+    assert await catalog.get_product("2") == {"id": "2"}
+    assert await catalog.get_product("404") is None
+    
+    # Mesma conexão TCP (keep-alive) para as três chamadas
+    assert len(set(peers)) == 1
+    metrics = http_client.get_metrics()
+    assert metrics["open"] is True
+    assert metrics["requests"] == 3
+    assert metrics["sessions_opened"] == 1
+    assert metrics["in_use"] == 0
+    assert metrics["idle"] == 1
+    
+    await http_client.close()
+    assert http_client.get_metrics()["open"] is False
+
+def test_session_from_previous_loop_is_closed():
+    http_client = HTTPClient()
+    first = asyncio.run(http_client.start())
+    
+    second = asyncio.run(http_client.start())
+    
+    assert first.closed
+    assert second is not first
+    assert http_client.get_metrics()["sessions_opened"] == 2
+    asyncio.run(http_client.close())
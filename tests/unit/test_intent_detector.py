@@ -0,0 +1,114 @@
+import pytest
+import asyncio
+from src.orchestrator.intent_detector import IntentDetector, IntentType
+
+class FakeLLMClient:
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+    
+    async def chat_completion(self, messages, model, **kwargs):
+        self.calls += 1
+        if isinstance(self.content, Exception):
+            raise self.content
+        return self.content
+
+@pytest.mark.asyncio
+async def test_classify_returns_intent_and_term_in_one_call():
+    llm_client = FakeLLMClient('{"intent": "PRODUCT_SEARCH", "search_term": "Lattafa"}')
+    detector = IntentDetector(llm_client)
+    
+    result = await detector.classify("quero perfume lattafa")
+    
+    assert result.intent == IntentType.PRODUCT_SEARCH
+    assert result.search_term == "lattafa"
+    assert llm_client.calls == 1
+
+@pytest.mark.asyncio
+async def test_classify_falls_back_to_simple_detection():
+    detector = IntentDetector(FakeLLMClient(RuntimeError("offline")))
+    
+    result = await detector.classify("quero comprar perfume armaf")
+    
+    assert result.intent == IntentType.PRODUCT_SEARCH
+    assert result.search_term == "armaf"
+
+@pytest.mark.asyncio
+async def test_classify_caches_normalized_messages():
+    llm_client = FakeLLMClient('{"intent": "FAQ", "search_term": null}')
+    detector = IntentDetector(llm_client)
+    
+    await detector.classify("Qual o horário?")
+    result = await detector.classify("qual o horario")
+    
+    assert result.intent == IntentType.FAQ
+    assert llm_client.calls == 1
+    assert detector.get_cache_metrics()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_batched_classification_demultiplexes_results():
+    llm_client = FakeLLMClient(
+        '{"results": [{"id": 1, "intent": "FAQ", "search_term": null},'
+        ' {"id": 2, "intent": "PRODUCT_SEARCH", "search_term": "armaf"}]}'
+    )
+    detector = IntentDetector(llm_client, batching=True)
+    
+    faq, product = await asyncio.gather(
+        detector.classify("qual o horário?"),
+        detector.classify("quero perfume armaf")
+    )
+    
+    assert faq.intent == IntentType.FAQ
+    assert product.search_term == "armaf"
+    assert llm_client.calls == 1
+
+class FakeCatalogAPI:
+    def __init__(self, brands):
+        self.brands = brands
+    
+    async def get_brands(self):
+        return [{"nome": name} for name in self.brands]
+
+@pytest.mark.asyncio
+async def test_fallback_uses_live_brand_list():
+    detector = IntentDetector(FakeLLMClient(RuntimeError("offline")))
+    catalog_api = FakeCatalogAPI(["Al Haramain", "Maison Alhambra", "Lattafa"])
+    
+    assert await detector.refresh_brands(catalog_api) is True
+    assert await detector.refresh_brands(catalog_api) is False
+    
+    assert detector._simple_detection("tem algo da al haramáin?") == IntentType.PRODUCT_SEARCH
+    assert detector._simple_extract("tem algo da AL HARAMAIN?") == "al haramain"
+    assert detector._simple_extract("quero um celular") == "celular"
+
+class SlowLLMClient:
+    async def chat_completion(self, messages, model, **kwargs):
+        await asyncio.sleep(10)
+
+@pytest.mark.asyncio
+async def test_classify_propagates_cancellation():
+    detector = IntentDetector(SlowLLMClient(), batching=False)
+    task = asyncio.create_task(detector.classify("quero comprar perfume armaf"))
+    await asyncio.sleep(0.01)
+    
+    task.cancel()
+    
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+class FakeRouter:
+    async def classify(self, message):
+        return IntentType.PRODUCT_SEARCH
+
+@pytest.mark.asyncio
+async def test_local_route_fills_known_search_term():
+    llm_client = FakeLLMClient("notebook")
+    detector = IntentDetector(llm_client, router=FakeRouter())
+    
+    known = await detector.classify("quero perfume armaf")
+    unknown = await detector.classify("buscar notebook")
+    
+    assert known.search_term == "armaf"
+    assert await detector.extract_search_term("quero perfume armaf") == "armaf"
+    assert unknown.search_term is None
+    assert llm_client.calls == 0
@@ -0,0 +1,26 @@
+import pytest
+from src.utils.keyword_matcher import KeywordMatcher
+
+def test_matches_are_accent_and_case_insensitive():
+    matcher = KeywordMatcher([("Horário", "faq", True), ("Lattafa", "brand", True)])
+    
+    values = [m.value for m in matcher.find_all("Qual o HORARIO da loja? Quero LATTAFÁ")]
+    
+    assert values == ["faq", "brand"]
+
+def test_whole_word_and_prefix_matching():
+    matcher = KeywordMatcher([("apple", "brand", True), ("produto", "product", False)])
+    
+    assert matcher.find_all("pineapple") == []
+    assert matcher.find_all("apples") == []
+    assert [m.value for m in matcher.find_all("meus produtos")] == ["product"]
+
+def test_overlapping_and_multi_word_keywords():
+    matcher = KeywordMatcher([
+        ("al haramain", "al haramain", True),
+        ("haramain", "haramain", True),
+    ])
+    
+    keywords = sorted(m.keyword for m in matcher.find_all("perfume al haramain amber"))
+    
+    assert keywords == ["al haramain", "haramain"]
@@ -0,0 +1,27 @@
+from src.faq.lexical_index import LexicalIndex, tokenize
+
+def test_tokenize_drops_accents_and_stopwords():
+    assert tokenize("Qual o prazo de ENTREGA?") == ["prazo", "entrega"]
+    assert tokenize("Horário") == ["horario"]
+
+def test_search_ranks_by_bm25_and_reports_coverage():
+    index = LexicalIndex()
+    index.add(1, "O prazo é de 2 a 5 dias úteis", boost_text="Qual o prazo de entrega?")
+    index.add(2, "Aceitamos PIX e boleto", boost_text="Quais formas de pagamento?")
+    
+    results = index.search("prazo de entrega do pedido")
+    
+    assert [doc_id for doc_id, _ in results] == [1]
+    assert 0 < results[0][1] < 1
+    assert index.search("boleto") == [(2, 1.0)]
+
+def test_readd_and_remove():
+    index = LexicalIndex()
+    index.add(1, "pix")
+    index.add(1, "boleto")
+    
+    assert index.search("pix") == []
+    
+    index.remove(1)
+    assert len(index) == 0
+    assert index.search("boleto") == []
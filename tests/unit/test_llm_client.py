@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+from types import SimpleNamespace
+from src.llm.llm_client import LLMClient
+
+class FakeCompletions:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+    
+    async def create(self, model, messages, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))]
+        )
+
+@pytest.mark.asyncio
+async def test_chat_completion_respects_concurrency_limit():
+    completions = FakeCompletions()
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    llm_client = LLMClient(client=fake_client, max_concurrency=3, single_flight=False)
+    
+    results = await asyncio.gather(*[
+        llm_client.chat_completion(messages=[], model="test")
+        for _ in range(10)
+    ])
+    
+    assert results == ["ok"] * 10
+    assert completions.peak == 3
+    assert llm_client.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_calls_are_coalesced():
+    completions = FakeCompletions()
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    llm_client = LLMClient(client=fake_client, max_concurrency=10, single_flight=True)
+    messages = [{"role": "user", "content": "qual o horário?"}]
+    
+    results = await asyncio.gather(*[
+        llm_client.chat_completion(messages=messages, model="test")
+        for _ in range(5)
+    ])
+    
+    assert results == ["ok"] * 5
+    assert completions.peak == 1
+    metrics = llm_client.get_metrics()["single_flight"]
+    assert metrics["upstream_calls"] == 1
+    assert metrics["coalesced"] == 4
+    assert metrics["in_flight"] == 0
+
+class FakeStream:
+    def __init__(self, parts):
+        self.parts = parts
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for part in self.parts:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+
+class FakeStreamingCompletions:
+    async def create(self, model, messages, stream=False, **kwargs):
+        return FakeStream(["Olá", None, ", tudo", " bem?"])
+
+@pytest.mark.asyncio
+async def test_stream_chat_completion_yields_deltas_and_releases_slot():
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeStreamingCompletions()))
+    llm_client = LLMClient(client=fake_client, max_concurrency=1, single_flight=False)
+    
+    chunks = [chunk async for chunk in llm_client.stream_chat_completion(messages=[], model="test")]
+    
+    assert chunks == ["Olá", ", tudo", " bem?"]
+    assert llm_client.in_flight == 0
+    
+    # Stream abandonado no meio também devolve a vaga do semáforo
+    stream = llm_client.stream_chat_completion(messages=[], model="test")
+    assert await stream.__anext__() == "Olá"
+    assert llm_client.in_flight == 1
+    await stream.aclose()
+    assert llm_client.in_flight == 0
+    assert not llm_client.semaphore.locked()
@@ -0,0 +1,11 @@
+import sys
+import pytest
+from src.utils.memory import process_memory
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="usa /proc")
+def test_process_memory_splits_anonymous_and_file_backed():
+    memory = process_memory()
+    
+    assert memory["rss_mb"] > 0
+    assert memory["rss_anon_mb"] + memory["rss_file_mb"] <= memory["rss_mb"] + 1
+    assert "pss_mb" in memory
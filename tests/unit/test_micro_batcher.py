@@ -0,0 +1,37 @@
+import pytest
+import asyncio
+from src.utils.micro_batcher import MicroBatcher
+
+@pytest.mark.asyncio
+async def test_items_within_window_share_one_call():
+    calls = []
+    
+    async def handler(items):
+        calls.append(items)
+        return [item.upper() for item in items]
+    
+    batcher = MicroBatcher(handler, window=0.01, max_size=10)
+    results = await asyncio.gather(*[batcher.submit(x) for x in ["a", "b", "a", "c"]])
+    
+    assert results == ["A", "B", "A", "C"]
+    assert calls == [["a", "b", "c"]]
+    assert batcher.get_metrics()["items"] == 4
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_immediately():
+    calls = []
+    
+    async def handler(items):
+        calls.append(items)
+        return items
+    
+    batcher = MicroBatcher(handler, window=10, max_size=2)
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit(1), batcher.submit(2)), timeout=1
+    )
+    
+    assert results == [1, 2]
+    assert len(calls) == 1
+    # A task do lote é referenciada até terminar
+    await asyncio.sleep(0)
+    assert not batcher._tasks
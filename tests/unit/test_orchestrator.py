@@ -0,0 +1,187 @@
+import pytest
+import asyncio
+import time
+from src.orchestrator.intent_detector import IntentDetector, IntentResult, IntentType
+from src.orchestrator.orchestrator import DialogOrchestrator
+
+class FakeLLMClient:
+    async def chat_completion(self, messages, model, **kwargs):
+        return "resposta geral"
+    
+    def get_metrics(self):
+        return {}
+
+class SlowIntentDetector(IntentDetector):
+    def __init__(self, result):
+        super().__init__(FakeLLMClient())
+        self.result = result
+    
+    async def classify(self, message):
+        await asyncio.sleep(0.05)
+        return self.result
+
+class SlowFAQStore:
+    async def search_faq(self, question, threshold=0.7):
+        await asyncio.sleep(0.05)
+        return "Funcionamos de segunda a sexta."
+
+class SlowCatalogAPI:
+    def __init__(self):
+        self.queries = []
+    
+    async def search_products(self, query):
+        self.queries.append(query)
+        await asyncio.sleep(0.1)
+        return [{"titulo": "Perfume Lattafa", "moeda": {"simbolo": "R$"}, "valor_venda": "100"}]
+
+@pytest.fixture
+def make_orchestrator(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    
+    def factory(result, speculative=True):
+        orchestrator = DialogOrchestrator(llm_client=FakeLLMClient(), speculative=speculative)
+        orchestrator.intent_detector = SlowIntentDetector(result)
+        orchestrator.faq_store = SlowFAQStore()
+        orchestrator.catalog_api = SlowCatalogAPI()
+        return orchestrator
+    
+    return factory
+
+@pytest.mark.asyncio
+async def test_speculative_faq_overlaps_intent_detection(make_orchestrator):
+    orchestrator = make_orchestrator(IntentResult(IntentType.FAQ))
+    
+    start = time.perf_counter()
+    response = await orchestrator.process_message("user1", "qual o horario?", "api")
+    elapsed = time.perf_counter() - start
+    
+    assert response == "Funcionamos de segunda a sexta."
+    assert elapsed < 0.09
+    # Sem marca ou produto na mensagem, o catálogo nem é consultado
+    assert orchestrator.catalog_api.queries == []
+
+@pytest.mark.asyncio
+async def test_speculative_catalog_cancelled_for_faq(make_orchestrator):
+    orchestrator = make_orchestrator(IntentResult(IntentType.FAQ))
+    
+    await orchestrator.process_message("user1", "qual o prazo do perfume lattafa?", "api")
+    
+    await asyncio.sleep(0.01)
+    stages = orchestrator.stage_metrics.get_metrics()
+    assert stages["speculative_catalog"]["cancelled"] == 1
+
+@pytest.mark.asyncio
+async def test_speculative_catalog_reused_when_term_matches(make_orchestrator):
+    orchestrator = make_orchestrator(IntentResult(IntentType.PRODUCT_SEARCH, "lattafa"))
+    
+    response = await orchestrator.process_message("user1", "quero perfume lattafa", "api")
+    
+    assert "Perfume Lattafa" in response
+    assert orchestrator.catalog_api.queries == ["lattafa"]
+
+@pytest.mark.asyncio
+async def test_speculative_catalog_discarded_on_wrong_guess(make_orchestrator):
+    orchestrator = make_orchestrator(IntentResult(IntentType.PRODUCT_SEARCH, "asad"))
+    
+    await orchestrator.process_message("user1", "quero perfume asad", "api")
+    
+    assert orchestrator.catalog_api.queries == ["perfume", "asad"]
+
+@pytest.mark.asyncio
+async def test_no_speculative_catalog_without_known_term(make_orchestrator):
+    orchestrator = make_orchestrator(IntentResult(IntentType.PRODUCT_SEARCH, "asad"))
+    
+    await orchestrator.process_message("user1", "tem algo da asad?", "api")
+    
+    assert orchestrator.catalog_api.queries == ["asad"]
+
+class HangingLLMClient(FakeLLMClient):
+    async def chat_completion(self, messages, model, **kwargs):
+        await asyncio.sleep(10)
+
+@pytest.mark.asyncio
+async def test_completion_degrades_when_deadline_expires(make_orchestrator):
+    from src.utils.deadline import request_deadline
+    from src.orchestrator.orchestrator import TIMEOUT_MESSAGE
+    orchestrator = make_orchestrator(IntentResult(IntentType.GENERAL), speculative=False)
+    orchestrator.llm_client = HangingLLMClient()
+    
+    with request_deadline(0.1):
+        response = await orchestrator.process_message("user1", "oi", "api")
+    
+    assert response == TIMEOUT_MESSAGE
+    assert orchestrator.stage_metrics.get_metrics()["completion"]["timeout"] == 1
+
+class SlowSummaryLLMClient(FakeLLMClient):
+    async def chat_completion(self, messages, model, **kwargs):
+        await asyncio.sleep(0.05)
+        return "resumo"
+
+@pytest.mark.asyncio
+async def test_summary_compaction_outlives_request_deadline(make_orchestrator, monkeypatch):
+    from src.utils.deadline import request_deadline
+    orchestrator = make_orchestrator(IntentResult(IntentType.GENERAL), speculative=False)
+    orchestrator.llm_client = SlowSummaryLLMClient()
+    monkeypatch.setattr(orchestrator.memory, "add_turn", lambda *args: True)
+    summaries = []
+    monkeypatch.setattr(orchestrator.memory, "set_summary", lambda user_id, summary, previous: summaries.append(summary))
+    
+    with request_deadline(0.01):
+        orchestrator._remember("user1", "oi", "olá")
+    
+    task = orchestrator._compacting["user1"]
+    await task
+    assert summaries == ["resumo"]
+    assert "user1" not in orchestrator._compacting
+
+class StreamingLLMClient(FakeLLMClient):
+    def __init__(self, parts, delay=0.0):
+        self.parts = parts
+        self.delay = delay
+    
+    async def stream_chat_completion(self, messages, model, **kwargs):
+        await asyncio.sleep(self.delay)
+        for part in self.parts:
+            yield part
+
+@pytest.mark.asyncio
+async def test_stream_message_forwards_chunks_and_records_full_text(make_orchestrator):
+    orchestrator = make_orchestrator(IntentResult(IntentType.GENERAL), speculative=False)
+    orchestrator.llm_client = StreamingLLMClient(["Olá", ", tudo", " bem?"])
+    
+    chunks = [chunk async for chunk in orchestrator.stream_message("user1", "oi", "api")]
+    
+    assert chunks == ["Olá", ", tudo", " bem?"]
+    history = orchestrator.memory.build_messages("user1", "e aí?", 1000)
+    assert history[-2] == {"role": "assistant", "content": "Olá, tudo bem?"}
+
+@pytest.mark.asyncio
+async def test_stream_message_uses_fallback_when_no_chunk_arrives(make_orchestrator):
+    from src.utils.deadline import request_deadline
+    from src.orchestrator.orchestrator import TIMEOUT_MESSAGE
+    orchestrator = make_orchestrator(IntentResult(IntentType.GENERAL), speculative=False)
+    orchestrator.llm_client = StreamingLLMClient(["tarde demais"], delay=10)
+    
+    with request_deadline(0.1):
+        chunks = [chunk async for chunk in orchestrator.stream_message("user1", "oi", "api")]
+    
+    assert chunks == [TIMEOUT_MESSAGE]
+    assert orchestrator.stage_metrics.get_metrics()["stream_completion"]["timeout"] == 1
+    history = orchestrator.memory.build_messages("user1", "e aí?", 1000)
+    assert history[-2] == {"role": "assistant", "content": TIMEOUT_MESSAGE}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("presentation", ["template", "llm"])
+async def test_stream_and_full_product_replies_match(make_orchestrator, presentation):
+    orchestrator = make_orchestrator(IntentResult(IntentType.PRODUCT_SEARCH, "lattafa"), speculative=False)
+    orchestrator.product_presentation = presentation
+    orchestrator.llm_client = StreamingLLMClient(["resposta geral"])
+    
+    full = await orchestrator.process_message("user1", "quero perfume lattafa", "api")
+    streamed = [chunk async for chunk in orchestrator.stream_message("user2", "quero perfume lattafa", "api")]
+    
+    assert "".join(streamed) == full
+    if presentation == "template":
+        assert "Perfume Lattafa" in full
+    else:
+        assert full == "resposta geral"
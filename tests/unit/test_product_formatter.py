@@ -0,0 +1,21 @@
+import pytest
+from src.catalog.product_formatter import format_price, render_product_list
+
+def test_format_price_pt_br():
+    assert format_price("1234.5", "R$") == "R$ 1.234,50"
+    assert format_price(29, "US$") == "US$ 29,00"
+
+def test_format_price_en_us():
+    assert format_price("1234.5", "$", locale="en_US") == "$ 1,234.50"
+
+def test_render_product_list_limits_and_counts_remaining():
+    products = [
+        {"titulo": f"Perfume {i}", "moeda": {"simbolo": "R$"}, "valor_venda": "10"}
+        for i in range(7)
+    ]
+    
+    text = render_product_list(products, "perfume")
+    
+    assert "1. Perfume 0 - R$ 10,00" in text
+    assert "Perfume 5" not in text
+    assert "mais 2 produto(s)" in text
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+from src.catalog.product_vector_index import ProductVectorIndex
+from src.faq.ann_index import ANNIndexFactory
+from src.faq.local_embedder import HashingEmbedder
+
+PRODUCTS = [
+    {"id": 1, "titulo": "Perfume Khamrah", "marca": "Lattafa", "descricao": "<p>Notas doces de baunilha, canela e tâmaras</p>"},
+    {"id": 2, "titulo": "Perfume Club de Nuit", "marca": "Armaf", "descricao": "Amadeirado e cítrico, com abacaxi e bétula"},
+    {"id": 3, "titulo": "Celular Redmi Note 13", "marca": "Xiaomi", "descricao": "Tela AMOLED de 6,67 polegadas e câmera de 108 MP"}
+]
+
+def make_index(tmp_path, index_type="flat"):
+    return ProductVectorIndex(
+        index_factory=ANNIndexFactory(index_type),
+        local_embedder=HashingEmbedder(256),
+        path=str(tmp_path / "catalog_vectors")
+    )
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+async def test_semantic_search_and_incremental_updates(tmp_path, index_type):
+    index = make_index(tmp_path, index_type)
+    
+    assert await index.update(PRODUCTS) == {"embedded": 3, "removed": 0, "unchanged": 0}
+    hits = await index.search("perfume doce com baunilha", k=1)
+    assert hits[0][0] == "1"
+    assert (await index.search("celular com câmera boa", k=1))[0][0] == "3"
+    
+    # Só o produto alterado gera embedding; o removido sai do índice
+    changed = [dict(PRODUCTS[0], descricao="Floral com rosas e jasmim"), PRODUCTS[2]]
+    assert await index.update(changed) == {"embedded": 1, "removed": 1, "unchanged": 1}
+    assert len(index) == 2
+    assert all(product_id != "2" for product_id, _ in await index.search("amadeirado cítrico", k=5))
+    assert (await index.search("perfume floral de rosas", k=1))[0][0] == "1"
+
+@pytest.mark.asyncio
+async def test_vectors_are_reused_after_restart(tmp_path):
+    await make_index(tmp_path).update(PRODUCTS)
+    
+    restarted = make_index(tmp_path)
+    
+    assert len(restarted) == 3
+    assert await restarted.update(PRODUCTS) == {"embedded": 0, "removed": 0, "unchanged": 3}
+    assert (await restarted.search("perfume doce com baunilha", k=1))[0][0] == "1"
+
+class FakeEmbeddingClient:
+    def __init__(self):
+        self.calls = []
+    
+    async def create_embeddings(self, texts, model):
+        self.calls.append(texts)
+        return [HashingEmbedder(64).embed([text])[0].tolist() for text in texts]
+
+@pytest.mark.asyncio
+async def test_removal_only_sync_with_remote_embedder(tmp_path):
+    llm_client = FakeEmbeddingClient()
+    index = ProductVectorIndex(llm_client=llm_client, path=str(tmp_path / "catalog_vectors"))
+    await index.update(PRODUCTS[:2])
+    
+    assert await index.update(PRODUCTS[:1]) == {"embedded": 0, "removed": 1, "unchanged": 1}
+    
+    assert len(index) == 1
+    assert len(llm_client.calls) == 1
+    assert index.snapshot.index.ntotal == 1
+    assert np.asarray(index.snapshot.embeddings).shape == (1, 64)
@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+from src.cache.swr_cache import StaleWhileRevalidateCache
+
+class Upstream:
+    def __init__(self, values):
+        self.values = list(values)
+        self.calls = 0
+    
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+async def settle():
+    # O relógio do loop também é congelado pelo fixture: só avança por iterações
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.cache.swr_cache.time.monotonic", lambda: now[0])
+    return now
+
+@pytest.mark.asyncio
+async def test_stale_value_is_served_while_refreshing(clock):
+    cache = StaleWhileRevalidateCache(max_size=10, stale_ttl=30)
+    upstream = Upstream(["v1", "v2"])
+    
+    assert await cache.get("k", upstream.fetch, ttl=10) == "v1"
+    assert await cache.get("k", upstream.fetch, ttl=10) == "v1"
+    
+    clock[0] += 15
+    assert await cache.get("k", upstream.fetch, ttl=10) == "v1"
+    await settle()
+    
+    assert await cache.get("k", upstream.fetch, ttl=10) == "v2"
+    assert upstream.calls == 2
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["stale_hits"], metrics["misses"]) == (2, 1, 1)
+    assert metrics["refreshes"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_value(clock):
+    cache = StaleWhileRevalidateCache(max_size=10, stale_ttl=30)
+    upstream = Upstream(["v1", RuntimeError("fora do ar"), RuntimeError("fora do ar")])
+    await cache.get("k", upstream.fetch, ttl=10)
+    
+    clock[0] += 15
+    assert await cache.get("k", upstream.fetch, ttl=10) == "v1"
+    await settle()
+    assert cache.get_metrics()["refresh_errors"] == 1
+    
+    # Depois da janela de stale o erro chega ao chamador
+    clock[0] += 30
+    with pytest.raises(RuntimeError):
+        await cache.get("k", upstream.fetch, ttl=10)
+
+@pytest.mark.asyncio
+async def test_negative_results_use_their_own_ttl(clock):
+    cache = StaleWhileRevalidateCache(max_size=10, stale_ttl=30)
+    upstream = Upstream([None, {"id": "1"}])
+    
+    assert await cache.get("k", upstream.fetch, ttl=300, negative_ttl=5) is None
+    assert await cache.get("k", upstream.fetch, ttl=300, negative_ttl=5) is None
+    
+    # Negativos não são servidos vencidos
+    clock[0] += 6
+    assert await cache.get("k", upstream.fetch, ttl=300, negative_ttl=5) == {"id": "1"}
+    assert cache.get_metrics()["negative_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch_and_lru_bound():
+    cache = StaleWhileRevalidateCache(max_size=2, stale_ttl=30)
+    upstream = Upstream(["a"])
+    
+    results = await asyncio.gather(*[cache.get("a", upstream.fetch, ttl=10) for _ in range(5)])
+    assert results == ["a"] * 5
+    assert upstream.calls == 1
+    
+    cache.set("b", "b", ttl=10)
+    await cache.get("a", upstream.fetch, ttl=10)
+    cache.set("c", "c", ttl=10)
+    
+    assert len(cache) == 2
+    assert cache.get_metrics()["evictions"] == 1
+    assert await cache.get("a", upstream.fetch, ttl=10) == "a"
@@ -0,0 +1,26 @@
+import pytest
+from src.cache.ttl_cache import TTLCache
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get_metrics()["evictions"] == 1
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.cache.ttl_cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+    
+    now[0] += 6
+    
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.get_metrics()["misses"] == 1
@@ -1,15 +1,16 @@
-from typing import Dict, Any
-import aiohttp
+from typing import Dict, Any, Optional
 from .webhook_utils import BaseWebhook, WebhookError
 from ..config import (
     WHATSAPP_API_URL,
     WHATSAPP_API_KEY,
     WHATSAPP_VERIFY_TOKEN
 )
+from src.utils.http_client import HTTPClient, http_client as shared_http_client
 
 class WhatsAppWebhook(BaseWebhook):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, http_client: Optional[HTTPClient] = None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.http_client = http_client or shared_http_client
         self.api_url = WHATSAPP_API_URL
         self.api_key = WHATSAPP_API_KEY
         self.headers = {
@@ -63,13 +64,12 @@ class WhatsAppWebhook(BaseWebhook):
             'text': {'body': message}
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/messages",
-                json=payload,
-                headers=self.headers
-            ) as response:
-                return response.status == 200
+        async with self.http_client.post(
+            f"{self.api_url}/messages",
+            json=payload,
+            headers=self.headers
+        ) as response:
+            return response.status == 200
     
     async def send_product_card(
         self,
@@ -115,10 +115,9 @@ class WhatsAppWebhook(BaseWebhook):
             }
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_url}/messages",
-                json=payload,
-                headers=self.headers
-            ) as response:
-                return response.status == 200
+        async with self.http_client.post(
+            f"{self.api_url}/messages",
+            json=payload,
+            headers=self.headers
+        ) as response:
+            return response.status == 200